@@ -40,6 +40,8 @@ class PlatformInfo(BaseModel):
     external_id: Optional[str] = None
     url: Optional[str] = None
     message: Optional[str] = None
+    content_hash: Optional[str] = None
+    field_hashes: Optional[Dict[str, str]] = None
 
 
 class Item(BaseModel):
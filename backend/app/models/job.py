@@ -0,0 +1,43 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+from enum import Enum
+
+from app.models.item import PlatformStatus
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class Job(BaseModel):
+    """Bulk publish job and its progress"""
+
+    id: str
+    status: JobStatus
+    platforms: List[str] = Field(default=[])
+    total: int = Field(default=0, description="Item/platform pairs to publish")
+    processed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    progress: float = Field(default=0, description="Percent of pairs processed")
+    error: Optional[str] = None
+    worker_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class JobItemResult(BaseModel):
+    """Result of publishing one item to one platform within a job"""
+
+    item_id: str
+    platform: str
+    status: PlatformStatus
+    external_id: Optional[str] = None
+    url: Optional[str] = None
+    message: Optional[str] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,188 @@
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+
+from app.settings.database import Base
+
+
+class ItemRecord(Base):
+    """Database table for items"""
+
+    __tablename__ = "items"
+
+    id = Column(String(36), primary_key=True)
+    title = Column(String(255), nullable=False, default="")
+    description = Column(Text, nullable=False, default="")
+    category = Column(String(255), nullable=False, default="General")
+    # Part of the listing sort key, so always set (see ItemRepository._item_row)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=True)
+
+    # Remaining item fields (price, images, dimensions, ...) as compact JSON
+    data = Column(Text, nullable=False, default="{}")
+
+    __table_args__ = (Index("ix_items_created_at_id", "created_at", "id"),)
+
+
+class PlatformStatusRecord(Base):
+    """Database table for per-platform item status"""
+
+    __tablename__ = "item_platform_status"
+
+    item_id = Column(
+        String(36), ForeignKey("items.id", ondelete="CASCADE"), primary_key=True
+    )
+    platform = Column(String(32), primary_key=True)
+
+    # Mirrors Item.platforms[platform] so platform filters can use an index
+    enabled = Column(Boolean, nullable=False, default=False)
+
+    status = Column(String(16), nullable=True)
+    published_at = Column(DateTime, nullable=True)
+    external_id = Column(String(255), nullable=True)
+    url = Column(Text, nullable=True)
+    message = Column(Text, nullable=True)
+
+    # Digest of the platform payload last published, overall and per field
+    content_hash = Column(String(64), nullable=True)
+    field_hashes = Column(Text, nullable=True)  # JSON object
+
+    # Secondary indexes: platform -> ids and platform + status -> ids
+    __table_args__ = (
+        Index("ix_platform_status_platform_enabled", "platform", "enabled", "item_id"),
+        Index("ix_platform_status_platform_status", "platform", "status", "item_id"),
+        Index("ix_platform_status_status_item", "status", "item_id"),
+    )
+
+
+class CounterRecord(Base):
+    """Running item counters for the dashboard summary"""
+
+    __tablename__ = "item_counters"
+
+    name = Column(String(32), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class SearchKeyRecord(Base):
+    """Stable integer key per item, used as the full-text index rowid"""
+
+    __tablename__ = "item_search_keys"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    item_id = Column(String(36), nullable=False, unique=True)
+
+
+class JobRecord(Base):
+    """Durable bulk publish job"""
+
+    __tablename__ = "publish_jobs"
+
+    id = Column(String(36), primary_key=True)
+    status = Column(String(16), nullable=False, default="queued")
+    platforms = Column(Text, nullable=False, default="[]")  # JSON list
+
+    # Progress over item/platform pairs
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    succeeded = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+
+    # Lease held by the worker running the job; expired leases are resumed
+    worker_id = Column(String(128), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (Index("ix_publish_jobs_status_created", "status", "created_at"),)
+
+
+class JobItemRecord(Base):
+    """Per item/platform result of a bulk publish job"""
+
+    __tablename__ = "publish_job_items"
+
+    job_id = Column(
+        String(36), ForeignKey("publish_jobs.id", ondelete="CASCADE"), primary_key=True
+    )
+    item_id = Column(String(36), primary_key=True)
+    platform = Column(String(32), primary_key=True)
+    position = Column(Integer, nullable=False, default=0)
+
+    status = Column(String(16), nullable=False, default="pending")
+    external_id = Column(String(255), nullable=True)
+    url = Column(Text, nullable=True)
+    message = Column(Text, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_publish_job_items_job_status", "job_id", "status", "position"),
+    )
+
+
+class OAuthTokenRecord(Base):
+    """Database table for encrypted platform OAuth tokens"""
+
+    __tablename__ = "oauth_tokens"
+
+    platform = Column(String(32), primary_key=True)
+    access_token = Column(Text, nullable=True)  # Fernet-encrypted
+    refresh_token = Column(Text, nullable=True)  # Fernet-encrypted
+    expires_at = Column(Float, nullable=True)  # Unix timestamps
+    refresh_expires_at = Column(Float, nullable=True)
+    # Process refreshing the token, so only one calls the token endpoint
+    refresh_owner = Column(String(255), nullable=True)
+    refresh_lock_until = Column(Float, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+
+
+class ImageRecord(Base):
+    """Database table for uploaded images, keyed by content hash"""
+
+    __tablename__ = "images"
+
+    hash = Column(String(64), primary_key=True)  # sha256 of the uploaded file
+    ref_count = Column(Integer, nullable=False, default=0)  # Items using it
+    size = Column(Integer, nullable=True)  # Uploaded bytes
+    variants = Column(Text, nullable=False, default="{}")  # Resized files as JSON
+    created_at = Column(DateTime, nullable=True)
+    uploaded_at = Column(DateTime, nullable=True)  # Last stored or re-uploaded
+
+
+class ItemImageRecord(Base):
+    """Uploaded images referenced by an item's image URLs"""
+
+    __tablename__ = "item_images"
+
+    item_id = Column(
+        String(36), ForeignKey("items.id", ondelete="CASCADE"), primary_key=True
+    )
+    image_hash = Column(
+        String(64), ForeignKey("images.hash", ondelete="CASCADE"), primary_key=True
+    )
+
+    __table_args__ = (Index("ix_item_images_image_hash", "image_hash"),)
+
+
+class ImageHostRecord(Base):
+    """Copies of an uploaded image hosted by a platform"""
+
+    __tablename__ = "image_hosts"
+
+    image_hash = Column(
+        String(64), ForeignKey("images.hash", ondelete="CASCADE"), primary_key=True
+    )
+    platform = Column(String(32), primary_key=True)
+    url = Column(Text, nullable=False)
+    hosted_at = Column(DateTime, nullable=True)
@@ -0,0 +1,4 @@
+# Data access layer
+from .item_repository import ItemRepository, item_repository
+
+__all__ = ["ItemRepository", "item_repository"]
@@ -0,0 +1,317 @@
+import asyncio
+import json
+import os
+import re
+import shutil
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.orm import ImageHostRecord, ImageRecord, ItemImageRecord
+from app.settings.config import app_settings
+from app.settings.database import SessionLocal, begin_write
+
+# .../uploads/images/<sha256>/<variant>.jpg
+IMAGE_URL_PATTERN = re.compile(r"/uploads/images/([0-9a-f]{64})/[^/]+$")
+
+
+def image_hash(url: str) -> Optional[str]:
+    """Content hash of an uploaded image URL, None for other URLs"""
+    match = IMAGE_URL_PATTERN.search(url or "")
+    return match.group(1) if match else None
+
+
+class ImageStore:
+    """Uploaded images stored once per content hash under ``upload_dir``
+
+    Each item referencing an uploaded image (through a URL in its images)
+    holds one reference. References are kept in the same transaction as
+    the item write; images that lose their last reference are deleted,
+    files included, once it commits (``collect``). An image uploaded in
+    the last ``grace_seconds`` is kept even without references, since the
+    item using it is usually saved after the upload. The store also
+    records the URL each platform hosts an image under, so it is sent once.
+    """
+
+    def __init__(
+        self,
+        upload_dir: str,
+        session_factory=SessionLocal,
+        grace_seconds: float = 3600.0,
+    ):
+        self.upload_dir = upload_dir
+        self.session_factory = session_factory
+        self.grace_seconds = grace_seconds
+
+    @contextmanager
+    def _session(self, write: bool = False):
+        db: Session = self.session_factory()
+        try:
+            if write:
+                begin_write(db)
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def image_dir(self, digest: str) -> str:
+        return os.path.join(self.upload_dir, "images", digest)
+
+    # Stored images
+
+    def _to_dict(self, record: ImageRecord) -> Dict[str, Any]:
+        return {
+            "hash": record.hash,
+            "ref_count": record.ref_count,
+            "size": record.size,
+            "variants": json.loads(record.variants),
+        }
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Stored image with its variants, if its files are still on disk"""
+        with self._session() as db:
+            record = db.get(ImageRecord, digest)
+            if record is None or not os.path.isdir(self.image_dir(digest)):
+                return None
+            return self._to_dict(record)
+
+    def reuse(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Stored image for a repeated upload, kept for another grace period"""
+        with self._session(write=True) as db:
+            record = db.get(ImageRecord, digest)
+            if record is None or not os.path.isdir(self.image_dir(digest)):
+                return None
+            record.uploaded_at = datetime.utcnow()
+            return self._to_dict(record)
+
+    def register(self, digest: str, size: int, variants: Dict[str, Any]) -> None:
+        """Record a newly stored image; it has no references yet"""
+        with self._session(write=True) as db:
+            now = datetime.utcnow()
+            record = db.get(ImageRecord, digest)
+            if record is None:
+                record = ImageRecord(hash=digest, ref_count=0, created_at=now)
+                db.add(record)
+            record.size = size
+            record.variants = json.dumps(variants)
+            record.uploaded_at = now
+
+    # References, updated inside the item repository's transactions
+
+    def _hashes(self, images: Iterable[str]) -> Set[str]:
+        return {digest for digest in map(image_hash, images or []) if digest}
+
+    def _adjust(self, db: Session, deltas: Counter) -> List[str]:
+        """Apply reference count changes; returns images left unreferenced"""
+        for digest, delta in deltas.items():
+            if delta:
+                db.execute(
+                    update(ImageRecord)
+                    .where(ImageRecord.hash == digest)
+                    .values(ref_count=ImageRecord.ref_count + delta)
+                )
+        released = [digest for digest, delta in deltas.items() if delta < 0]
+        if not released:
+            return []
+        return list(
+            db.scalars(
+                select(ImageRecord.hash).where(
+                    ImageRecord.hash.in_(released), ImageRecord.ref_count <= 0
+                )
+            )
+        )
+
+    def link(self, db: Session, items: List[Dict[str, Any]]) -> None:
+        """Add references for the uploaded images of new items"""
+        wanted = {item["id"]: self._hashes(item.get("images")) for item in items}
+        candidates = set().union(*wanted.values()) if wanted else set()
+        if not candidates:
+            return
+        known = set(
+            db.scalars(select(ImageRecord.hash).where(ImageRecord.hash.in_(candidates)))
+        )
+        rows = [
+            {"item_id": item_id, "image_hash": digest}
+            for item_id, hashes in wanted.items()
+            for digest in hashes & known
+        ]
+        if rows:
+            db.execute(insert(ItemImageRecord), rows)
+            self._adjust(db, Counter(row["image_hash"] for row in rows))
+
+    def sync(self, db: Session, item_id: str, images: List[str]) -> List[str]:
+        """Match an item's references to its images; returns unreferenced images"""
+        current = set(
+            db.scalars(
+                select(ItemImageRecord.image_hash).where(
+                    ItemImageRecord.item_id == item_id
+                )
+            )
+        )
+        wanted = self._hashes(images)
+        if wanted - current:
+            # Only uploaded images still in the store hold a reference
+            wanted &= current | set(
+                db.scalars(
+                    select(ImageRecord.hash).where(
+                        ImageRecord.hash.in_(wanted - current)
+                    )
+                )
+            )
+        added, removed = wanted - current, current - wanted
+        if added:
+            db.execute(
+                insert(ItemImageRecord),
+                [{"item_id": item_id, "image_hash": digest} for digest in added],
+            )
+        if removed:
+            db.execute(
+                delete(ItemImageRecord).where(
+                    ItemImageRecord.item_id == item_id,
+                    ItemImageRecord.image_hash.in_(removed),
+                )
+            )
+        deltas = Counter({digest: 1 for digest in added})
+        deltas.update({digest: -1 for digest in removed})
+        return self._adjust(db, deltas)
+
+    def unlink(self, db: Session, item_id: str) -> List[str]:
+        """Drop every reference of a deleted item; returns unreferenced images"""
+        return self.sync(db, item_id, [])
+
+    def collect(self, digests: Optional[List[str]] = None) -> int:
+        """Delete unreferenced images past their grace period, with their files
+
+        Only ``digests`` are considered when given, every image otherwise.
+        """
+        if digests is not None and not digests:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(seconds=self.grace_seconds)
+        # Images stored before uploaded_at existed count from their creation
+        uploaded_at = func.coalesce(ImageRecord.uploaded_at, ImageRecord.created_at)
+        query = select(ImageRecord.hash).where(
+            ImageRecord.ref_count <= 0,
+            or_(uploaded_at.is_(None), uploaded_at < cutoff),
+        )
+        if digests is not None:
+            query = query.where(ImageRecord.hash.in_(digests))
+        with self._session(write=True) as db:
+            orphans = list(db.scalars(query))
+            if orphans:
+                db.execute(
+                    delete(ImageHostRecord).where(
+                        ImageHostRecord.image_hash.in_(orphans)
+                    )
+                )
+                db.execute(delete(ImageRecord).where(ImageRecord.hash.in_(orphans)))
+        for digest in orphans:
+            shutil.rmtree(self.image_dir(digest), ignore_errors=True)
+        return len(orphans)
+
+    # Platform hosting
+
+    def hosted_urls(self, platform: str, digests: Iterable[str]) -> Dict[str, str]:
+        """URLs of the platform's copies of images, for those it has
+
+        Always read from the database: another process may have deleted
+        or re-hosted an image since.
+        """
+        digests = set(digests)
+        if not digests:
+            return {}
+        with self._session() as db:
+            return dict(
+                db.execute(
+                    select(ImageHostRecord.image_hash, ImageHostRecord.url).where(
+                        ImageHostRecord.platform == platform,
+                        ImageHostRecord.image_hash.in_(digests),
+                    )
+                ).all()
+            )
+
+    def mark_hosted(self, platform: str, hosted: Dict[str, str]) -> None:
+        """Remember platform URLs of uploaded images, by content hash"""
+        if not hosted:
+            return
+        with self._session(write=True) as db:
+            known = set(
+                db.scalars(select(ImageRecord.hash).where(ImageRecord.hash.in_(hosted)))
+            )
+            existing = {
+                record.image_hash: record
+                for record in db.scalars(
+                    select(ImageHostRecord).where(
+                        ImageHostRecord.platform == platform,
+                        ImageHostRecord.image_hash.in_(known),
+                    )
+                )
+            }
+            now = datetime.utcnow()
+            for digest, record in existing.items():
+                if record.url != hosted[digest]:  # Re-hosted
+                    record.url = hosted[digest]
+                    record.hosted_at = now
+            db.add_all(
+                ImageHostRecord(
+                    image_hash=digest,
+                    platform=platform,
+                    url=hosted[digest],
+                    hosted_at=now,
+                )
+                for digest in known - set(existing)
+            )
+
+    def forget_hosted(self, platform: str, urls: Iterable[str]) -> None:
+        """Drop hosted copies the platform no longer serves"""
+        urls = set(urls)
+        if not urls:
+            return
+        with self._session(write=True) as db:
+            db.execute(
+                delete(ImageHostRecord).where(
+                    ImageHostRecord.platform == platform,
+                    ImageHostRecord.url.in_(urls),
+                )
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._session() as db:
+            records = list(db.execute(select(ImageRecord.ref_count, ImageRecord.size)))
+            hosted = dict(
+                db.execute(
+                    select(ImageHostRecord.platform, func.count()).group_by(
+                        ImageHostRecord.platform
+                    )
+                ).all()
+            )
+        return {
+            "images": len(records),
+            "references": sum(count for count, _ in records),
+            "unreferenced": sum(1 for count, _ in records if count <= 0),
+            "stored_bytes": sum(size or 0 for _, size in records),
+            "hosted": hosted,
+        }
+
+
+async def run_image_collection():
+    """Background task deleting unreferenced images once their grace ends"""
+    while True:
+        await asyncio.sleep(app_settings.IMAGE_COLLECT_INTERVAL)
+        try:
+            deleted = await asyncio.to_thread(image_store.collect)
+            if deleted:
+                print(f"🧹 Deleted {deleted} unreferenced images")
+        except Exception as e:
+            print(f"⚠️  Image collection failed: {e}")
+
+
+image_store = ImageStore(
+    app_settings.UPLOAD_DIR, grace_seconds=app_settings.IMAGE_ORPHAN_GRACE_SECONDS
+)
@@ -0,0 +1,106 @@
+import copy
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class ItemCache:
+    """Process-local cache of parsed items indexed by ID
+
+    Entries are dropped when the repository writes an item, and the whole
+    cache is cleared when the backing database file changes on disk (a write
+    from another process), detected by comparing file mtime and size.
+
+    Every invalidation bumps a generation counter. Readers take
+    ``generation()`` before loading from the database and pass it to
+    ``put``, which skips the item if anything was invalidated meanwhile,
+    so a load racing with a write cannot cache the old version.
+    """
+
+    def __init__(self, max_size: int = 10000, db_path: Optional[str] = None):
+        self.max_size = max_size
+        self.db_path = db_path
+        self._items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._signature = self._file_signature()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def _file_signature(self) -> Optional[Tuple]:
+        """mtime/size of the database file and its write-ahead log"""
+        if not self.db_path:
+            return None
+        signature = []
+        for path in (self.db_path, f"{self.db_path}-wal"):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _check_file(self) -> None:
+        signature = self._file_signature()
+        if signature != self._signature:
+            if self._items:
+                self.reloads += 1
+            self._items.clear()
+            self._generation += 1
+            self._signature = signature
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached item, or None on a miss"""
+        if self.max_size <= 0:
+            return None
+        with self._lock:
+            self._check_file()
+            item = self._items.get(item_id)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(item_id)
+            self.hits += 1
+            return copy.deepcopy(item)
+
+    def generation(self) -> int:
+        """Invalidation count, taken before loading items to ``put``"""
+        with self._lock:
+            self._check_file()
+            return self._generation
+
+    def put(self, item: Dict[str, Any], generation: int) -> None:
+        """Cache an item loaded from the database after ``generation()``"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._check_file()
+            if generation != self._generation:
+                return  # Invalidated while it was loaded, may be stale
+            self._items[item["id"]] = copy.deepcopy(item)
+            self._items.move_to_end(item["id"])
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, item_id: Optional[str] = None) -> None:
+        """Drop one item, or everything when no ID is given"""
+        with self._lock:
+            self._generation += 1
+            if item_id is None:
+                self._items.clear()
+            else:
+                self._items.pop(item_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "reloads": self.reloads,
+        }
@@ -0,0 +1,578 @@
+import base64
+import json
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.models.item import PlatformStatus
+from app.models.orm import CounterRecord, ItemRecord, PlatformStatusRecord
+from app.repositories.image_store import image_store
+from app.repositories.item_cache import ItemCache
+from app.repositories.search_index import search_index
+from app.settings.config import app_settings
+from app.settings.database import SessionLocal, begin_write, engine
+
+# Item fields stored in their own columns rather than in the JSON blob
+COLUMN_FIELDS = ("id", "title", "description", "category", "created_at", "updated_at")
+NESTED_FIELDS = ("dimensions", "shipping", "platforms")
+COUNTER_NAMES = ("total", "pending", "published", "failed")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=_json_default)
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def _encode_cursor(keys: List[Any]) -> str:
+    """Opaque page cursor holding the sort keys of the last item"""
+    raw = _dumps(keys).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        keys = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(keys, list) or len(keys) != size:
+        # A cursor from a search listing used without it, or the reverse
+        raise ValueError("Cursor does not match this listing")
+    keys[-2] = _parse_datetime(keys[-2])
+    if (
+        keys[-2] is None
+        or not isinstance(keys[-1], str)
+        or not all(isinstance(rank, (int, float)) for rank in keys[:-2])
+    ):
+        raise ValueError("Invalid cursor")
+    return keys
+
+
+class ItemRepository:
+    """SQL-backed storage for items and their per-platform status"""
+
+    def __init__(self, session_factory=SessionLocal, cache: Optional[ItemCache] = None):
+        self.session_factory = session_factory
+        self.cache = cache or ItemCache(max_size=0)
+
+    @contextmanager
+    def _session(self, write: bool = False):
+        db: Session = self.session_factory()
+        try:
+            if write:
+                begin_write(db)
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def transaction(self):
+        """Write session for callers combining several writes in one commit"""
+        return self._session(write=True)
+
+    # Conversion helpers
+
+    def _item_row(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        updated_at = _parse_datetime(item.get("updated_at"))
+        return {
+            "id": item["id"],
+            "title": item.get("title", ""),
+            "description": item.get("description", ""),
+            "category": item.get("category", "General"),
+            # Items without one (e.g. legacy JSON) still need a page position
+            "created_at": _parse_datetime(item.get("created_at"))
+            or updated_at
+            or datetime.utcnow(),
+            "updated_at": updated_at,
+            "data": _dumps(
+                {
+                    key: value
+                    for key, value in item.items()
+                    if key not in COLUMN_FIELDS and key != "platform_status"
+                }
+            ),
+        }
+
+    def _status_values(self, info: Any) -> Dict[str, Any]:
+        if info is None:
+            info = {}
+        elif hasattr(info, "dict"):
+            info = info.dict()
+        return {
+            "status": _enum_value(info.get("status")),
+            "published_at": _parse_datetime(info.get("published_at")),
+            "external_id": info.get("external_id"),
+            "url": info.get("url"),
+            "message": info.get("message"),
+            "content_hash": info.get("content_hash"),
+            "field_hashes": (
+                _dumps(info["field_hashes"]) if info.get("field_hashes") else None
+            ),
+        }
+
+    def _status_rows(self, item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        platforms = item.get("platforms") or {}
+        platform_status = item.get("platform_status") or {}
+        return [
+            {
+                "item_id": item["id"],
+                "platform": platform,
+                "enabled": bool(platforms.get(platform, False)),
+                **self._status_values(platform_status.get(platform)),
+            }
+            for platform in {**platforms, **platform_status}
+        ]
+
+    def _apply_item(self, record: ItemRecord, item: Dict[str, Any]) -> None:
+        for field, value in self._item_row(item).items():
+            setattr(record, field, value)
+
+    def _apply_status(self, record: PlatformStatusRecord, info: Any) -> None:
+        values = self._status_values(info)
+        if (
+            values["status"] == PlatformStatus.FAILED.value
+            and not values["external_id"]
+        ):
+            # A failed publish leaves any existing listing in place: keep
+            # pointing at it, without digests, so the next run updates it
+            values.update(
+                external_id=record.external_id,
+                url=record.url,
+                published_at=record.published_at,
+            )
+        for field, value in values.items():
+            setattr(record, field, value)
+
+    def _to_dict(
+        self, record: ItemRecord, statuses: Iterable[PlatformStatusRecord]
+    ) -> Dict[str, Any]:
+        item = json.loads(record.data)
+        item.update(
+            id=record.id,
+            title=record.title,
+            description=record.description,
+            category=record.category,
+            created_at=record.created_at,
+            updated_at=record.updated_at,
+        )
+        item["platform_status"] = {
+            status.platform: {
+                "status": status.status,
+                "published_at": status.published_at,
+                "external_id": status.external_id,
+                "url": status.url,
+                "message": status.message,
+                "content_hash": status.content_hash,
+                "field_hashes": (
+                    json.loads(status.field_hashes) if status.field_hashes else None
+                ),
+            }
+            for status in statuses
+            if status.status is not None
+        }
+        return item
+
+    def _load(self, db: Session, records: List[ItemRecord]) -> List[Dict[str, Any]]:
+        if not records:
+            return []
+        statuses: Dict[str, List[PlatformStatusRecord]] = {}
+        rows = db.scalars(
+            select(PlatformStatusRecord).where(
+                PlatformStatusRecord.item_id.in_([record.id for record in records])
+            )
+        )
+        for row in rows:
+            statuses.setdefault(row.item_id, []).append(row)
+        return [
+            self._to_dict(record, statuses.get(record.id, [])) for record in records
+        ]
+
+    # Queries
+
+    def list_items(
+        self,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        platform: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """List items matching the given filters"""
+        return self.list_page(search, status, platform, limit, offset=offset)[0]
+
+    def list_page(
+        self,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+        platform: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of matching items and the cursor of the next page
+
+        Pages are ordered by (created_at, id), or by search rank first, and
+        ``cursor`` continues after the last item of the previous page. The
+        seek runs on ix_items_created_at_id, so every page costs the same
+        and items added meanwhile do not shift later pages. The next cursor
+        is None on the last page. Raises ValueError for a malformed cursor.
+        """
+        query = select(ItemRecord)
+
+        matches = search_index.matches(search) if search else None
+        if matches is not None:
+            # Ranked full-text match, best first
+            query = query.join(matches, matches.c.item_id == ItemRecord.id)
+            order_by = [matches.c.rank, ItemRecord.created_at, ItemRecord.id]
+            query = query.add_columns(matches.c.rank)
+        else:
+            order_by = [ItemRecord.created_at, ItemRecord.id]
+            if search:
+                search_lower = search.lower()
+                query = query.where(
+                    func.lower(ItemRecord.title).contains(search_lower, autoescape=True)
+                    | func.lower(ItemRecord.description).contains(
+                        search_lower, autoescape=True
+                    )
+                )
+
+        if status:
+            query = query.where(
+                ItemRecord.id.in_(
+                    select(PlatformStatusRecord.item_id).where(
+                        PlatformStatusRecord.status == status
+                    )
+                )
+            )
+
+        if platform:
+            query = query.where(
+                ItemRecord.id.in_(
+                    select(PlatformStatusRecord.item_id).where(
+                        PlatformStatusRecord.platform == platform,
+                        PlatformStatusRecord.enabled.is_(True),
+                    )
+                )
+            )
+
+        if cursor:
+            keys = _decode_cursor(cursor, len(order_by))
+            query = query.where(tuple_(*order_by) > tuple_(*keys))
+        elif offset:
+            query = query.offset(offset)
+        # One extra row tells whether there is a next page
+        query = query.order_by(*order_by).limit(limit + 1)
+
+        next_cursor = None
+        with self._session() as db:
+            rows = db.execute(query).all()
+            page = rows[:limit]
+            if len(rows) > limit and page:
+                record, *rank = page[-1]
+                next_cursor = _encode_cursor([*rank, record.created_at, record.id])
+            items = self._load(db, [row[0] for row in page])
+        return items, next_cursor
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Get a single item by ID"""
+        item = self.cache.get(item_id)
+        if item is not None:
+            return item
+
+        generation = self.cache.generation()
+        with self._session() as db:
+            record = db.get(ItemRecord, item_id)
+            if record is None:
+                return None
+            item = self._load(db, [record])[0]
+
+        self.cache.put(item, generation)
+        return item
+
+    def get_many(self, item_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get several items by ID, skipping unknown IDs"""
+        found = {}
+        missing = []
+        for item_id in item_ids:
+            item = self.cache.get(item_id)
+            if item is None:
+                missing.append(item_id)
+            else:
+                found[item_id] = item
+
+        if missing:
+            generation = self.cache.generation()
+            with self._session() as db:
+                records = db.scalars(
+                    select(ItemRecord).where(ItemRecord.id.in_(missing))
+                )
+                for item in self._load(db, list(records)):
+                    self.cache.put(item, generation)
+                    found[item["id"]] = item
+
+        return [found[item_id] for item_id in item_ids if item_id in found]
+
+    def count(self) -> int:
+        """Count all items"""
+        return self.counters()["total"]
+
+    def counters(self) -> Dict[str, int]:
+        """Running totals: all items, and items with a platform in each status"""
+        with self._session() as db:
+            values = dict(
+                db.execute(select(CounterRecord.name, CounterRecord.value)).all()
+            )
+        return {name: values.get(name, 0) for name in COUNTER_NAMES}
+
+    def has_counters(self) -> bool:
+        """Whether the running counters have been initialized"""
+        with self._session() as db:
+            return db.scalar(select(CounterRecord.name).limit(1)) is not None
+
+    def fill_created_at(self) -> int:
+        """Set created_at on rows stored without one; returns the number fixed
+
+        Rows written before created_at was required would otherwise drop
+        out of cursor pagination, which seeks on (created_at, id).
+        """
+        with self._session(write=True) as db:
+            fixed = db.execute(
+                update(ItemRecord)
+                .where(ItemRecord.created_at.is_(None))
+                .values(
+                    created_at=func.coalesce(ItemRecord.updated_at, datetime.utcnow())
+                )
+            ).rowcount
+        if fixed:
+            self.cache.invalidate()
+        return fixed
+
+    def recount(self) -> None:
+        """Rebuild the running counters from the item and status tables"""
+        query = select(
+            PlatformStatusRecord.status,
+            func.count(func.distinct(PlatformStatusRecord.item_id)),
+        ).group_by(PlatformStatusRecord.status)
+        with self._session(write=True) as db:
+            values = {status: count for status, count in db.execute(query) if status}
+            values["total"] = db.scalar(select(func.count()).select_from(ItemRecord))
+            db.query(CounterRecord).delete()
+            db.add_all(
+                CounterRecord(name=name, value=values.get(name, 0))
+                for name in COUNTER_NAMES
+            )
+
+    def _statuses(self, db: Session, item_id: str) -> Set[str]:
+        return {
+            status
+            for status in db.scalars(
+                select(PlatformStatusRecord.status).where(
+                    PlatformStatusRecord.item_id == item_id
+                )
+            )
+            if status
+        }
+
+    def _status_sets(
+        self, records: Iterable[PlatformStatusRecord]
+    ) -> Dict[str, Set[str]]:
+        statuses: Dict[str, Set[str]] = {}
+        for record in records:
+            item_statuses = statuses.setdefault(record.item_id, set())
+            if record.status:
+                item_statuses.add(record.status)
+        return statuses
+
+    def _adjust_counters(self, db: Session, deltas: Counter) -> None:
+        for name, delta in deltas.items():
+            if delta and name in COUNTER_NAMES:
+                db.execute(
+                    update(CounterRecord)
+                    .where(CounterRecord.name == name)
+                    .values(value=CounterRecord.value + delta)
+                )
+
+    # Mutations
+
+    def add(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new item"""
+        self.add_many([item])
+        return item
+
+    def add_many(self, items: List[Dict[str, Any]]) -> None:
+        """Insert several new items in one transaction"""
+        if not items:
+            return
+        with self._session(write=True) as db:
+            db.execute(insert(ItemRecord), [self._item_row(item) for item in items])
+            status_rows = [row for item in items for row in self._status_rows(item)]
+            if status_rows:
+                db.execute(insert(PlatformStatusRecord), status_rows)
+            search_index.index_new(db, items)
+            image_store.link(db, items)
+
+            deltas = Counter(total=len(items))
+            for item in items:
+                deltas.update(
+                    {row["status"] for row in self._status_rows(item) if row["status"]}
+                )
+            self._adjust_counters(db, deltas)
+        for item in items:
+            self.cache.invalidate(item["id"])
+
+    def update(
+        self, item_id: str, update_data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Apply a partial update to an item and return the result"""
+        orphans: List[str] = []
+        with self._session(write=True) as db:
+            record = db.get(ItemRecord, item_id)
+            if record is None:
+                return None
+            current_item = self._load(db, [record])[0]
+
+            for field, value in update_data.items():
+                if field in NESTED_FIELDS and value:
+                    current_item[field] = {**current_item.get(field, {}), **value}
+                else:
+                    current_item[field] = value
+            current_item["updated_at"] = datetime.utcnow()
+
+            self._apply_item(record, current_item)
+            search_index.index(db, current_item)
+            if "images" in update_data:
+                orphans = image_store.sync(db, item_id, current_item.get("images"))
+            if "platforms" in update_data:
+                platforms = current_item.get("platforms") or {}
+                for platform, enabled in platforms.items():
+                    status = db.get(PlatformStatusRecord, (item_id, platform))
+                    if status is None:
+                        db.add(
+                            PlatformStatusRecord(
+                                item_id=item_id, platform=platform, enabled=enabled
+                            )
+                        )
+                    else:
+                        status.enabled = bool(enabled)
+
+        self.cache.invalidate(item_id)
+        image_store.collect(orphans)
+        return current_item
+
+    def delete(self, item_id: str) -> bool:
+        """Delete an item, its platform status rows and its unused images"""
+        with self._session(write=True) as db:
+            record = db.get(ItemRecord, item_id)
+            if record is None:
+                return False
+            deltas = Counter(total=-1)
+            deltas.subtract(self._statuses(db, item_id))
+            self._adjust_counters(db, deltas)
+            db.query(PlatformStatusRecord).filter(
+                PlatformStatusRecord.item_id == item_id
+            ).delete(synchronize_session=False)
+            search_index.remove(db, item_id)
+            orphans = image_store.unlink(db, item_id)
+            db.delete(record)
+
+        self.cache.invalidate(item_id)
+        image_store.collect(orphans)
+        return True
+
+    def set_platform_status(
+        self, item_id: str, platform: str, info: Dict[str, Any]
+    ) -> bool:
+        """Replace the status of one item on one platform"""
+        return self.set_platform_statuses([(item_id, platform, info)]) == 1
+
+    def set_platform_statuses(
+        self,
+        updates: List[Tuple[str, str, Dict[str, Any]]],
+        db: Optional[Session] = None,
+    ) -> int:
+        """Replace several platform statuses in one transaction
+
+        Updates for unknown items are skipped. Returns the number applied.
+        With ``db`` the statuses are written in the caller's transaction,
+        and the caller invalidates the cached items once it commits.
+        """
+        item_ids = list({item_id for item_id, _, _ in updates})
+        if not item_ids:
+            return 0
+        if db is None:
+            with self._session(write=True) as db:
+                applied = self.set_platform_statuses(updates, db)
+            for item_id in item_ids:
+                self.cache.invalidate(item_id)
+            return applied
+
+        existing = set(
+            db.scalars(select(ItemRecord.id).where(ItemRecord.id.in_(item_ids)))
+        )
+        records = {
+            (record.item_id, record.platform): record
+            for record in db.scalars(
+                select(PlatformStatusRecord).where(
+                    PlatformStatusRecord.item_id.in_(existing)
+                )
+            )
+        }
+        before = self._status_sets(records.values())
+
+        applied = 0
+        for item_id, platform, info in updates:
+            if item_id not in existing:
+                continue
+            record = records.get((item_id, platform))
+            if record is None:
+                record = PlatformStatusRecord(
+                    item_id=item_id, platform=platform, enabled=False
+                )
+                db.add(record)
+                records[(item_id, platform)] = record
+            self._apply_status(record, info)
+            applied += 1
+
+        deltas = Counter()
+        for item_id, statuses in self._status_sets(records.values()).items():
+            deltas.update(statuses)
+            deltas.subtract(before.get(item_id, set()))
+        self._adjust_counters(db, deltas)
+        return applied
+
+
+item_repository = ItemRepository(
+    cache=ItemCache(
+        max_size=app_settings.ITEM_CACHE_SIZE,
+        db_path=(
+            engine.url.database if engine.url.get_backend_name() == "sqlite" else None
+        ),
+    )
+)
@@ -0,0 +1,285 @@
+import json
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.item import PlatformStatus
+from app.models.job import JobStatus
+from app.models.orm import JobItemRecord, JobRecord
+from app.settings.database import SessionLocal, begin_write
+
+
+class JobRepository:
+    """SQL-backed queue of bulk publish jobs and their per-item results
+
+    Jobs are claimed with a lease that the running worker renews. A job
+    whose lease expires (the worker died or was redeployed) is claimed
+    again by the next worker, which only publishes the pairs still pending.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    @contextmanager
+    def _session(self, write: bool = False):
+        db: Session = self.session_factory()
+        try:
+            if write:
+                begin_write(db)
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _to_dict(self, record: JobRecord) -> Dict[str, Any]:
+        return {
+            "id": record.id,
+            "status": record.status,
+            "platforms": json.loads(record.platforms),
+            "total": record.total,
+            "processed": record.processed,
+            "succeeded": record.succeeded,
+            "failed": record.failed,
+            "progress": (
+                round(100 * record.processed / record.total, 1) if record.total else 0
+            ),
+            "error": record.error,
+            "worker_id": record.worker_id,
+            "created_at": record.created_at,
+            "started_at": record.started_at,
+            "finished_at": record.finished_at,
+        }
+
+    def create(self, item_ids: List[str], platforms: List[str]) -> Dict[str, Any]:
+        """Queue a job publishing every item to every platform once"""
+        item_ids = list(dict.fromkeys(item_ids))
+        platforms = list(dict.fromkeys(platforms))
+        job_id = str(uuid.uuid4())
+        with self._session(write=True) as db:
+            record = JobRecord(
+                id=job_id,
+                status=JobStatus.QUEUED.value,
+                platforms=json.dumps(platforms),
+                total=len(item_ids) * len(platforms),
+                processed=0,
+                succeeded=0,
+                failed=0,
+                created_at=datetime.utcnow(),
+            )
+            db.add(record)
+            db.flush()
+            db.execute(
+                insert(JobItemRecord),
+                [
+                    {
+                        "job_id": job_id,
+                        "item_id": item_id,
+                        "platform": platform,
+                        "position": position,
+                        "status": PlatformStatus.PENDING.value,
+                    }
+                    for position, item_id in enumerate(item_ids)
+                    for platform in platforms
+                ],
+            )
+            return self._to_dict(record)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._session() as db:
+            record = db.get(JobRecord, job_id)
+            return self._to_dict(record) if record else None
+
+    def list_jobs(
+        self, status: Optional[str] = None, limit: int = 50, offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Most recent jobs first"""
+        query = select(JobRecord)
+        if status:
+            query = query.where(JobRecord.status == status)
+        query = query.order_by(JobRecord.created_at.desc()).offset(offset).limit(limit)
+        with self._session() as db:
+            return [self._to_dict(record) for record in db.scalars(query)]
+
+    def items(
+        self,
+        job_id: str,
+        status: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Per item/platform results of a job, in submission order"""
+        query = select(JobItemRecord).where(JobItemRecord.job_id == job_id)
+        if status:
+            query = query.where(JobItemRecord.status == status)
+        query = (
+            query.order_by(JobItemRecord.position, JobItemRecord.platform)
+            .offset(offset)
+            .limit(limit)
+        )
+        with self._session() as db:
+            return [
+                {
+                    "item_id": record.item_id,
+                    "platform": record.platform,
+                    "status": record.status,
+                    "external_id": record.external_id,
+                    "url": record.url,
+                    "message": record.message,
+                    "finished_at": record.finished_at,
+                }
+                for record in db.scalars(query)
+            ]
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """Take the oldest queued job, or a running job whose lease expired"""
+        now = datetime.utcnow()
+        claimable = or_(
+            JobRecord.status == JobStatus.QUEUED.value,
+            (JobRecord.status == JobStatus.RUNNING.value)
+            & (JobRecord.heartbeat_at < now - timedelta(seconds=lease_seconds)),
+        )
+        with self._session(write=True) as db:
+            job_id = db.scalar(
+                select(JobRecord.id)
+                .where(claimable)
+                .order_by(JobRecord.created_at)
+                .limit(1)
+            )
+            if job_id is None:
+                return None
+            # Conditional update so only one worker wins a race for the job
+            claimed = db.execute(
+                update(JobRecord)
+                .where(JobRecord.id == job_id, claimable)
+                .values(
+                    status=JobStatus.RUNNING.value,
+                    worker_id=worker_id,
+                    heartbeat_at=now,
+                )
+            ).rowcount
+            if not claimed:
+                return None
+            record = db.get(JobRecord, job_id)
+            if record.started_at is None:
+                record.started_at = now
+            return self._to_dict(record)
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Renew a job lease; False if the worker no longer holds it"""
+        with self._session(write=True) as db:
+            return bool(
+                db.execute(
+                    update(JobRecord)
+                    .where(
+                        JobRecord.id == job_id,
+                        JobRecord.worker_id == worker_id,
+                        JobRecord.status == JobStatus.RUNNING.value,
+                    )
+                    .values(heartbeat_at=datetime.utcnow())
+                ).rowcount
+            )
+
+    def release(self, job_id: str, worker_id: str) -> None:
+        """Put a running job back in the queue, e.g. on shutdown"""
+        with self._session(write=True) as db:
+            db.execute(
+                update(JobRecord)
+                .where(
+                    JobRecord.id == job_id,
+                    JobRecord.worker_id == worker_id,
+                    JobRecord.status == JobStatus.RUNNING.value,
+                )
+                .values(status=JobStatus.QUEUED.value, worker_id=None)
+            )
+
+    def finish(
+        self, job_id: str, status: JobStatus, error: Optional[str] = None
+    ) -> None:
+        with self._session(write=True) as db:
+            db.execute(
+                update(JobRecord)
+                .where(JobRecord.id == job_id)
+                .values(status=status.value, error=error, finished_at=datetime.utcnow())
+            )
+
+    def pending(self, job_id: str) -> List[Tuple[str, str]]:
+        """(item_id, platform) pairs of a job that have no result yet"""
+        with self._session() as db:
+            return list(
+                db.execute(
+                    select(JobItemRecord.item_id, JobItemRecord.platform)
+                    .where(
+                        JobItemRecord.job_id == job_id,
+                        JobItemRecord.status == PlatformStatus.PENDING.value,
+                    )
+                    .order_by(JobItemRecord.position)
+                ).all()
+            )
+
+    def record_results(
+        self,
+        job_id: str,
+        updates: List[Tuple[str, str, Dict[str, Any]]],
+        db: Optional[Session] = None,
+    ) -> int:
+        """Store platform status entries as job results and update progress
+
+        Pairs that already have a result are left alone, so a resumed job
+        never counts a pair twice. Returns the number of results stored.
+        With ``db`` the results are written in the caller's transaction.
+        """
+        item_ids = list({item_id for item_id, _, _ in updates})
+        if not item_ids:
+            return 0
+        if db is None:
+            with self._session(write=True) as db:
+                return self.record_results(job_id, updates, db)
+
+        records = {
+            (record.item_id, record.platform): record
+            for record in db.scalars(
+                select(JobItemRecord).where(
+                    JobItemRecord.job_id == job_id,
+                    JobItemRecord.item_id.in_(item_ids),
+                )
+            )
+        }
+
+        succeeded = failed = 0
+        now = datetime.utcnow()
+        for item_id, platform, info in updates:
+            record = records.get((item_id, platform))
+            if record is None or record.status != PlatformStatus.PENDING.value:
+                continue
+            status = PlatformStatus(info.get("status", PlatformStatus.FAILED))
+            record.status = status.value
+            record.external_id = info.get("external_id")
+            record.url = info.get("url")
+            record.message = info.get("message")
+            record.finished_at = now
+            if status == PlatformStatus.PUBLISHED:
+                succeeded += 1
+            else:
+                failed += 1
+
+        if succeeded or failed:
+            db.execute(
+                update(JobRecord)
+                .where(JobRecord.id == job_id)
+                .values(
+                    processed=JobRecord.processed + succeeded + failed,
+                    succeeded=JobRecord.succeeded + succeeded,
+                    failed=JobRecord.failed + failed,
+                )
+            )
+        return succeeded + failed
+
+
+job_repository = JobRepository()
@@ -0,0 +1,163 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Float, String, insert, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.models.orm import ItemRecord, SearchKeyRecord
+from app.settings.database import IS_SQLITE, SessionLocal, engine
+
+# bm25 weights for the indexed columns: title, description, tags, category
+BM25_WEIGHTS = "10.0, 1.0, 5.0, 3.0"
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+INSERT_DOCUMENT = text(
+    "INSERT INTO items_fts (rowid, title, description, tags, category) "
+    "VALUES (:rowid, :title, :description, :tags, :category)"
+)
+
+
+class SearchIndex:
+    """SQLite FTS5 full-text index over item title, description, tags and category
+
+    The index is updated in the same transaction as the item write. When
+    FTS5 is not available (or the database is not SQLite) ``enabled`` stays
+    False and callers fall back to substring matching.
+    """
+
+    def __init__(self):
+        self.enabled = False
+
+    def create(self) -> None:
+        """Create the FTS5 table and build it from existing items if needed"""
+        if not IS_SQLITE:
+            return
+        try:
+            with engine.begin() as connection:
+                connection.exec_driver_sql(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5("
+                    "title, description, tags, category, "
+                    "tokenize='unicode61 remove_diacritics 2')"
+                )
+        except OperationalError as e:
+            print(f"⚠️  Full-text search unavailable, using substring search: {e}")
+            return
+        self.enabled = True
+
+        with SessionLocal() as db:
+            indexed = db.scalar(select(SearchKeyRecord.id).limit(1))
+            has_items = db.scalar(select(ItemRecord.id).limit(1))
+            if indexed is None and has_items is not None:
+                self.rebuild(db)
+                db.commit()
+
+    def rebuild(self, db: Session) -> None:
+        """Re-index every item"""
+        db.execute(text("DELETE FROM items_fts"))
+        db.query(SearchKeyRecord).delete()
+        rows = db.execute(
+            select(
+                ItemRecord.id,
+                ItemRecord.title,
+                ItemRecord.description,
+                ItemRecord.category,
+                ItemRecord.data,
+            )
+        ).all()
+        self.index_new(
+            db,
+            [
+                {
+                    "id": item_id,
+                    "title": title,
+                    "description": description,
+                    "category": category,
+                    "tags": json.loads(data).get("tags"),
+                }
+                for item_id, title, description, category, data in rows
+            ],
+        )
+
+    def _document(self, rowid: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "rowid": rowid,
+            "title": item.get("title") or "",
+            "description": item.get("description") or "",
+            "tags": " ".join(item.get("tags") or []),
+            "category": item.get("category") or "",
+        }
+
+    def index(self, db: Session, item: Dict[str, Any]) -> None:
+        """Add or replace the index entry for an item"""
+        if not self.enabled:
+            return
+        key = db.scalar(
+            select(SearchKeyRecord).where(SearchKeyRecord.item_id == item["id"])
+        )
+        if key is None:
+            self.index_new(db, [item])
+            return
+        db.execute(
+            text("DELETE FROM items_fts WHERE rowid = :rowid"), {"rowid": key.id}
+        )
+        db.execute(INSERT_DOCUMENT, self._document(key.id, item))
+
+    def index_new(self, db: Session, items: List[Dict[str, Any]]) -> None:
+        """Index items that have no entry yet, in bulk"""
+        if not self.enabled or not items:
+            return
+        db.execute(insert(SearchKeyRecord), [{"item_id": item["id"]} for item in items])
+        keys = {}
+        for start in range(0, len(items), 500):
+            item_ids = [item["id"] for item in items[start : start + 500]]
+            keys.update(
+                db.execute(
+                    select(SearchKeyRecord.item_id, SearchKeyRecord.id).where(
+                        SearchKeyRecord.item_id.in_(item_ids)
+                    )
+                ).all()
+            )
+        db.execute(
+            INSERT_DOCUMENT, [self._document(keys[item["id"]], item) for item in items]
+        )
+
+    def remove(self, db: Session, item_id: str) -> None:
+        """Drop the index entry for an item"""
+        if not self.enabled:
+            return
+        key = db.scalar(
+            select(SearchKeyRecord).where(SearchKeyRecord.item_id == item_id)
+        )
+        if key is not None:
+            db.execute(
+                text("DELETE FROM items_fts WHERE rowid = :rowid"), {"rowid": key.id}
+            )
+            db.delete(key)
+
+    def match_query(self, search: str) -> Optional[str]:
+        """Build an FTS5 query where every term must match as a prefix"""
+        terms: List[str] = TOKEN_PATTERN.findall(search)
+        if not terms:
+            return None
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def matches(self, search: str):
+        """Subquery of (item_id, rank) for items matching the search, or None"""
+        query = self.match_query(search) if self.enabled else None
+        if query is None:
+            return None
+        return (
+            text(
+                "SELECT k.item_id AS item_id, "
+                f"bm25(items_fts, {BM25_WEIGHTS}) AS rank "
+                "FROM items_fts JOIN item_search_keys AS k ON k.id = items_fts.rowid "
+                "WHERE items_fts MATCH :query"
+            )
+            .bindparams(query=query)
+            .columns(item_id=String, rank=Float)
+            .subquery("search")
+        )
+
+
+search_index = SearchIndex()
@@ -0,0 +1,94 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.repositories.item_repository import ItemRepository
+from app.repositories.job_repository import JobRepository
+
+
+class StatusWriteBuffer:
+    """Coalesce platform status updates and write them in batches
+
+    Updates are keyed by (item_id, platform), so repeated updates for the
+    same pair only keep the latest. The buffer is flushed as one
+    transaction when it reaches ``batch_size`` entries, every ``interval``
+    seconds, and on exit. ``add`` waits while a full buffer is being
+    flushed, which keeps memory bounded. When a ``job_id`` is given the
+    same batch is also stored as that job's results, in the same
+    transaction as the item statuses, so a resumed job neither publishes
+    a pair a second time nor loses the status of one it published.
+
+        async with StatusWriteBuffer(item_repository) as buffer:
+            await buffer.add(item_id, "ebay", {"status": "published"})
+    """
+
+    def __init__(
+        self,
+        repository: ItemRepository,
+        batch_size: int = 200,
+        interval: float = 1.0,
+        jobs: Optional[JobRepository] = None,
+        job_id: Optional[str] = None,
+    ):
+        self.repository = repository
+        self.jobs = jobs
+        self.job_id = job_id
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+        self._closed = asyncio.Event()
+        self._task = None
+        self.flushes = 0
+        self.written = 0
+
+    async def __aenter__(self) -> "StatusWriteBuffer":
+        self._task = asyncio.create_task(self._flush_periodically())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._closed.set()
+        await self._task
+        await self.flush()
+
+    async def _flush_periodically(self) -> None:
+        while not self._closed.is_set():
+            try:
+                await asyncio.wait_for(self._closed.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️  Failed to write platform status batch: {e}")
+
+    async def add(self, item_id: str, platform: str, info: Dict[str, Any]) -> None:
+        """Queue a status update, flushing first if the buffer is full"""
+        while len(self._pending) >= self.batch_size:
+            await self.flush()
+        self._pending[(item_id, platform)] = info
+
+    async def flush(self) -> None:
+        """Write all queued updates in one transaction"""
+        async with self._lock:
+            if not self._pending:
+                return
+            updates, self._pending = self._pending, {}
+            try:
+                await asyncio.to_thread(
+                    self._write, [(*key, info) for key, info in updates.items()]
+                )
+            except Exception:
+                # Keep the batch for the next flush unless superseded
+                for key, info in updates.items():
+                    self._pending.setdefault(key, info)
+                raise
+            self.flushes += 1
+            self.written += len(updates)
+
+    def _write(self, updates: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        with self.repository.transaction() as db:
+            if self.jobs is not None and self.job_id is not None:
+                self.jobs.record_results(self.job_id, updates, db)
+            self.repository.set_platform_statuses(updates, db)
+        for item_id in {item_id for item_id, _, _ in updates}:
+            self.repository.cache.invalidate(item_id)
@@ -0,0 +1,131 @@
+import base64
+import hashlib
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.models.orm import OAuthTokenRecord
+from app.settings.config import app_settings
+from app.settings.database import SessionLocal, begin_write
+
+
+class TokenRepository:
+    """Encrypted OAuth tokens shared by the API and worker processes
+
+    Tokens are encrypted with a Fernet key derived from SECRET_KEY; tokens
+    stored under another key read back as missing. ``claim_refresh`` hands
+    out a short lease so only one process at a time refreshes a token.
+    """
+
+    def __init__(self, secret_key: str, session_factory=SessionLocal):
+        key = base64.urlsafe_b64encode(hashlib.sha256(secret_key.encode()).digest())
+        self.fernet = Fernet(key)
+        self.session_factory = session_factory
+
+    @contextmanager
+    def _session(self, write: bool = False):
+        db: Session = self.session_factory()
+        try:
+            if write:
+                begin_write(db)
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _encrypt(self, value: Optional[str]) -> Optional[str]:
+        return self.fernet.encrypt(value.encode()).decode() if value else None
+
+    def _decrypt(self, value: Optional[str]) -> Optional[str]:
+        if not value:
+            return None
+        try:
+            return self.fernet.decrypt(value.encode()).decode()
+        except InvalidToken:
+            print("⚠️  Stored token could not be decrypted (SECRET_KEY changed?)")
+            return None
+
+    def get(self, platform: str) -> Optional[Dict[str, Any]]:
+        with self._session() as db:
+            record = db.get(OAuthTokenRecord, platform)
+            if record is None:
+                return None
+            access_token = self._decrypt(record.access_token)
+            refresh_token = self._decrypt(record.refresh_token)
+            if not access_token and not refresh_token:
+                return None
+            return {
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "expires_at": record.expires_at,
+                "refresh_expires_at": record.refresh_expires_at,
+                "updated_at": record.updated_at,
+            }
+
+    def save(
+        self,
+        platform: str,
+        access_token: str,
+        expires_at: float,
+        refresh_token: Optional[str] = None,
+        refresh_expires_at: Optional[float] = None,
+    ) -> None:
+        """Store a new access token; the refresh token is kept unless given"""
+        with self._session(write=True) as db:
+            record = db.get(OAuthTokenRecord, platform)
+            if record is None:
+                record = OAuthTokenRecord(platform=platform)
+                db.add(record)
+            record.access_token = self._encrypt(access_token)
+            record.expires_at = expires_at
+            if refresh_token:
+                record.refresh_token = self._encrypt(refresh_token)
+                record.refresh_expires_at = refresh_expires_at
+            record.updated_at = datetime.utcnow()
+
+    def delete(self, platform: str) -> None:
+        with self._session(write=True) as db:
+            record = db.get(OAuthTokenRecord, platform)
+            if record is not None:
+                db.delete(record)
+
+    def claim_refresh(self, platform: str, owner: str, lease_seconds: float) -> bool:
+        """Take the refresh lease; False while another process holds it"""
+        now = time.time()
+        with self._session(write=True) as db:
+            return bool(
+                db.execute(
+                    update(OAuthTokenRecord)
+                    .where(
+                        OAuthTokenRecord.platform == platform,
+                        or_(
+                            OAuthTokenRecord.refresh_lock_until.is_(None),
+                            OAuthTokenRecord.refresh_lock_until < now,
+                            OAuthTokenRecord.refresh_owner == owner,
+                        ),
+                    )
+                    .values(refresh_owner=owner, refresh_lock_until=now + lease_seconds)
+                ).rowcount
+            )
+
+    def release_refresh(self, platform: str, owner: str) -> None:
+        with self._session(write=True) as db:
+            db.execute(
+                update(OAuthTokenRecord)
+                .where(
+                    OAuthTokenRecord.platform == platform,
+                    OAuthTokenRecord.refresh_owner == owner,
+                )
+                .values(refresh_owner=None, refresh_lock_until=None)
+            )
+
+
+token_repository = TokenRepository(app_settings.SECRET_KEY)
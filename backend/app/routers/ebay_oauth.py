@@ -1,8 +1,10 @@
 import base64
 import httpx
 from fastapi import APIRouter, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse, HTMLResponse
 from app.settings.ebay_config import ebay_settings
+from app.services.ebay_service import ebay_service
 from typing import List
 
 router = APIRouter()
@@ -20,10 +22,7 @@ EBAY_OAUTH_TOKEN_URL = (
     else "https://api.ebay.com/identity/v1/oauth2/token"
 )
 
-EBAY_SCOPES = [
-    "https://api.ebay.com/oauth/api_scope/sell.inventory",
-    "https://api.ebay.com/oauth/api_scope/sell.account",
-]
+EBAY_SCOPES = ebay_settings.EBAY_OAUTH_SCOPES
 
 EBAY_SCOPES_STR = " ".join(EBAY_SCOPES)
 
@@ -97,28 +96,24 @@ async def ebay_oauth_callback(request: Request):
         "redirect_uri": redirect_uri,
     }
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                EBAY_OAUTH_TOKEN_URL, headers=headers, data=data
-            )
-            response.raise_for_status()
-            token_data = response.json()
-            access_token = token_data.get("access_token")
-            refresh_token = token_data.get("refresh_token")
-            expires_in = token_data.get("expires_in")
-            refresh_token_expires_in = token_data.get("refresh_token_expires_in")
-            return HTMLResponse(
-                f"""
-                <h1>eBay Connection Successful!</h1>
-                <p>You have successfully connected your eBay account.</p>
-                <p><strong>Access Token (for API calls):</strong> {access_token[:30]}...</p>
-                <p><strong>Refresh Token (to get new access tokens):</strong> {refresh_token[:30]}...</p>
-                <p>Access token expires in {expires_in} seconds.</p>
-                <p>Refresh token expires in {refresh_token_expires_in} seconds.</p>
-                <p><i>(In a real app, these would be stored securely and not displayed.)</i></p>
-                <p><a href='/api/ebay_oauth/'>Go Home</a></p>
-            """
-            )
+        response = await ebay_service.http.post(
+            EBAY_OAUTH_TOKEN_URL, headers=headers, data=data
+        )
+        response.raise_for_status()
+        token_data = response.json()
+        # Shared with every worker; the refresh token keeps it renewed
+        await run_in_threadpool(ebay_service.store_token, token_data)
+        # The tokens themselves never leave the server
+        expires_in = token_data.get("expires_in")
+        refresh_token_expires_in = token_data.get("refresh_token_expires_in")
+        return HTMLResponse(f"""
+            <h1>eBay Connection Successful!</h1>
+            <p>You have successfully connected your eBay account.</p>
+            <p>Access and refresh tokens were stored encrypted on the server and are renewed automatically.</p>
+            <p>Access token expires in {expires_in} seconds.</p>
+            <p>Refresh token expires in {refresh_token_expires_in} seconds.</p>
+            <p><a href='/api/ebay_oauth/'>Go Home</a></p>
+        """)
     except httpx.HTTPStatusError as e:
         return HTMLResponse(
             f"<h1>eBay Token Exchange Failed!</h1><p>Status: {e.response.status_code}</p><p>Detail: {e.response.text}</p><p><a href='/api/ebay_oauth/'>Go Home</a></p>"
@@ -1,61 +1,66 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import Any, Dict, List, Optional
 import uuid
 from datetime import datetime
 
 from app.models.item import Item, ItemCreate, ItemUpdate
-from app.settings.database import read_items, write_items
+from app.repositories import item_repository
+from app.repositories.image_store import image_store
+from app.services.image_verifier import image_verifier
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[Item])
-async def get_items(
-    search: Optional[str] = Query(None, description="Search in title and description"),
+def get_items(
+    response: Response,
+    search: Optional[str] = Query(
+        None, description="Search title, description, tags and category"
+    ),
     status: Optional[str] = Query(None, description="Filter by status"),
     platform: Optional[str] = Query(None, description="Filter by platform"),
-    limit: int = Query(100, le=1000, description="Number of items to return"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of items to return"),
     offset: int = Query(0, ge=0, description="Number of items to skip"),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor of the previous page, instead of offset"
+    ),
 ):
-    """Get all items with optional filtering"""
-    items = read_items()
-
-    # Apply filters
-    if search:
-        search_lower = search.lower()
-        items = [
-            item
-            for item in items
-            if search_lower in item.get("title", "").lower()
-            or search_lower in item.get("description", "").lower()
-        ]
-
-    if status:
-        items = [
-            item
-            for item in items
-            if any(
-                platform_info.get("status") == status
-                for platform_info in item.get("platform_status", {}).values()
-            )
-        ]
-
-    if platform:
-        items = [
-            item for item in items if item.get("platforms", {}).get(platform, False)
-        ]
-
-    # Apply pagination
-    items = items[offset : offset + limit]
-
+    """Get items with optional filtering, one page at a time
+
+    When there are more items, the X-Next-Cursor response header holds
+    the cursor of the next page.
+    """
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Use either cursor or offset")
+    try:
+        items, next_cursor = item_repository.list_page(
+            search=search,
+            status=status,
+            platform=platform,
+            limit=limit,
+            cursor=cursor,
+            offset=offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return items
 
 
+@router.post("/images/verify")
+async def verify_images(data: Dict[str, Any]):
+    """Check image URLs: status, content type, size and dimensions"""
+    urls = data.get("urls") or []
+    if not urls:
+        raise HTTPException(status_code=400, detail="urls are required")
+    return await image_verifier.verify_many(urls)
+
+
 @router.get("/{item_id}", response_model=Item)
-async def get_item(item_id: str):
+def get_item(item_id: str):
     """Get a specific item by ID"""
-    items = read_items()
-    item = next((item for item in items if item.get("id") == item_id), None)
+    item = item_repository.get(item_id)
 
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
@@ -64,10 +69,8 @@ async def get_item(item_id: str):
 
 
 @router.post("/", response_model=Item, status_code=201)
-async def create_item(item_data: ItemCreate):
+def create_item(item_data: ItemCreate):
     """Create a new item"""
-    items = read_items()
-
     # Create new item
     new_item = Item(
         **item_data.dict(),
@@ -76,93 +79,44 @@ async def create_item(item_data: ItemCreate):
         updated_at=datetime.utcnow()
     )
 
-    items.append(new_item.dict())
-    write_items(items)
+    item_repository.add(new_item.dict())
 
     return new_item
 
 
 @router.put("/{item_id}", response_model=Item)
-async def update_item(item_id: str, item_data: ItemUpdate):
+def update_item(item_id: str, item_data: ItemUpdate):
     """Update an existing item"""
-    items = read_items()
-    item_index = next(
-        (i for i, item in enumerate(items) if item.get("id") == item_id), None
-    )
+    current_item = item_repository.update(item_id, item_data.dict(exclude_unset=True))
 
-    if item_index is None:
+    if current_item is None:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    # Update item
-    current_item = items[item_index]
-    update_data = item_data.dict(exclude_unset=True)
-
-    for field, value in update_data.items():
-        if field == "dimensions" and value:
-            current_item["dimensions"] = {**current_item.get("dimensions", {}), **value}
-        elif field == "shipping" and value:
-            current_item["shipping"] = {**current_item.get("shipping", {}), **value}
-        elif field == "platforms" and value:
-            current_item["platforms"] = {**current_item.get("platforms", {}), **value}
-        else:
-            current_item[field] = value
-
-    current_item["updated_at"] = datetime.utcnow().isoformat()
-    items[item_index] = current_item
-    write_items(items)
-
     return current_item
 
 
 @router.delete("/{item_id}")
-async def delete_item(item_id: str):
+def delete_item(item_id: str):
     """Delete an item"""
-    items = read_items()
-    item = next((item for item in items if item.get("id") == item_id), None)
-
-    if not item:
+    if not item_repository.delete(item_id):
         raise HTTPException(status_code=404, detail="Item not found")
 
-    items = [item for item in items if item.get("id") != item_id]
-    write_items(items)
-
     return {"message": "Item deleted successfully"}
 
 
 @router.get("/stats/summary")
-async def get_items_stats():
+def get_items_stats():
     """Get items statistics"""
-    items = read_items()
-
-    total_items = len(items)
-    pending_items = sum(
-        1
-        for item in items
-        if any(
-            platform_info.get("status") == "pending"
-            for platform_info in item.get("platform_status", {}).values()
-        )
-    )
-    published_items = sum(
-        1
-        for item in items
-        if any(
-            platform_info.get("status") == "published"
-            for platform_info in item.get("platform_status", {}).values()
-        )
-    )
-    failed_items = sum(
-        1
-        for item in items
-        if any(
-            platform_info.get("status") == "failed"
-            for platform_info in item.get("platform_status", {}).values()
-        )
-    )
+    return item_repository.counters()
+
+
+@router.get("/stats/cache")
+async def get_items_cache_stats():
+    """Get item cache hit/miss statistics"""
+    return item_repository.cache.stats()
+
 
-    return {
-        "total": total_items,
-        "pending": pending_items,
-        "published": published_items,
-        "failed": failed_items,
-    }
+@router.get("/stats/images")
+def get_image_check_stats():
+    """Get image check cache and uploaded image store statistics"""
+    return {**image_verifier.stats(), "store": image_store.stats()}
@@ -0,0 +1,119 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+
+from app.models.job import Job, JobItemResult, JobStatus
+from app.repositories.job_repository import job_repository
+from app.services.job_events import job_events
+
+router = APIRouter()
+
+FINISHED = (JobStatus.COMPLETED.value, JobStatus.FAILED.value)
+PROGRESS_FIELDS = ("status", "total", "processed", "succeeded", "failed", "progress")
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+@router.get("/", response_model=List[Job])
+def get_jobs(
+    status: Optional[str] = Query(None, description="Filter by job status"),
+    limit: int = Query(50, ge=1, le=500, description="Number of jobs to return"),
+    offset: int = Query(0, ge=0, description="Number of jobs to skip"),
+):
+    """List bulk publish jobs, most recent first"""
+    return job_repository.list_jobs(status=status, limit=limit, offset=offset)
+
+
+@router.get("/{job_id}", response_model=Job)
+def get_job(job_id: str):
+    """Get the status and progress of a bulk publish job"""
+    job = job_repository.get(job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
+
+
+@router.get("/{job_id}/items", response_model=List[JobItemResult])
+def get_job_items(
+    job_id: str,
+    status: Optional[str] = Query(None, description="Filter by result status"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of results to return"),
+    offset: int = Query(0, ge=0, description="Number of results to skip"),
+):
+    """Get the per item/platform results of a bulk publish job"""
+    if not job_repository.get(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job_repository.items(job_id, status=status, limit=limit, offset=offset)
+
+
+async def _job_events(
+    request: Request, job: Dict[str, Any], poll_interval: float
+) -> AsyncIterator[str]:
+    job_id = job["id"]
+    queue = job_events.subscribe(job_id)
+    try:
+        yield _sse("progress", job)
+        if job["status"] in FINISHED:
+            yield _sse("done", job)
+            return
+
+        last = {key: job[key] for key in PROGRESS_FIELDS}
+        while not await request.is_disconnected():
+            try:
+                event, data = await asyncio.wait_for(queue.get(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                # Jobs run by worker processes elsewhere only show up in the database
+                job = await asyncio.to_thread(job_repository.get, job_id)
+                if job is None:
+                    return  # Deleted
+                current = {key: job[key] for key in PROGRESS_FIELDS}
+                if job["status"] in FINISHED:
+                    yield _sse("done", job)
+                    return
+                if current != last:
+                    last = current
+                    yield _sse("progress", job)
+                else:
+                    yield ": keep-alive\n\n"
+                continue
+
+            yield _sse(event, data)
+            if event == "done":
+                return
+    finally:
+        job_events.unsubscribe(job_id, queue)
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    poll_interval: float = Query(
+        2.0, ge=0.5, le=60, description="Seconds between progress checks when idle"
+    ),
+):
+    """Stream job results and counters as Server-Sent Events
+
+    Sends a ``progress`` snapshot first, then a ``result`` event per
+    item/platform (with the job counters) as it is published, and a final
+    ``done`` event with the finished job.
+    """
+    job = await asyncio.to_thread(job_repository.get, job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return StreamingResponse(
+        _job_events(request, job, poll_interval),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,28 +1,29 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
-from typing import List, Dict, Any
-import uuid
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, Any
 from datetime import datetime
 from fastapi.responses import RedirectResponse, JSONResponse
 
 from app.models.item import Item, PlatformStatus
-from app.settings.database import read_items, write_items
-from app.services.ebay_service import EbayService
-from app.services.shopify_service import ShopifyService
+from app.repositories import item_repository
+from app.repositories.job_repository import job_repository
+from app.services.ebay_service import ebay_service
+from app.services.shopify_service import shopify_service
+from app.services.image_verifier import image_errors, image_verifier
+from app.services.job_worker import bulk_publisher, job_worker, status_from_result
+from app.services.rate_limiter import rate_limiter
+from app.services.resilience import resilience
+from app.settings.config import app_settings
 
 router = APIRouter()
 
-# Initialize services
-ebay_service = EbayService()
-shopify_service = ShopifyService()
-
 
 @router.post("/{platform}/{item_id}")
 async def publish_to_platform(
     platform: str, item_id: str, background_tasks: BackgroundTasks
 ):
     """Publish a single item to a specific platform"""
-    items = read_items()
-    item = next((item for item in items if item.get("id") == item_id), None)
+    item = await run_in_threadpool(item_repository.get, item_id)
 
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
@@ -32,42 +33,37 @@ async def publish_to_platform(
             status_code=400, detail=f"Item not configured for {platform}"
         )
 
+    if platform.lower() not in ("ebay", "shopify"):
+        raise HTTPException(status_code=400, detail="Unsupported platform")
+
+    if app_settings.IMAGE_VERIFY_ON_PUBLISH:
+        broken = await image_verifier.broken_images([item])
+        if broken:
+            raise HTTPException(status_code=422, detail=image_errors(broken[item_id]))
+
     try:
-        if platform.lower() == "ebay":
-            result = await ebay_service.create_listing(item)
-        elif platform.lower() == "shopify":
-            result = await shopify_service.create_product(item)
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported platform")
+        # Unchanged items are skipped and changed ones updated in place
+        result = await bulk_publisher.publish_one(item, platform.lower())
 
         if result["success"]:
             # Update item status
-            item_index = next(
-                (i for i, item in enumerate(items) if item.get("id") == item_id), None
+            await run_in_threadpool(
+                item_repository.set_platform_status,
+                item_id,
+                platform,
+                status_from_result(result),
             )
-            if item_index is not None:
-                items[item_index]["platform_status"][platform] = {
-                    "status": PlatformStatus.PUBLISHED,
-                    "published_at": datetime.utcnow().isoformat(),
-                    "external_id": result.get("external_id"),
-                    "url": result.get("url"),
-                    "message": result.get("message"),
-                }
-                write_items(items)
 
         return result
 
     except Exception as e:
         # Update item status to failed
-        item_index = next(
-            (i for i, item in enumerate(items) if item.get("id") == item_id), None
+        await run_in_threadpool(
+            item_repository.set_platform_status,
+            item_id,
+            platform,
+            {"status": PlatformStatus.FAILED, "message": str(e)},
         )
-        if item_index is not None:
-            items[item_index]["platform_status"][platform] = {
-                "status": PlatformStatus.FAILED,
-                "message": str(e),
-            }
-            write_items(items)
 
         raise HTTPException(
             status_code=500, detail=f"Failed to publish to {platform}: {str(e)}"
@@ -75,116 +71,42 @@ async def publish_to_platform(
 
 
 @router.post("/bulk")
-async def bulk_publish(background_tasks: BackgroundTasks, data: Dict[str, Any]):
+async def bulk_publish(data: Dict[str, Any]):
     """Bulk publish items to multiple platforms"""
     items_data = data.get("items", [])
-    platforms = data.get("platforms", [])
+    # Each (item, platform) pair is published once
+    platforms = list(dict.fromkeys(data.get("platforms", [])))
 
     if not items_data or not platforms:
         raise HTTPException(status_code=400, detail="Items and platforms are required")
 
     # Get full item data
-    all_items = read_items()
-    items_to_publish = []
-
-    for item_data in items_data:
-        item_id = item_data.get("id")
-        item = next((item for item in all_items if item.get("id") == item_id), None)
-        if item:
-            items_to_publish.append(item)
+    items_to_publish = await run_in_threadpool(
+        item_repository.get_many,
+        list(
+            dict.fromkeys(
+                item_data.get("id") for item_data in items_data if item_data.get("id")
+            )
+        ),
+    )
 
     if not items_to_publish:
         raise HTTPException(status_code=404, detail="No valid items found")
 
-    # Start background task for bulk publishing
-    background_tasks.add_task(process_bulk_publish, items_to_publish, platforms)
+    # Queue a durable job; a job worker picks it up
+    job = await run_in_threadpool(
+        job_repository.create, [item["id"] for item in items_to_publish], platforms
+    )
+    job_worker.notify()
 
     return {
         "message": f"Bulk publish started for {len(items_to_publish)} items to {len(platforms)} platforms",
-        "task_id": str(uuid.uuid4()),
+        "task_id": job["id"],
+        "job_id": job["id"],
+        "status_url": f"/api/jobs/{job['id']}",
     }
 
 
-async def process_bulk_publish(items: List[Dict], platforms: List[str]):
-    """Background task to process bulk publishing"""
-    results = []
-
-    for item in items:
-        item_results = []
-
-        for platform in platforms:
-            try:
-                if platform.lower() == "ebay":
-                    result = await ebay_service.create_listing(item)
-                elif platform.lower() == "shopify":
-                    result = await shopify_service.create_product(item)
-                else:
-                    result = {"success": False, "message": "Unsupported platform"}
-
-                item_results.append(
-                    {
-                        "platform": platform,
-                        "success": result["success"],
-                        "external_id": result.get("external_id"),
-                        "url": result.get("url"),
-                        "message": result.get("message"),
-                    }
-                )
-
-                # Update item status
-                all_items = read_items()
-                item_index = next(
-                    (
-                        i
-                        for i, item in enumerate(all_items)
-                        if item.get("id") == item["id"]
-                    ),
-                    None,
-                )
-
-                if item_index is not None:
-                    if result["success"]:
-                        all_items[item_index]["platform_status"][platform] = {
-                            "status": PlatformStatus.PUBLISHED,
-                            "published_at": datetime.utcnow().isoformat(),
-                            "external_id": result.get("external_id"),
-                            "url": result.get("url"),
-                            "message": result.get("message"),
-                        }
-                    else:
-                        all_items[item_index]["platform_status"][platform] = {
-                            "status": PlatformStatus.FAILED,
-                            "message": result.get("message"),
-                        }
-                    write_items(all_items)
-
-            except Exception as e:
-                item_results.append(
-                    {"platform": platform, "success": False, "message": str(e)}
-                )
-
-                # Update item status to failed
-                all_items = read_items()
-                item_index = next(
-                    (
-                        i
-                        for i, item in enumerate(all_items)
-                        if item.get("id") == item["id"]
-                    ),
-                    None,
-                )
-                if item_index is not None:
-                    all_items[item_index]["platform_status"][platform] = {
-                        "status": PlatformStatus.FAILED,
-                        "message": str(e),
-                    }
-                    write_items(all_items)
-
-        results.append({"item_id": item["id"], "platforms": item_results})
-
-    return results
-
-
 @router.get("/status")
 async def get_platform_status():
     """Get platform connection status"""
@@ -202,6 +124,18 @@ async def get_platform_status():
     }
 
 
+@router.get("/rate-limits")
+async def get_rate_limits():
+    """Current API budget and wait-time metrics per platform and store"""
+    return rate_limiter.stats()
+
+
+@router.get("/circuits")
+async def get_circuits():
+    """Circuit breaker state, retry and trip counts per platform"""
+    return resilience.stats()
+
+
 @router.get("/ebay/auth/start")
 async def ebay_auth_start():
     """Redirect user to eBay OAuth2 consent page"""
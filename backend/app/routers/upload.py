@@ -1,113 +1,184 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
-from typing import List, Dict, Any
+from typing import Dict, Any, AsyncIterator, List, Optional
 import pandas as pd
 import io
+import json
 import uuid
 from datetime import datetime
 
 from app.models.item import Item, ItemCreate
-from app.settings.database import read_items, write_items
+from app.repositories import item_repository
+from app.settings.config import app_settings
+from app.services.batch_validation import validate_batch
+from app.services.feed_readers import (
+    FORMAT_LABELS,
+    FeedFormatError,
+    detect_format,
+    read_feed,
+)
+from app.services.image_processing import image_processor
+from app.services.item_transform import transform_frame
 
 router = APIRouter()
 
 
-@router.post("/csv")
-async def upload_csv(file: UploadFile = File(...)):
-    """Upload and parse CSV file"""
-    if not file.filename.endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Only CSV files are allowed")
+async def _iter_chunks(
+    file: UploadFile, chunk_size: int, feed_format: str
+) -> AsyncIterator:
+    """Read the spooled upload file in bounded-size DataFrame chunks"""
+    await file.seek(0)
+    reader = read_feed(file.file, chunk_size, feed_format)
+    while True:
+        chunk = await run_in_threadpool(next, reader, None)
+        if chunk is None:
+            break
+        yield chunk
+
+
+async def _stream_results(
+    file: UploadFile, chunk_size: int, feed_format: str
+) -> AsyncIterator:
+    """Yield NDJSON lines for each validated row, then a summary line"""
+    label = FORMAT_LABELS[feed_format]
+    total_items = 0
+    total_errors = 0
 
     try:
-        # Read CSV file
-        content = await file.read()
-        df = pd.read_csv(io.StringIO(content.decode("utf-8")))
+        async for chunk in _iter_chunks(file, chunk_size, feed_format):
+            transformed_items, errors = await run_in_threadpool(transform_frame, chunk)
+            total_items += len(transformed_items)
+            total_errors += len(errors)
+
+            lines = [
+                json.dumps({"type": "item", "item": item}, default=str)
+                for item in transformed_items
+            ] + [
+                json.dumps({"type": "error", **error}, default=str) for error in errors
+            ]
+            if lines:
+                yield "\n".join(lines) + "\n"
 
-        if df.empty:
-            raise HTTPException(status_code=400, detail="CSV file is empty")
+    except Exception as e:
+        yield json.dumps(
+            {"type": "failed", "error": f"Failed to process {label} file: {str(e)}"}
+        ) + "\n"
+        return
+
+    yield json.dumps(
+        {
+            "type": "summary",
+            "message": f"Parsed {total_items} valid items from {label}",
+            "total_items": total_items,
+            "total_errors": total_errors,
+        }
+    ) + "\n"
 
-        # Transform CSV data to items
-        transformed_items = []
-        errors = []
 
-        for index, row in df.iterrows():
-            try:
-                # Convert row to dict and handle missing values
-                row_dict = row.to_dict()
-
-                # Create item data
-                item_data = {
-                    "title": str(row_dict.get("title", "")).strip(),
-                    "description": str(row_dict.get("description", "")).strip(),
-                    "price": float(row_dict.get("price", 0)),
-                    "quantity": int(row_dict.get("quantity", 1)),
-                    "category": str(row_dict.get("category", "General")).strip(),
-                    "condition": str(row_dict.get("condition", "New")).strip(),
-                    "images": (
-                        row_dict.get("images", "").split(",")
-                        if row_dict.get("images")
-                        else []
-                    ),
-                    "tags": (
-                        row_dict.get("tags", "").split(",")
-                        if row_dict.get("tags")
-                        else []
-                    ),
-                    "weight": float(row_dict.get("weight", 0)),
-                    "dimensions": {
-                        "length": float(row_dict.get("length", 0)),
-                        "width": float(row_dict.get("width", 0)),
-                        "height": float(row_dict.get("height", 0)),
-                    },
-                    "shipping": {
-                        "weight": float(
-                            row_dict.get("shipping_weight", row_dict.get("weight", 0))
-                        ),
-                        "method": str(
-                            row_dict.get("shipping_method", "Standard")
-                        ).strip(),
-                        "cost": float(row_dict.get("shipping_cost", 0)),
-                    },
-                    "platforms": {
-                        "ebay": str(row_dict.get("ebay", "false")).lower()
-                        in ["true", "1", "yes"],
-                        "shopify": str(row_dict.get("shopify", "false")).lower()
-                        in ["true", "1", "yes"],
-                    },
-                }
+@router.post("/csv")
+@router.post("/feed")
+async def upload_csv(
+    file: UploadFile = File(...),
+    stream: bool = Query(False, description="Stream results back as NDJSON"),
+    chunk_size: int = Query(5000, ge=1, le=100000, description="Rows parsed per chunk"),
+):
+    """Upload and parse an item feed: CSV, Excel (.xlsx), Parquet or Arrow
+
+    The format is detected from the file contents, not its name. Every
+    format is read in chunks of ``chunk_size`` rows.
+    """
+    try:
+        feed_format = await run_in_threadpool(detect_format, file.file)
+    except FeedFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    label = FORMAT_LABELS[feed_format]
+
+    if stream:
+        return StreamingResponse(
+            _stream_results(file, chunk_size, feed_format),
+            media_type="application/x-ndjson",
+        )
 
-                # Clean up images and tags
-                item_data["images"] = [
-                    img.strip() for img in item_data["images"] if img.strip()
-                ]
-                item_data["tags"] = [
-                    tag.strip() for tag in item_data["tags"] if tag.strip()
-                ]
+    try:
+        # Parse the file in chunks straight from the spooled upload
+        transformed_items = []
+        errors = []
+        parsed_rows = 0
 
-                # Validate item
-                item = ItemCreate(**item_data)
-                transformed_items.append(item.dict())
+        async for chunk in _iter_chunks(file, chunk_size, feed_format):
+            parsed_rows += len(chunk)
+            chunk_items, chunk_errors = await run_in_threadpool(transform_frame, chunk)
+            transformed_items.extend(chunk_items)
+            errors.extend(chunk_errors)
 
-            except Exception as e:
-                errors.append(
-                    {"row": index + 1, "error": str(e), "data": row.to_dict()}
-                )
+        if parsed_rows == 0:
+            raise HTTPException(status_code=400, detail=f"{label} file is empty")
 
         return {
-            "message": f"Parsed {len(transformed_items)} valid items from CSV",
+            "message": f"Parsed {len(transformed_items)} valid items from {label}",
             "items": transformed_items,
             "errors": errors,
             "total_items": len(transformed_items),
         }
 
+    except HTTPException:
+        raise
+    except FeedFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
-            status_code=500, detail=f"Failed to process CSV file: {str(e)}"
+            status_code=500, detail=f"Failed to process {label} file: {str(e)}"
         )
 
 
+@router.post("/images")
+async def upload_images(
+    files: List[UploadFile] = File(...),
+    item_id: Optional[str] = Query(None, description="Item to add the images to"),
+):
+    """Upload images, resized for each platform, optionally adding them to an item"""
+    if (
+        item_id is not None
+        and await run_in_threadpool(item_repository.get, item_id) is None
+    ):
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    result = await image_processor.process_uploads(files, app_settings.MAX_FILE_SIZE)
+    if not result["images"]:
+        raise HTTPException(
+            status_code=400,
+            detail="No images could be processed: "
+            + "; ".join(f"{e['filename']}: {e['error']}" for e in result["errors"]),
+        )
+
+    item = None
+    if item_id is not None:
+        current = await run_in_threadpool(item_repository.get, item_id) or {}
+        images = current.get("images") or []
+        item = await run_in_threadpool(
+            item_repository.update,
+            item_id,
+            {
+                "images": images
+                + [
+                    url
+                    for url in dict.fromkeys(image["url"] for image in result["images"])
+                    if url not in images
+                ]
+            },
+        )
+
+    return {
+        "message": f"Uploaded {len(result['images'])} images",
+        "images": result["images"],
+        "errors": result["errors"],
+        "item": item,
+    }
+
+
 @router.post("/bulk")
-async def bulk_create_items(data: Dict[str, Any]):
+def bulk_create_items(data: Dict[str, Any]):
     """Bulk create items from parsed data"""
     items_data = data.get("items", [])
 
@@ -115,33 +186,37 @@ async def bulk_create_items(data: Dict[str, Any]):
         raise HTTPException(status_code=400, detail="No items provided")
 
     try:
-        existing_items = read_items()
-        new_items = []
-        errors = []
-
-        for item_data in items_data:
-            try:
-                # Create new item
-                new_item = Item(
+        now = datetime.utcnow()
+        rows = [
+            (
+                {
                     **item_data,
-                    id=str(uuid.uuid4()),
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow(),
-                )
-                new_items.append(new_item.dict())
-
-            except Exception as e:
-                errors.append({"data": item_data, "error": str(e)})
-
-        # Add new items to existing ones
-        all_items = existing_items + new_items
-        write_items(all_items)
+                    "id": str(uuid.uuid4()),
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                if isinstance(item_data, dict)
+                else item_data
+            )
+            for item_data in items_data
+        ]
+
+        # Validate all new items in one batch
+        valid, invalid = validate_batch(Item, rows)
+        new_items = [item for _, item in valid]
+        errors = [
+            {"row": index + 1, "data": items_data[index], "error": error}
+            for index, error in sorted(invalid.items())
+        ]
+
+        # Insert new items in a single transaction
+        item_repository.add_many(new_items)
 
         return {
             "message": f"Created {len(new_items)} items",
             "created_items": new_items,
             "errors": errors,
-            "total_items": len(all_items),
+            "total_items": item_repository.count(),
         }
 
     except Exception as e:
@@ -190,17 +265,13 @@ async def validate_csv_data(data: Dict[str, Any]):
     if not items_data:
         raise HTTPException(status_code=400, detail="No items provided")
 
-    valid_items = []
-    errors = []
-
-    for index, item_data in enumerate(items_data):
-        try:
-            # Validate item
-            item = ItemCreate(**item_data)
-            valid_items.append(item.dict())
-
-        except Exception as e:
-            errors.append({"row": index + 1, "error": str(e), "data": item_data})
+    # Validate all items in one batch
+    valid, invalid = validate_batch(ItemCreate, items_data)
+    valid_items = [item for _, item in valid]
+    errors = [
+        {"row": index + 1, "error": error, "data": items_data[index]}
+        for index, error in sorted(invalid.items())
+    ]
 
     return {
         "valid_items": valid_items,
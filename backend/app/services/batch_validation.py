@@ -0,0 +1,51 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def _format_errors(errors: List[Dict[str, Any]]) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}"
+        for error in errors
+    )
+
+
+def validate_batch(
+    model: Type[BaseModel], rows: List[Any]
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], Dict[int, str]]:
+    """Validate a list of rows against a model in one pydantic-core call
+
+    Returns (index, dumped model) pairs for valid rows and a mapping of
+    row index to error message for invalid rows. When the batch has
+    errors, the failing indices are read from the error locations and
+    the remaining rows are validated again as a single batch.
+    """
+    adapter = _list_adapter(model)
+    indices = list(range(len(rows)))
+    row_errors: Dict[int, List[Dict[str, Any]]] = {}
+
+    while indices:
+        try:
+            models = adapter.validate_python([rows[index] for index in indices])
+        except ValidationError as e:
+            failed = set()
+            for error in e.errors(include_url=False):
+                position, *loc = error["loc"]
+                index = indices[position]
+                failed.add(index)
+                row_errors.setdefault(index, []).append({**error, "loc": loc})
+            indices = [index for index in indices if index not in failed]
+            continue
+
+        return (
+            list(zip(indices, adapter.dump_python(models))),
+            {index: _format_errors(errors) for index, errors in row_errors.items()},
+        )
+
+    return [], {index: _format_errors(errors) for index, errors in row_errors.items()}
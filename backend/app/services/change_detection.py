@@ -0,0 +1,65 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, Optional
+
+from app.models.item import PlatformStatus
+
+PayloadBuilder = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def _digest(value: Any) -> str:
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def payload_digests(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Digest of a platform payload, overall and per top-level field"""
+    field_hashes = {field: _digest(value)[:16] for field, value in payload.items()}
+    return {"content_hash": _digest(field_hashes), "field_hashes": field_hashes}
+
+
+class ChangeDetector:
+    """Decide whether publishing an item creates, updates or skips a listing
+
+    The digest of the payload sent to a platform is stored on the item's
+    platform status. A published item whose payload digest is unchanged is
+    skipped; otherwise it is updated, and ``fields`` lists the payload
+    fields whose digest changed (None when there is no earlier digest).
+    Only items without a listing ID on the platform are created.
+    """
+
+    def __init__(self, payloads: Dict[str, PayloadBuilder]):
+        self.payloads = payloads
+
+    def digests(self, item: Dict[str, Any], platform: str) -> Dict[str, Any]:
+        build = self.payloads.get(platform.lower())
+        return payload_digests(build(item)) if build else {}
+
+    def plan(self, item: Dict[str, Any], platform: str) -> Dict[str, Any]:
+        digests = self.digests(item, platform)
+        status: Dict[str, Any] = (item.get("platform_status") or {}).get(platform) or {}
+        if not status.get("external_id"):
+            return {"action": "create", "fields": None, **digests}
+
+        previous = {
+            "external_id": status.get("external_id"),
+            "url": status.get("url"),
+            "published_at": status.get("published_at"),
+        }
+        # A listing whose last publish failed is updated, never skipped
+        published = str(getattr(status.get("status"), "value", status.get("status")))
+        if (
+            published == PlatformStatus.PUBLISHED.value
+            and digests
+            and status.get("content_hash") == digests["content_hash"]
+        ):
+            return {"action": "skip", "fields": [], **previous, **digests}
+
+        fields: Optional[list] = None
+        if digests and status.get("field_hashes"):
+            fields = [
+                field
+                for field, digest in digests["field_hashes"].items()
+                if status["field_hashes"].get(field) != digest
+            ]
+        return {"action": "update", "fields": fields, **previous, **digests}
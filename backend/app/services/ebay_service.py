@@ -1,17 +1,65 @@
 import uuid
 import asyncio
 import base64
+import os
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from app.settings.config import app_settings
 from app.settings.ebay_config import ebay_settings
+from app.repositories.token_repository import TokenRepository, token_repository
+from app.services.http_clients import create_client
+from app.services.image_processing import image_variant_url
+from app.services.rate_limiter import rate_limiter
+from app.services.resilience import resilience
 import httpx
 from urllib.parse import urlencode
 
+# Inventory API bulk endpoints accept at most 25 entries per request
+EBAY_BULK_BATCH_SIZE = 25
+EBAY_INVENTORY_API = "/sell/inventory/v1"
+# Seconds another process may spend refreshing the shared token
+EBAY_TOKEN_REFRESH_LEASE = 30.0
+EBAY_AUTH_REQUIRED = (
+    "eBay authentication required. Please authorize the application first."
+)
+
+# Item.condition -> Inventory API ConditionEnum
+EBAY_CONDITIONS = {
+    "New": "NEW",
+    "Used": "USED_EXCELLENT",
+    "Refurbished": "SELLER_REFURBISHED",
+    "Other": "USED_GOOD",
+}
+
+# _prepare_ebay_data fields stored on the inventory item and on the offer
+EBAY_INVENTORY_FIELDS = {
+    "title",
+    "description",
+    "images",
+    "condition",
+    "quantity",
+    "weight",
+    "dimensions",
+}
+EBAY_OFFER_FIELDS = {"price", "quantity", "category", "description", "shipping"}
+
+ListingCallback = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[None]]
+
 
 class EbayService:
-    """eBay API integration service"""
+    """eBay API integration service
+
+    The user token lives in ``tokens``, shared by every API and worker
+    process. It is renewed with the refresh token shortly before it expires,
+    by ``run_token_refresher`` or by the first call that finds it expiring;
+    concurrent callers wait for one refresh instead of each starting one.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        tokens: Optional[TokenRepository] = None,
+    ):
         self.connected = bool(
             ebay_settings.EBAY_APP_ID
             and ebay_settings.EBAY_CERT_ID
@@ -20,32 +68,402 @@ class EbayService:
         )
         self.access_token: Optional[str] = None  # In-memory token storage
         self.token_expiry: Optional[float] = None  # Unix timestamp
+        self.refresh_token: Optional[str] = None
+        self.tokens = tokens  # Shared encrypted token store
+        self._refreshing: Optional[asyncio.Task] = None
+        self.client = client  # Pooled client, opened in main.lifespan
 
     def is_connected(self) -> bool:
         """Check if eBay API is configured"""
         return self.connected
 
+    def open_client(self) -> httpx.AsyncClient:
+        """Create the pooled HTTP client used for all eBay API calls"""
+        self.client = create_client(
+            base_url=ebay_settings.EBAY_API_BASE_URL,
+            event_hooks=rate_limiter.event_hooks("ebay", ebay_settings.EBAY_APP_ID),
+        )
+        return self.client
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Pooled HTTP client, opened on first use outside the app lifespan"""
+        if self.client is None or self.client.is_closed:
+            return self.open_client()
+        return self.client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client"""
+        if self.client is not None:
+            await self.client.aclose()
+
     def _is_token_valid(self) -> bool:
         """Check if current token is valid and not expired"""
         if not self.access_token or not self.token_expiry:
             return False
         return time.time() < self.token_expiry
 
+    def _token_expires_soon(self) -> bool:
+        return not self.token_expiry or (
+            time.time() >= self.token_expiry - ebay_settings.EBAY_TOKEN_REFRESH_MARGIN
+        )
+
+    def store_token(self, token_data: Dict[str, Any]) -> None:
+        """Keep a token endpoint response in memory and in the token store"""
+        now = time.time()
+        self.access_token = token_data.get("access_token")
+        self.token_expiry = now + token_data.get("expires_in", 7200)
+        if token_data.get("refresh_token"):
+            self.refresh_token = token_data["refresh_token"]
+        if self.tokens is not None:
+            refresh_expires_in = token_data.get("refresh_token_expires_in")
+            self.tokens.save(
+                "ebay",
+                self.access_token,
+                self.token_expiry,
+                refresh_token=token_data.get("refresh_token"),
+                refresh_expires_at=(
+                    now + refresh_expires_in if refresh_expires_in else None
+                ),
+            )
+
+    def load_token(self) -> bool:
+        """Pick up the token stored by this or another process"""
+        stored = self.tokens.get("ebay") if self.tokens is not None else None
+        if stored is None:
+            return False
+        self.access_token = stored["access_token"]
+        self.token_expiry = stored["expires_at"]
+        self.refresh_token = stored["refresh_token"]
+        return True
+
+    async def ensure_token(self) -> bool:
+        """True when there is a valid access token, renewing it if it expires soon"""
+        if self._is_token_valid() and not self._token_expires_soon():
+            return True
+        await asyncio.to_thread(self.load_token)
+        if self._token_expires_soon() and self.refresh_token:
+            await self.refresh_access_token()
+        return self._is_token_valid()
+
+    async def refresh_access_token(self) -> bool:
+        """Renew the access token; concurrent callers share one refresh"""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._refresh_access_token())
+        return await asyncio.shield(self._refreshing)
+
+    async def _refresh_access_token(self) -> bool:
+        owner = f"{os.getpid()}:{id(self)}"
+        if self.tokens is not None:
+            claimed = await asyncio.to_thread(
+                self.tokens.claim_refresh, "ebay", owner, EBAY_TOKEN_REFRESH_LEASE
+            )
+            if not claimed:
+                # Another process is refreshing; wait for the token it stores
+                deadline = time.monotonic() + EBAY_TOKEN_REFRESH_LEASE
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(0.5)
+                    await asyncio.to_thread(self.load_token)
+                    if not self._token_expires_soon():
+                        return True
+                return self._is_token_valid()
+
+        try:
+            # The previous lease holder may have just stored a fresh token
+            if self.tokens is not None:
+                await asyncio.to_thread(self.load_token)
+                if not self._token_expires_soon():
+                    return True
+            response = await resilience.call(
+                "ebay",
+                lambda: self.http.post(
+                    ebay_settings.EBAY_OAUTH_TOKEN_URL,
+                    data={
+                        "grant_type": "refresh_token",
+                        "refresh_token": self.refresh_token,
+                        "scope": " ".join(ebay_settings.EBAY_OAUTH_SCOPES),
+                    },
+                    headers={
+                        "Content-Type": "application/x-www-form-urlencoded",
+                        "Authorization": f"Basic {self._get_basic_auth()}",
+                    },
+                ),
+            )
+            if response.status_code != 200:
+                print(
+                    f"⚠️  eBay token refresh failed: {response.status_code} - {response.text}"
+                )
+                return False
+            await asyncio.to_thread(self.store_token, response.json())
+            return True
+        except Exception as e:
+            print(f"⚠️  eBay token refresh failed: {e}")
+            return False
+        finally:
+            if self.tokens is not None:
+                await asyncio.to_thread(self.tokens.release_refresh, "ebay", owner)
+
+    async def run_token_refresher(self) -> None:
+        """Background task that renews the access token before it expires"""
+        if not self.connected:
+            return
+        while True:
+            delay = ebay_settings.EBAY_TOKEN_REFRESH_RETRY
+            try:
+                await asyncio.to_thread(self.load_token)
+                if self.refresh_token and self.token_expiry is not None:
+                    delay = (
+                        self.token_expiry
+                        - ebay_settings.EBAY_TOKEN_REFRESH_MARGIN
+                        - time.time()
+                    )
+                    if delay <= 0:
+                        refreshed = await self.refresh_access_token()
+                        delay = (
+                            1.0 if refreshed else ebay_settings.EBAY_TOKEN_REFRESH_RETRY
+                        )
+            except Exception as e:
+                print(f"⚠️  eBay token refresher error: {e}")
+            await asyncio.sleep(max(1.0, delay))
+
     async def create_listing(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """Create a listing on eBay"""
         if not self.connected:
             # Mock implementation
             return await self._mock_create_listing(item)
 
-        if not self._is_token_valid():
+        if not await self.ensure_token():
+            return {"success": False, "error": EBAY_AUTH_REQUIRED}
+
+        results = await self.create_listings([item])
+        return results[item["id"]]
+
+    async def create_listings(
+        self,
+        items: List[Dict[str, Any]],
+        on_result: Optional[ListingCallback] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Create many listings through the Inventory API bulk endpoints
+
+        Items are grouped into chunks of EBAY_BULK_BATCH_SIZE, and chunks are
+        sent concurrently (up to the eBay publish concurrency). Each chunk
+        takes three requests: bulkCreateOrReplaceInventoryItem,
+        bulkCreateOffer and bulkPublishOffer, keyed by SKU (the item id).
+        Returns a create_listing style result per item id; ``on_result`` is
+        awaited for every item as soon as its chunk finishes.
+        """
+        limit = asyncio.Semaphore(
+            max(1, app_settings.PUBLISH_PLATFORM_CONCURRENCY.get("ebay", 1))
+        )
+        results: Dict[str, Dict[str, Any]] = {}
+
+        async def publish_chunk(chunk: List[Dict[str, Any]]) -> None:
+            async with limit:
+                chunk_results = await self._create_listing_batch(chunk)
+            for item in chunk:
+                result = chunk_results[item["id"]]
+                results[item["id"]] = result
+                if on_result is not None:
+                    await on_result(item, result)
+
+        await asyncio.gather(
+            *(
+                publish_chunk(items[start : start + EBAY_BULK_BATCH_SIZE])
+                for start in range(0, len(items), EBAY_BULK_BATCH_SIZE)
+            )
+        )
+        return results
+
+    async def _create_listing_batch(
+        self, items: List[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Create listings for one chunk of at most EBAY_BULK_BATCH_SIZE items"""
+        if not self.connected:
+            mocked = await asyncio.gather(
+                *(self._mock_create_listing(item) for item in items)
+            )
+            return {item["id"]: result for item, result in zip(items, mocked)}
+
+        if not await self.ensure_token():
             return {
-                "success": False,
-                "error": "eBay authentication required. Please authorize the application first.",
+                item["id"]: {"success": False, "error": EBAY_AUTH_REQUIRED}
+                for item in items
+            }
+
+        try:
+            return await self._bulk_publish(items)
+        except Exception as e:
+            return {
+                item["id"]: {
+                    "success": False,
+                    "error": f"Failed to create listing: {str(e)}",
+                }
+                for item in items
             }
 
-        # Real eBay API implementation would go here
-        # For now, return mock response
-        return await self._mock_create_listing(item)
+    async def _bulk_publish(
+        self, items: List[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run the inventory item -> offer -> publish steps for one chunk"""
+        by_sku = {item["id"]: item for item in items}
+        results: Dict[str, Dict[str, Any]] = {}
+
+        skus = []
+        for response in await self._bulk_request(
+            "bulk_create_or_replace_inventory_item",
+            [self._prepare_inventory_item(item) for item in items],
+        ):
+            if self._bulk_succeeded(response):
+                skus.append(response.get("sku"))
+            else:
+                results[response.get("sku")] = self._bulk_failure(
+                    response, "inventory item"
+                )
+
+        offers: Dict[str, str] = {}  # offerId -> SKU
+        if skus:
+            for response in await self._bulk_request(
+                "bulk_create_offer",
+                [self._prepare_offer(by_sku[sku]) for sku in skus if sku in by_sku],
+            ):
+                if self._bulk_succeeded(response) and response.get("offerId"):
+                    offers[response["offerId"]] = response.get("sku")
+                else:
+                    results[response.get("sku")] = self._bulk_failure(response, "offer")
+
+        if offers:
+            for response in await self._bulk_request(
+                "bulk_publish_offer", [{"offerId": offer_id} for offer_id in offers]
+            ):
+                sku = offers.get(response.get("offerId"))
+                listing_id = response.get("listingId")
+                if self._bulk_succeeded(response) and listing_id:
+                    results[sku] = {
+                        "success": True,
+                        "external_id": listing_id,
+                        "url": f"{ebay_settings.EBAY_ITEM_URL}/{listing_id}",
+                        "message": "Item successfully listed on eBay",
+                    }
+                else:
+                    results[sku] = self._bulk_failure(response, "publish")
+
+        for sku in by_sku:
+            results.setdefault(
+                sku, {"success": False, "error": "eBay returned no result for item"}
+            )
+        return results
+
+    async def _bulk_request(
+        self, method: str, requests: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """POST one Inventory API bulk call and return its per-entry responses"""
+        response = await resilience.call(
+            "ebay",
+            lambda: self.http.post(
+                f"{EBAY_INVENTORY_API}/{method}",
+                json={"requests": requests},
+                headers=self._api_headers(),
+            ),
+            # Inventory items are replaced by SKU; offers must not be duplicated
+            idempotent=method == "bulk_create_or_replace_inventory_item",
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+
+        # 207 Multi-Status (and 400 when every entry failed) carry per-entry results
+        if "responses" in body:
+            return body["responses"]
+        response.raise_for_status()
+        return []
+
+    def _api_headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Language": ebay_settings.EBAY_CONTENT_LANGUAGE,
+        }
+
+    def _bulk_succeeded(self, response: Dict[str, Any]) -> bool:
+        return 200 <= int(response.get("statusCode") or 0) < 300
+
+    def _bulk_failure(self, response: Dict[str, Any], step: str) -> Dict[str, Any]:
+        messages = [
+            error.get("longMessage") or error.get("message") or ""
+            for error in response.get("errors") or []
+        ]
+        message = "; ".join(m for m in messages if m) or (
+            f"status {response.get('statusCode')}"
+        )
+        return {"success": False, "error": f"eBay {step} failed: {message}"}
+
+    def _prepare_inventory_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Inventory item entry for bulkCreateOrReplaceInventoryItem"""
+        data = self._prepare_ebay_data(item)
+        condition = getattr(data["condition"], "value", data["condition"])
+        inventory_item = {
+            "sku": item["id"],
+            "locale": ebay_settings.EBAY_CONTENT_LANGUAGE.replace("-", "_"),
+            "condition": EBAY_CONDITIONS.get(condition, "NEW"),
+            "availability": {
+                "shipToLocationAvailability": {"quantity": data["quantity"]}
+            },
+            "product": {
+                "title": data["title"][:80],
+                "description": data["description"],
+                "imageUrls": data["images"],
+            },
+        }
+
+        dimensions = data["dimensions"] or {}
+        package = {}
+        if data["weight"]:
+            package["weight"] = {"value": data["weight"], "unit": "POUND"}
+        if any(dimensions.get(side) for side in ("length", "width", "height")):
+            package["dimensions"] = {
+                "length": dimensions.get("length", 0),
+                "width": dimensions.get("width", 0),
+                "height": dimensions.get("height", 0),
+                "unit": "INCH",
+            }
+        if package:
+            inventory_item["packageWeightAndSize"] = package
+        return inventory_item
+
+    def _prepare_offer(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Fixed-price offer entry for bulkCreateOffer"""
+        data = self._prepare_ebay_data(item)
+        offer = {
+            "sku": item["id"],
+            "marketplaceId": ebay_settings.EBAY_MARKETPLACE_ID,
+            "format": "FIXED_PRICE",
+            "availableQuantity": data["quantity"],
+            "listingDescription": data["description"],
+            "pricingSummary": {
+                "price": {
+                    "value": f"{float(data['price']):.2f}",
+                    "currency": ebay_settings.EBAY_CURRENCY,
+                }
+            },
+        }
+
+        category = str(data["category"] or "")
+        category_id = category if category.isdigit() else None
+        category_id = category_id or ebay_settings.EBAY_DEFAULT_CATEGORY_ID
+        if category_id:
+            offer["categoryId"] = category_id
+        if ebay_settings.EBAY_MERCHANT_LOCATION_KEY:
+            offer["merchantLocationKey"] = ebay_settings.EBAY_MERCHANT_LOCATION_KEY
+
+        policies = {
+            "fulfillmentPolicyId": ebay_settings.EBAY_FULFILLMENT_POLICY_ID,
+            "paymentPolicyId": ebay_settings.EBAY_PAYMENT_POLICY_ID,
+            "returnPolicyId": ebay_settings.EBAY_RETURN_POLICY_ID,
+        }
+        policies = {key: value for key, value in policies.items() if value}
+        if policies:
+            offer["listingPolicies"] = policies
+        return offer
 
     async def _mock_create_listing(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """Mock eBay listing creation"""
@@ -66,20 +484,81 @@ class EbayService:
             return {"success": False, "error": f"Failed to create listing: {str(e)}"}
 
     async def update_listing(
-        self, item: Dict[str, Any], listing_id: str
+        self,
+        item: Dict[str, Any],
+        listing_id: str,
+        fields: Optional[List[str]] = None,
     ) -> Dict[str, Any]:
-        """Update an existing eBay listing"""
+        """Update an existing eBay listing
+
+        ``fields`` names the ``_prepare_ebay_data`` fields that changed (None
+        means all of them); the inventory item and the offer are only
+        replaced when one of their fields changed.
+        """
         if not self.connected:
             return await self._mock_update_listing(item, listing_id)
 
-        if not self._is_token_valid():
-            return {
-                "success": False,
-                "error": "eBay authentication required. Please authorize the application first.",
-            }
+        if not await self.ensure_token():
+            return {"success": False, "error": EBAY_AUTH_REQUIRED}
 
-        # Real implementation would go here
-        return await self._mock_update_listing(item, listing_id)
+        changed = (
+            EBAY_INVENTORY_FIELDS | EBAY_OFFER_FIELDS if fields is None else set(fields)
+        )
+        try:
+            if changed & EBAY_INVENTORY_FIELDS:
+                responses = await self._bulk_request(
+                    "bulk_create_or_replace_inventory_item",
+                    [self._prepare_inventory_item(item)],
+                )
+                if not responses or not self._bulk_succeeded(responses[0]):
+                    return self._bulk_failure(
+                        responses[0] if responses else {}, "inventory item"
+                    )
+            if changed & EBAY_OFFER_FIELDS:
+                await self._update_offer(item)
+        except Exception as e:
+            return {"success": False, "error": f"Failed to update listing: {str(e)}"}
+
+        return {
+            "success": True,
+            "external_id": listing_id,
+            "url": f"{ebay_settings.EBAY_ITEM_URL}/{listing_id}",
+            "message": "Item successfully updated on eBay",
+        }
+
+    async def _update_offer(self, item: Dict[str, Any]) -> None:
+        """Replace the published offer of an item's SKU"""
+        response = await resilience.call(
+            "ebay",
+            lambda: self.http.get(
+                f"{EBAY_INVENTORY_API}/offer",
+                params={
+                    "sku": item["id"],
+                    "marketplace_id": ebay_settings.EBAY_MARKETPLACE_ID,
+                },
+                headers=self._api_headers(),
+            ),
+        )
+        response.raise_for_status()
+        offers = response.json().get("offers") or []
+        if not offers:
+            raise ValueError(f"no eBay offer found for SKU {item['id']}")
+
+        # updateOffer replaces the whole offer; these fields cannot change
+        offer = {
+            key: value
+            for key, value in self._prepare_offer(item).items()
+            if key not in ("sku", "marketplaceId", "format")
+        }
+        response = await resilience.call(
+            "ebay",
+            lambda: self.http.put(
+                f"{EBAY_INVENTORY_API}/offer/{offers[0]['offerId']}",
+                json=offer,
+                headers=self._api_headers(),
+            ),
+        )
+        response.raise_for_status()
 
     async def _mock_update_listing(
         self, item: Dict[str, Any], listing_id: str
@@ -102,7 +581,7 @@ class EbayService:
         if not self.connected:
             return await self._mock_delete_listing(listing_id)
 
-        if not self._is_token_valid():
+        if not await self.ensure_token():
             return {
                 "success": False,
                 "error": "eBay authentication required. Please authorize the application first.",
@@ -129,7 +608,9 @@ class EbayService:
             "quantity": item.get("quantity", 1),
             "category": item.get("category", "General"),
             "condition": item.get("condition", "New"),
-            "images": item.get("images", []),
+            "images": [
+                image_variant_url(url, "ebay") for url in item.get("images", [])
+            ],
             "weight": item.get("weight", 0),
             "dimensions": item.get("dimensions", {}),
             "shipping": item.get("shipping", {}),
@@ -169,20 +650,19 @@ class EbayService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(token_url, data=data, headers=headers)
-                if response.status_code == 200:
-                    token_data = response.json()
-                    self.access_token = token_data.get("access_token")
-                    # Store actual expiration time (current time + expires_in seconds)
-                    expires_in = token_data.get("expires_in", 7200)  # Default 2 hours
-                    self.token_expiry = time.time() + expires_in
-                    return {"success": True, "token": self.access_token}
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Token exchange failed: {response.status_code} - {response.text}",
-                    }
+            response = await resilience.call(
+                "ebay",
+                lambda: self.http.post(token_url, data=data, headers=headers),
+                idempotent=False,
+            )
+            if response.status_code == 200:
+                await asyncio.to_thread(self.store_token, response.json())
+                return {"success": True, "token": self.access_token}
+            else:
+                return {
+                    "success": False,
+                    "error": f"Token exchange failed: {response.status_code} - {response.text}",
+                }
         except Exception as e:
             return {"success": False, "error": f"Token exchange error: {str(e)}"}
 
@@ -196,3 +676,10 @@ class EbayService:
         """Clear stored authentication token"""
         self.access_token = None
         self.token_expiry = None
+        self.refresh_token = None
+        if self.tokens is not None:
+            self.tokens.delete("ebay")
+
+
+# Shared service instance
+ebay_service = EbayService(tokens=token_repository)
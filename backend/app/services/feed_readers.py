@@ -0,0 +1,169 @@
+import importlib
+import zipfile
+from itertools import islice
+from typing import IO, Callable, Dict, Iterable, Iterator, Optional
+
+import pandas as pd
+
+# Leading bytes of each binary feed format
+PARQUET_MAGIC = b"PAR1"
+ARROW_FILE_MAGIC = b"ARROW1"
+ARROW_STREAM_MAGIC = b"\xff\xff\xff\xff"  # IPC continuation marker
+ZIP_MAGIC = b"PK\x03\x04"
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"  # Legacy .xls
+
+FORMAT_LABELS = {
+    "csv": "CSV",
+    "xlsx": "Excel",
+    "parquet": "Parquet",
+    "arrow": "Arrow",
+    "arrow_stream": "Arrow",
+}
+
+
+class FeedFormatError(ValueError):
+    """Raised for feeds in an unknown format, or one this install cannot read"""
+
+
+def detect_format(file: IO[bytes]) -> str:
+    """Feed format from the file's leading bytes; the file is left at 0"""
+    file.seek(0)
+    head = file.read(8)
+    file.seek(0)
+    if head.startswith(PARQUET_MAGIC):
+        return "parquet"
+    if head.startswith(ARROW_FILE_MAGIC):
+        return "arrow"
+    if head.startswith(ARROW_STREAM_MAGIC):
+        return "arrow_stream"
+    if head.startswith(ZIP_MAGIC):
+        try:
+            with zipfile.ZipFile(file) as archive:
+                is_workbook = "xl/workbook.xml" in archive.namelist()
+        except zipfile.BadZipFile:
+            is_workbook = False
+        file.seek(0)
+        if is_workbook:
+            return "xlsx"
+        raise FeedFormatError("Zip file is not an Excel (.xlsx) workbook")
+    if head.startswith(OLE_MAGIC):
+        raise FeedFormatError("Legacy .xls files are not supported, save as .xlsx")
+    if b"\0" in head:
+        raise FeedFormatError("Unsupported file format")
+    return "csv"
+
+
+def _frames(
+    rows: Iterable, columns: Iterable[str], chunk_size: int
+) -> Iterator[pd.DataFrame]:
+    """Group row tuples into DataFrames numbered on from the previous chunk"""
+    columns = list(columns)
+    rows = iter(rows)
+    start = 0
+    while True:
+        batch = list(islice(rows, chunk_size))
+        if not batch:
+            return
+        yield pd.DataFrame(
+            batch, columns=columns, index=pd.RangeIndex(start, start + len(batch))
+        )
+        start += len(batch)
+
+
+def read_csv(file: IO[bytes], chunk_size: int) -> Iterator[pd.DataFrame]:
+    try:
+        reader = pd.read_csv(file, chunksize=chunk_size, encoding="utf-8")
+    except pd.errors.EmptyDataError:
+        return
+    with reader:
+        yield from reader
+
+
+def read_xlsx(file: IO[bytes], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Rows of the first worksheet, streamed by openpyxl's read-only mode"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise FeedFormatError("Excel uploads need openpyxl (pip install openpyxl)")
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        # Trailing empty header cells and fully blank rows are formatting
+        width = max(
+            (n + 1 for n, name in enumerate(header) if name is not None), default=0
+        )
+        columns = [str(name) if name is not None else "" for name in header[:width]]
+        rows = (row[:width] for row in rows if any(value is not None for value in row))
+        yield from _frames(rows, columns, chunk_size)
+    finally:
+        workbook.close()
+
+
+def _pyarrow(module: str):
+    try:
+        return importlib.import_module(f"pyarrow.{module}")
+    except ImportError:
+        raise FeedFormatError(
+            "Parquet and Arrow uploads need pyarrow (pip install pyarrow)"
+        )
+
+
+def _arrow_frames(batches: Iterable, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Convert Arrow record batches into DataFrames of ``chunk_size`` rows"""
+    types = _pyarrow("types")
+    start = 0
+    for batch in batches:
+        for offset in range(0, batch.num_rows, chunk_size):
+            part = batch.slice(offset, chunk_size)
+            frame = part.to_pandas()
+            # List columns (images, tags) as Python lists, not numpy arrays
+            for n, field in enumerate(part.schema):
+                if types.is_list(field.type) or types.is_large_list(field.type):
+                    frame[field.name] = part.column(n).to_pylist()
+            frame.index = pd.RangeIndex(start, start + len(frame))
+            start += len(frame)
+            yield frame
+
+
+def read_parquet(file: IO[bytes], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Row groups read as record batches, never the whole file at once"""
+    parquet = _pyarrow("parquet")
+    with parquet.ParquetFile(file) as reader:
+        yield from _arrow_frames(reader.iter_batches(batch_size=chunk_size), chunk_size)
+
+
+def read_arrow(file: IO[bytes], chunk_size: int) -> Iterator[pd.DataFrame]:
+    ipc = _pyarrow("ipc")
+    reader = ipc.open_file(file)
+    yield from _arrow_frames(
+        (reader.get_batch(n) for n in range(reader.num_record_batches)), chunk_size
+    )
+
+
+def read_arrow_stream(file: IO[bytes], chunk_size: int) -> Iterator[pd.DataFrame]:
+    ipc = _pyarrow("ipc")
+    with ipc.open_stream(file) as reader:
+        yield from _arrow_frames(reader, chunk_size)
+
+
+# Format -> reader yielding DataFrame chunks with a running 0-based row index
+FEED_READERS: Dict[str, Callable[[IO[bytes], int], Iterator[pd.DataFrame]]] = {
+    "csv": read_csv,
+    "xlsx": read_xlsx,
+    "parquet": read_parquet,
+    "arrow": read_arrow,
+    "arrow_stream": read_arrow_stream,
+}
+
+
+def read_feed(
+    file: IO[bytes], chunk_size: int, feed_format: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """DataFrame chunks of a feed file, in its detected format"""
+    feed_format = feed_format or detect_format(file)
+    file.seek(0)
+    return FEED_READERS[feed_format](file, chunk_size)
@@ -0,0 +1,36 @@
+import importlib.util
+from typing import Dict, Optional
+
+import httpx
+
+from app.settings.config import app_settings
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install httpx[http2])"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_client(
+    base_url: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    event_hooks: Optional[Dict[str, list]] = None,
+) -> httpx.AsyncClient:
+    """Create a pooled, keep-alive async HTTP client for one platform"""
+    http2 = app_settings.HTTP2_ENABLED
+    if http2 and not http2_available():
+        print("⚠️  HTTP2_ENABLED is set but h2 is not installed, using HTTP/1.1")
+        http2 = False
+
+    return httpx.AsyncClient(
+        base_url=base_url or "",
+        headers=headers,
+        event_hooks=event_hooks,
+        http2=http2,
+        timeout=httpx.Timeout(app_settings.HTTP_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=app_settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=app_settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=app_settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
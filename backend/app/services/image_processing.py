@@ -0,0 +1,224 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import UploadFile
+from PIL import Image, ImageOps
+
+from app.repositories.image_store import ImageStore, image_store
+from app.settings.config import app_settings
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+IMAGES_URL_PATH = "/uploads/images"
+
+
+class FileTooLargeError(ValueError):
+    """Raised when an upload is larger than MAX_FILE_SIZE"""
+
+
+def resize_image(
+    source: str, output_dir: str, sizes: Dict[str, int], quality: int
+) -> Dict[str, Dict[str, Any]]:
+    """Write a JPEG of ``source`` per variant, fitted to its longest side
+
+    Runs in a worker process, so it only takes and returns plain data.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P"):
+            # JPEG has no alpha; flatten transparent images onto white
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        else:
+            image = image.convert("RGB")
+
+        variants = {}
+        for name, longest_side in sizes.items():
+            variant = image.copy()
+            variant.thumbnail((longest_side, longest_side), Image.LANCZOS)
+            filename = f"{name}.jpg"
+            path = os.path.join(output_dir, filename)
+            variant.save(path, "JPEG", quality=quality, optimize=True, progressive=True)
+            variants[name] = {
+                "filename": filename,
+                "width": variant.width,
+                "height": variant.height,
+                "bytes": os.path.getsize(path),
+            }
+        return variants
+
+
+def image_variant_url(url: str, platform: str) -> str:
+    """URL of an uploaded image's variant for a platform; other URLs unchanged"""
+    prefix = f"{app_settings.PUBLIC_BASE_URL.rstrip('/')}{IMAGES_URL_PATH}/"
+    if not url.startswith(prefix) or platform not in app_settings.IMAGE_PLATFORM_SIZES:
+        return url
+    return f"{url.rsplit('/', 1)[0]}/{platform}.jpg"
+
+
+class ImageProcessor:
+    """Store uploaded images and resize them in a process pool
+
+    Uploads are streamed to ``upload_dir/incoming`` while being hashed, and
+    resized in worker processes (``workers``, default one per core) to each
+    platform's preferred size plus a thumbnail, under
+    ``upload_dir/images/<sha256>/``. A file that is already in ``store`` is
+    not resized again; it gets the stored variants. The event loop only
+    copies bytes; all decoding and encoding happens in the pool, so large
+    photo batches use every core.
+    """
+
+    def __init__(
+        self,
+        upload_dir: str,
+        sizes: Dict[str, int],
+        quality: int = 85,
+        workers: int = 0,
+        store: Optional[ImageStore] = None,
+    ):
+        self.upload_dir = upload_dir
+        self.sizes = sizes
+        self.quality = quality
+        self.workers = workers or os.cpu_count() or 1
+        self.store = store or ImageStore(upload_dir)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def save_upload(self, file: UploadFile, max_size: int) -> Tuple[str, str]:
+        """Stream an upload to a temporary file, enforcing ``max_size``
+
+        Returns the file's path and its sha256 hex digest.
+        """
+        incoming = os.path.join(self.upload_dir, "incoming")
+        os.makedirs(incoming, exist_ok=True)
+        path = os.path.join(incoming, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        written = 0
+        try:
+            with open(path, "wb") as out:
+                while True:
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > max_size:
+                        raise FileTooLargeError(
+                            f"File is larger than {max_size // (1024 * 1024)}MB"
+                        )
+                    digest.update(chunk)
+                    await asyncio.to_thread(out.write, chunk)
+        except BaseException:
+            os.unlink(path)
+            raise
+        return path, digest.hexdigest()
+
+    async def process(self, source: str, digest: str) -> Dict[str, Any]:
+        """Store a saved upload's variants, once per content, and return their URLs"""
+        # Identical uploads in one request wait for the first to be resized
+        lock = self._locks.setdefault(digest, asyncio.Lock())
+        try:
+            async with lock:
+                stored = await asyncio.to_thread(self.store.reuse, digest)
+                deduplicated = stored is not None
+                if deduplicated:
+                    variants = stored["variants"]
+                else:
+                    variants = await self._resize(source, digest)
+                    await asyncio.to_thread(
+                        self.store.register, digest, os.path.getsize(source), variants
+                    )
+        finally:
+            if not lock.locked() and self._locks.get(digest) is lock:
+                del self._locks[digest]
+            os.unlink(source)
+
+        base_url = (
+            f"{app_settings.PUBLIC_BASE_URL.rstrip('/')}{IMAGES_URL_PATH}/{digest}"
+        )
+        variants = {
+            name: {
+                **{key: value for key, value in variant.items() if key != "filename"},
+                "url": f"{base_url}/{variant['filename']}",
+            }
+            for name, variant in variants.items()
+        }
+        # Item.images keeps the largest variant; platforms get their own size
+        largest = max(self.sizes, key=self.sizes.get)
+        return {
+            "id": digest,
+            "url": variants[largest]["url"],
+            "variants": variants,
+            "deduplicated": deduplicated,
+        }
+
+    async def _resize(self, source: str, digest: str) -> Dict[str, Dict[str, Any]]:
+        """Resize into a scratch directory, then move it into place"""
+        output_dir = self.store.image_dir(digest)
+        scratch = os.path.join(
+            self.upload_dir, "incoming", f"{digest}.{uuid.uuid4().hex}"
+        )
+        sizes = {**self.sizes, "thumbnail": app_settings.IMAGE_THUMBNAIL_SIZE}
+        try:
+            variants = await asyncio.get_running_loop().run_in_executor(
+                self.executor, resize_image, source, scratch, sizes, self.quality
+            )
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            shutil.rmtree(scratch, ignore_errors=True)
+            raise ValueError(f"Not a readable image: {type(e).__name__}") from e
+
+        os.makedirs(os.path.dirname(output_dir), exist_ok=True)
+        try:
+            os.rename(scratch, output_dir)
+        except OSError:
+            # Another process stored the same content first
+            shutil.rmtree(scratch, ignore_errors=True)
+        return variants
+
+    async def process_uploads(
+        self, files: List[UploadFile], max_size: int
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Save and resize several uploads; returns images and per-file errors"""
+
+        async def handle(file: UploadFile) -> Dict[str, Any]:
+            if not (file.content_type or "").startswith("image/"):
+                raise ValueError("Only image files are allowed")
+            return await self.process(*await self.save_upload(file, max_size))
+
+        results = await asyncio.gather(
+            *(handle(file) for file in files), return_exceptions=True
+        )
+        images, errors = [], []
+        for file, result in zip(files, results):
+            if isinstance(result, BaseException):
+                errors.append({"filename": file.filename, "error": str(result)})
+            else:
+                images.append({"filename": file.filename, **result})
+        return {"images": images, "errors": errors}
+
+
+image_processor = ImageProcessor(
+    app_settings.UPLOAD_DIR,
+    app_settings.IMAGE_PLATFORM_SIZES,
+    quality=app_settings.IMAGE_JPEG_QUALITY,
+    workers=app_settings.IMAGE_WORKERS,
+    store=image_store,
+)
@@ -0,0 +1,230 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+from PIL import ImageFile
+
+from app.services.http_clients import create_client
+from app.settings.config import app_settings
+
+
+class ImageVerifier:
+    """Check that image URLs resolve to images before they are published
+
+    Each URL is fetched with a ranged GET of its first ``probe_bytes`` bytes,
+    which is enough for the status, content type, total size and the
+    dimensions from the image header. At most ``max_concurrency`` checks run
+    at once. Results are cached per URL for ``ttl`` seconds (failures for
+    ``failure_ttl``) in an LRU of ``cache_size`` entries, and concurrent
+    checks of the same URL share one request, so supplier images used by
+    many items are fetched once.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 20,
+        cache_size: int = 10000,
+        ttl: float = 3600.0,
+        failure_ttl: float = 300.0,
+        probe_bytes: int = 64 * 1024,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.probe_bytes = probe_bytes
+        self.client = client  # Pooled client, opened in main.lifespan
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._limit: Optional[asyncio.Semaphore] = None
+        self.hits = 0
+        self.misses = 0
+
+    def open_client(self) -> httpx.AsyncClient:
+        """Create the pooled HTTP client used to fetch images"""
+        self.client = create_client()
+        return self.client
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Pooled HTTP client, opened on first use outside the app lifespan"""
+        if self.client is None or self.client.is_closed:
+            return self.open_client()
+        return self.client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client"""
+        if self.client is not None:
+            await self.client.aclose()
+
+    def _cached(self, url: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(url)
+        if entry is None:
+            return None
+        expires, info = entry
+        if time.monotonic() >= expires:
+            del self._cache[url]
+            return None
+        self._cache.move_to_end(url)
+        return info
+
+    def _store(self, url: str, info: Dict[str, Any]) -> None:
+        if self.cache_size <= 0:
+            return
+        ttl = self.ttl if info["ok"] else self.failure_ttl
+        self._cache[url] = (time.monotonic() + ttl, info)
+        self._cache.move_to_end(url)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def verify(self, url: str) -> Dict[str, Any]:
+        """Status, content type, size and dimensions of one image URL"""
+        info = self._cached(url)
+        if info is not None:
+            self.hits += 1
+            return info
+
+        if url in self._in_flight:
+            self.hits += 1
+            return await asyncio.shield(self._in_flight[url])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[url] = future
+        try:
+            info = await self._check(url)
+            self._store(url, info)
+            future.set_result(info)
+            return info
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved here if nobody else is waiting
+            raise
+        finally:
+            del self._in_flight[url]
+
+    async def verify_many(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Check several URLs concurrently; each URL is checked once"""
+        unique = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(self.verify(url) for url in unique))
+        return dict(zip(unique, results))
+
+    async def broken_images(
+        self, items: List[Dict[str, Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Failed checks for the images of each item, by item ID"""
+        results = await self.verify_many(
+            url for item in items for url in item.get("images") or []
+        )
+        broken = {}
+        for item in items:
+            failed = [
+                results[url]
+                for url in item.get("images") or []
+                if not results[url]["ok"]
+            ]
+            if failed:
+                broken[item["id"]] = failed
+        return broken
+
+    async def _check(self, url: str) -> Dict[str, Any]:
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self.max_concurrency)
+
+        info: Dict[str, Any] = {
+            "url": url,
+            "ok": False,
+            "status": None,
+            "content_type": None,
+            "size": None,
+            "width": None,
+            "height": None,
+            "error": None,
+            "checked_at": datetime.utcnow().isoformat(),
+        }
+        async with self._limit:
+            try:
+                async with self.http.stream(
+                    "GET",
+                    url,
+                    headers={"Range": f"bytes=0-{self.probe_bytes - 1}"},
+                    follow_redirects=True,
+                    timeout=app_settings.IMAGE_VERIFY_TIMEOUT,
+                ) as response:
+                    info["status"] = response.status_code
+                    if response.status_code >= 400:
+                        info["error"] = f"HTTP {response.status_code}"
+                        return info
+                    info["content_type"] = (
+                        response.headers.get("Content-Type", "").split(";")[0].strip()
+                        or None
+                    )
+                    info["size"] = self._total_size(response)
+                    # Servers that ignore Range send the whole file; stop early
+                    parser = ImageFile.Parser()
+                    read = 0
+                    async for chunk in response.aiter_bytes():
+                        parser.feed(chunk)
+                        read += len(chunk)
+                        if parser.image is not None or read >= self.probe_bytes:
+                            break
+            except httpx.HTTPError as e:
+                info["error"] = (
+                    f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+                )
+                return info
+
+        if parser.image is not None:
+            info["width"], info["height"] = parser.image.size
+        if not (info["content_type"] or "").startswith("image/"):
+            info["error"] = (
+                f"Not an image ({info['content_type'] or 'no content type'})"
+            )
+        elif parser.image is None:
+            info["error"] = "Unreadable image data"
+        else:
+            info["ok"] = True
+        return info
+
+    def _total_size(self, response: httpx.Response) -> Optional[int]:
+        """Full image size from Content-Range (206) or Content-Length (200)"""
+        content_range = response.headers.get("Content-Range", "")
+        if "/" in content_range:
+            total = content_range.rsplit("/", 1)[1]
+            return int(total) if total.isdigit() else None
+        length = response.headers.get("Content-Length", "")
+        return int(length) if length.isdigit() else None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "max_size": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "in_flight": len(self._in_flight),
+        }
+
+
+def image_errors(failed: List[Dict[str, Any]]) -> str:
+    """One-line summary of failed image checks"""
+    return "Image check failed: " + "; ".join(
+        f"{info['url']} ({info['error']})" for info in failed
+    )
+
+
+image_verifier = ImageVerifier(
+    max_concurrency=app_settings.IMAGE_VERIFY_CONCURRENCY,
+    cache_size=app_settings.IMAGE_VERIFY_CACHE_SIZE,
+    ttl=app_settings.IMAGE_VERIFY_TTL,
+    failure_ttl=app_settings.IMAGE_VERIFY_FAILURE_TTL,
+    probe_bytes=app_settings.IMAGE_VERIFY_PROBE_BYTES,
+)
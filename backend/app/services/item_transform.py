@@ -0,0 +1,314 @@
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import annotated_types
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_list_like
+from pydantic import BaseModel
+
+from app.models.item import ItemCreate
+from app.services.batch_validation import validate_batch
+
+TRUE_VALUES = ["true", "1", "yes"]
+
+# Column -> default for text and numeric CSV columns
+TEXT_COLUMNS = {
+    "title": "",
+    "description": "",
+    "category": "General",
+    "condition": "New",
+    "shipping_method": "Standard",
+}
+NUMERIC_COLUMNS = {
+    "price": 0.0,
+    "quantity": 1,
+    "weight": 0.0,
+    "length": 0.0,
+    "width": 0.0,
+    "height": 0.0,
+    "shipping_cost": 0.0,
+}
+
+
+def _text_column(df: pd.DataFrame, column: str, default: str) -> pd.Series:
+    if column not in df:
+        return pd.Series(default, index=df.index, dtype=object)
+    values = pd.Series(
+        [value.strip() for value in df[column].astype(str).to_numpy()],
+        index=df.index,
+        dtype=object,
+    )
+    return values.where(df[column].notna(), default)
+
+
+def _numeric_column(
+    df: pd.DataFrame, column: str, default: float, failed: pd.Series, reasons: Dict
+) -> pd.Series:
+    if column not in df:
+        return pd.Series(default, index=df.index, dtype=float)
+    values = pd.to_numeric(df[column], errors="coerce")
+    invalid = values.isna() & df[column].notna()
+    if invalid.any():
+        for index in df.index[invalid & ~failed]:
+            reasons[index] = f"Invalid {column}: {df.at[index, column]!r}"
+        failed[invalid] = True
+    return values.fillna(default).astype(float)
+
+
+def _bool_column(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df:
+        return pd.Series(False, index=df.index)
+    return df[column].astype(str).str.strip().str.lower().isin(TRUE_VALUES)
+
+
+def _list_column(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df:
+        return pd.Series([[] for _ in range(len(df))], index=df.index, dtype=object)
+    values = df[column]
+    if values.dtype == object and values.map(is_list_like).any():
+        # Columnar feeds (Parquet, Arrow) hold lists rather than "a,b" text
+        parts = values.map(
+            lambda value: (
+                [str(part) for part in value if part is not None]
+                if is_list_like(value)
+                else str(value).split(",") if pd.notna(value) else []
+            )
+        )
+        return pd.Series(
+            [[part.strip() for part in value if part.strip()] for value in parts],
+            index=df.index,
+            dtype=object,
+        )
+    text = values.fillna("").astype(str).to_numpy()
+    return pd.Series(
+        [[part for part in map(str.strip, value.split(",")) if part] for value in text],
+        index=df.index,
+        dtype=object,
+    )
+
+
+# Model settings and decorators that change what validation accepts or returns
+_UNCHECKED_CONFIG = (
+    "strict",
+    "str_strip_whitespace",
+    "str_to_lower",
+    "str_to_upper",
+    "str_min_length",
+    "str_max_length",
+    "use_enum_values",
+)
+_UNCHECKED_DECORATORS = (
+    "validators",
+    "field_validators",
+    "root_validators",
+    "model_validators",
+    "field_serializers",
+    "model_serializers",
+    "computed_fields",
+)
+_BOUNDS = {
+    annotated_types.Gt: lambda values, rule: values > rule.gt,
+    annotated_types.Ge: lambda values, rule: values >= rule.ge,
+    annotated_types.Lt: lambda values, rule: values < rule.lt,
+    annotated_types.Le: lambda values, rule: values <= rule.le,
+}
+
+
+def _accepted_rows(
+    model: Type[BaseModel], columns: Dict[str, Any]
+) -> Optional[np.ndarray]:
+    """Rows that ``model`` accepts as they are, checked column by column
+
+    ``columns`` holds a Series of already coerced values per field (a dict
+    of them for nested models). Bounds, lengths and enum values are
+    compared on whole columns. Returns None when the model has rules that
+    cannot be checked this way; its rows must then go through pydantic.
+    """
+    decorators = model.__pydantic_decorators__
+    if any(model.model_config.get(key) for key in _UNCHECKED_CONFIG) or any(
+        getattr(decorators, name) for name in _UNCHECKED_DECORATORS
+    ):
+        return None
+
+    accepted = None
+    for name, field in model.model_fields.items():
+        if name not in columns:
+            return None
+        values, annotation = columns[name], field.annotation
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            passed = _accepted_rows(annotation, values)
+            if passed is None:
+                return None
+        elif isinstance(annotation, type) and issubclass(annotation, Enum):
+            passed = values.isin([member.value for member in annotation]).to_numpy()
+        elif annotation in (str, int, float, bool, List[str]):
+            passed = np.ones(len(values), dtype=bool)
+            for rule in field.metadata:
+                if type(rule) in _BOUNDS and annotation in (int, float):
+                    passed &= _BOUNDS[type(rule)](values, rule).to_numpy()
+                elif isinstance(rule, annotated_types.MinLen) and annotation is str:
+                    passed &= (values.str.len() >= rule.min_length).to_numpy()
+                elif isinstance(rule, annotated_types.MaxLen) and annotation is str:
+                    passed &= (values.str.len() <= rule.max_length).to_numpy()
+                else:
+                    return None
+        else:
+            return None
+        accepted = passed if accepted is None else accepted & passed
+    return accepted
+
+
+def transform_frame(df: pd.DataFrame) -> Tuple[List[Dict], List[Dict]]:
+    """Transform a DataFrame of CSV rows into validated items
+
+    Type coercion, default filling and list splitting run as column
+    operations. Rows that fail coercion are removed with a boolean mask.
+    ItemCreate's field constraints are then checked on whole columns, and
+    only the rows failing them are validated by pydantic, as one batch, for
+    its error messages. Errors are numbered from 1: the 0-based DataFrame
+    index plus one. Their ``data`` has None for empty cells.
+    """
+    failed = pd.Series(False, index=df.index)
+    reasons: Dict[Any, str] = {}  # DataFrame index -> error message
+
+    text = {
+        column: _text_column(df, column, default)
+        for column, default in TEXT_COLUMNS.items()
+    }
+    numeric = {
+        column: _numeric_column(df, column, default, failed, reasons)
+        for column, default in NUMERIC_COLUMNS.items()
+    }
+    if "shipping_weight" in df:
+        shipping_weight = _numeric_column(
+            df, "shipping_weight", 0.0, failed, reasons
+        ).where(df["shipping_weight"].notna(), numeric["weight"])
+    else:
+        shipping_weight = numeric["weight"]
+    quantity = np.trunc(numeric["quantity"])
+    images = _list_column(df, "images")
+    tags = _list_column(df, "tags")
+    ebay = _bool_column(df, "ebay")
+    shopify = _bool_column(df, "shopify")
+
+    fields = {
+        "title": text["title"],
+        "description": text["description"],
+        "price": numeric["price"],
+        "quantity": quantity,
+        "category": text["category"],
+        "condition": text["condition"],
+        "images": images,
+        "tags": tags,
+        "weight": numeric["weight"],
+        "dimensions": {
+            "length": numeric["length"],
+            "width": numeric["width"],
+            "height": numeric["height"],
+        },
+        "shipping": {
+            "weight": shipping_weight,
+            "method": text["shipping_method"],
+            "cost": numeric["shipping_cost"],
+        },
+        "platforms": {"ebay": ebay, "shopify": shopify},
+    }
+    keep = ~failed.to_numpy()
+    accepted = _accepted_rows(ItemCreate, fields)
+    if accepted is None:
+        accepted = np.zeros(len(df), dtype=bool)
+    accepted = accepted[keep]
+
+    columns = [
+        df.index,
+        text["title"],
+        text["description"],
+        numeric["price"],
+        quantity,
+        text["category"],
+        text["condition"],
+        images,
+        tags,
+        numeric["weight"],
+        numeric["length"],
+        numeric["width"],
+        numeric["height"],
+        shipping_weight,
+        text["shipping_method"],
+        numeric["shipping_cost"],
+        ebay,
+        shopify,
+    ]
+    columns = [column.to_numpy(dtype=object)[keep].tolist() for column in columns]
+
+    # Same shape as ItemCreate.model_dump()
+    conditions = {
+        member.value: member
+        for member in ItemCreate.model_fields["condition"].annotation
+    }
+    rows = [
+        {
+            "title": title,
+            "description": description,
+            "price": price,
+            "quantity": int(quantity),
+            "category": category,
+            "condition": conditions.get(condition, condition),
+            "images": images,
+            "tags": tags,
+            "weight": weight,
+            "dimensions": {"length": length, "width": width, "height": height},
+            "shipping": {
+                "weight": shipping_weight,
+                "method": shipping_method,
+                "cost": shipping_cost,
+            },
+            "platforms": {"ebay": ebay, "shopify": shopify},
+        }
+        for (
+            _,
+            title,
+            description,
+            price,
+            quantity,
+            category,
+            condition,
+            images,
+            tags,
+            weight,
+            length,
+            width,
+            height,
+            shipping_weight,
+            shipping_method,
+            shipping_cost,
+            ebay,
+            shopify,
+        ) in zip(*columns)
+    ]
+
+    # Only rows failing the column checks go through pydantic, as one batch
+    unchecked = np.flatnonzero(~accepted).tolist()
+    valid, invalid = validate_batch(
+        ItemCreate, [rows[position] for position in unchecked]
+    )
+    for batch_position, item in valid:
+        rows[unchecked[batch_position]] = item
+    rejected = {unchecked[batch_position] for batch_position in invalid}
+    transformed_items = [
+        row for position, row in enumerate(rows) if position not in rejected
+    ]
+    errors = dict(reasons)
+    for batch_position, error in invalid.items():
+        errors[columns[0][unchecked[batch_position]]] = error
+
+    failed_rows = {}
+    if errors:
+        # Empty cells are NaN, which is not valid JSON; report them as null
+        rejected = df.loc[sorted(errors)].astype(object)
+        failed_rows = rejected.where(rejected.notna(), None).to_dict("index")
+    return transformed_items, [
+        {"row": index + 1, "error": errors[index], "data": data}
+        for index, data in failed_rows.items()
+    ]
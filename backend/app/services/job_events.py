@@ -0,0 +1,50 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, Set, Tuple
+
+JobEvent = Tuple[str, Dict[str, Any]]
+
+
+class JobEventBroadcaster:
+    """Fan out publish job events to in-process subscribers
+
+    Each subscriber gets its own bounded queue. A subscriber that falls
+    behind loses its oldest events rather than slowing the publish loop;
+    every result event carries the job counters, so the next one it
+    receives brings it back up to date.
+    """
+
+    def __init__(self, queue_size: int = 1000):
+        self.queue_size = max(1, queue_size)
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self.dropped = 0
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[job_id].add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[job_id]
+
+    def has_subscribers(self, job_id: str) -> bool:
+        return bool(self._subscribers.get(job_id))
+
+    def publish(self, job_id: str, event: str, data: Dict[str, Any]) -> None:
+        """Send an event to every subscriber of a job without waiting"""
+        for queue in list(self._subscribers.get(job_id, ())):
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                    self.dropped += 1
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait((event, data))
+
+
+job_events = JobEventBroadcaster()
@@ -0,0 +1,269 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.item import PlatformStatus
+from app.models.job import JobStatus
+from app.repositories import item_repository
+from app.repositories.item_repository import ItemRepository
+from app.repositories.job_repository import JobRepository, job_repository
+from app.repositories.status_buffer import StatusWriteBuffer
+from app.services.change_detection import ChangeDetector
+from app.services.ebay_service import ebay_service
+from app.services.image_verifier import ImageVerifier, image_errors, image_verifier
+from app.services.job_events import JobEventBroadcaster, job_events
+from app.services.publisher import BulkPublisher
+from app.services.rate_limiter import current_job
+from app.services.shopify_service import shopify_service
+from app.settings.config import app_settings
+
+bulk_publisher = BulkPublisher(
+    {"ebay": ebay_service.create_listing, "shopify": shopify_service.create_product},
+    max_concurrency=app_settings.PUBLISH_MAX_CONCURRENCY,
+    platform_limits=app_settings.PUBLISH_PLATFORM_CONCURRENCY,
+    batch_calls={
+        "ebay": ebay_service.create_listings,
+        "shopify": shopify_service.create_products,
+    },
+    update_calls={
+        "ebay": ebay_service.update_listing,
+        "shopify": shopify_service.update_product,
+    },
+    detector=ChangeDetector(
+        {
+            "ebay": ebay_service._prepare_ebay_data,
+            "shopify": shopify_service._prepare_shopify_data,
+        }
+    ),
+)
+
+
+def status_from_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Platform status entry for a publish result"""
+    if result.get("success"):
+        return {
+            "status": PlatformStatus.PUBLISHED,
+            # Skipped items keep the date they were last published
+            "published_at": result.get("published_at") or datetime.utcnow().isoformat(),
+            "external_id": result.get("external_id"),
+            "url": result.get("url"),
+            "message": result.get("message"),
+            "content_hash": result.get("content_hash"),
+            "field_hashes": result.get("field_hashes"),
+        }
+    return {
+        "status": PlatformStatus.FAILED,
+        "message": result.get("message") or result.get("error"),
+    }
+
+
+class JobWorker:
+    """Run bulk publish jobs from the job queue
+
+    ``run`` claims one job at a time and keeps its lease alive while it
+    publishes; several ``run`` loops (in this process, or in other
+    processes started with ``python worker.py``) can share one queue.
+    Jobs interrupted by a crash or deploy are picked up again once their
+    lease expires; on a clean shutdown they are released right away.
+    Results and counters are sent to ``events`` as they happen. With an
+    ``images`` verifier, items with broken image URLs fail up front instead
+    of being sent to the platforms.
+    """
+
+    def __init__(
+        self,
+        jobs: JobRepository,
+        items: ItemRepository,
+        publisher: BulkPublisher,
+        events: JobEventBroadcaster,
+        poll_interval: float = 2.0,
+        lease_seconds: float = 60.0,
+        images: Optional[ImageVerifier] = None,
+    ):
+        self.jobs = jobs
+        self.items = items
+        self.publisher = publisher
+        self.events = events
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.images = images
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def notify(self) -> None:
+        """Wake idle run loops after a job was queued"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        while True:
+            try:
+                job = await asyncio.to_thread(
+                    self.jobs.claim, self.worker_id, self.lease_seconds
+                )
+            except Exception as e:
+                print(f"⚠️  Failed to claim publish job: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=self.poll_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.process(job)
+
+    async def process(self, job: Dict[str, Any]) -> None:
+        """Publish the pending pairs of a claimed job"""
+        task = asyncio.create_task(self._publish(job))
+        lease = asyncio.create_task(self._keep_lease(job["id"], task))
+        try:
+            await task
+        except asyncio.CancelledError:
+            if lease.done() and not lease.cancelled() and lease.exception() is None:
+                return  # The lease lapsed, another worker may own the job now
+            await asyncio.to_thread(self.jobs.release, job["id"], self.worker_id)
+            raise
+        except Exception as e:
+            print(f"⚠️  Publish job {job['id']} failed: {e}")
+            await asyncio.to_thread(
+                self.jobs.finish, job["id"], JobStatus.FAILED, str(e)
+            )
+        else:
+            await asyncio.to_thread(self.jobs.finish, job["id"], JobStatus.COMPLETED)
+        finally:
+            lease.cancel()
+            task.cancel()
+
+        finished = await asyncio.to_thread(self.jobs.get, job["id"])
+        if finished is not None:
+            self.events.publish(job["id"], "done", finished)
+
+    async def _keep_lease(self, job_id: str, task: asyncio.Task) -> None:
+        """Renew the job's lease, cancelling ``task`` once it cannot be kept
+
+        A failed heartbeat (e.g. the database is locked) is retried on the
+        next tick, as long as that is still before the lease expires.
+        """
+        interval = self.lease_seconds / 3
+        renewed = time.monotonic()
+        while True:
+            await asyncio.sleep(interval)
+            attempted = time.monotonic()
+            try:
+                owned = await asyncio.to_thread(
+                    self.jobs.heartbeat, job_id, self.worker_id
+                )
+            except Exception as e:
+                print(f"⚠️  Failed to renew the lease on publish job {job_id}: {e}")
+                if time.monotonic() + interval >= renewed + self.lease_seconds:
+                    print(
+                        f"⚠️  Lease on publish job {job_id} about to expire, stopping"
+                    )
+                    task.cancel()
+                    return
+                continue
+            if not owned:
+                print(f"⚠️  Lost the lease on publish job {job_id}, stopping")
+                task.cancel()
+                return
+            renewed = attempted
+
+    async def _publish(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        # Platform rate limits are shared fairly between concurrent jobs
+        current_job.set(job_id)
+        counters = {
+            key: job[key] for key in ("total", "processed", "succeeded", "failed")
+        }
+        pending = await asyncio.to_thread(self.jobs.pending, job_id)
+
+        platforms_by_item: Dict[str, List[str]] = defaultdict(list)
+        for item_id, platform in pending:
+            platforms_by_item[item_id].append(platform)
+        found = {
+            item["id"]: item
+            for item in await asyncio.to_thread(
+                self.items.get_many, list(platforms_by_item)
+            )
+        }
+
+        broken: Dict[str, List[Dict[str, Any]]] = {}
+        if self.images is not None:
+            broken = await self.images.broken_images(list(found.values()))
+
+        # Items with the same pending platforms are published together
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = defaultdict(list)
+        for item_id, platforms in platforms_by_item.items():
+            if item_id in found and item_id not in broken:
+                groups[tuple(platforms)].append(found[item_id])
+
+        async with StatusWriteBuffer(
+            self.items,
+            batch_size=app_settings.STATUS_FLUSH_BATCH_SIZE,
+            interval=app_settings.STATUS_FLUSH_INTERVAL,
+            jobs=self.jobs,
+            job_id=job_id,
+        ) as status_buffer:
+
+            async def record(item_id: str, platform: str, info: Dict[str, Any]):
+                await status_buffer.add(item_id, platform, info)
+                counters["processed"] += 1
+                if info["status"] == PlatformStatus.PUBLISHED:
+                    counters["succeeded"] += 1
+                else:
+                    counters["failed"] += 1
+                self.events.publish(
+                    job_id,
+                    "result",
+                    {
+                        "item_id": item_id,
+                        "platform": platform,
+                        **info,
+                        "counters": dict(counters),
+                    },
+                )
+
+            async def record_result(item: Dict, platform: str, result: Dict[str, Any]):
+                await record(item["id"], platform, status_from_result(result))
+
+            for item_id, platforms in platforms_by_item.items():
+                if item_id in found and item_id not in broken:
+                    continue
+                message = (
+                    image_errors(broken[item_id])
+                    if item_id in broken
+                    else "Item not found"
+                )
+                for platform in platforms:
+                    await record(
+                        item_id,
+                        platform,
+                        {"status": PlatformStatus.FAILED, "message": message},
+                    )
+
+            for platforms, items in groups.items():
+                await self.publisher.publish(
+                    items, list(platforms), on_result=record_result
+                )
+
+
+job_worker = JobWorker(
+    job_repository,
+    item_repository,
+    bulk_publisher,
+    job_events,
+    poll_interval=app_settings.JOB_POLL_INTERVAL,
+    lease_seconds=app_settings.JOB_LEASE_SECONDS,
+    images=image_verifier if app_settings.IMAGE_VERIFY_ON_PUBLISH else None,
+)
@@ -0,0 +1,221 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.services.change_detection import ChangeDetector
+
+PublishCall = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+ResultCallback = Callable[[Dict[str, Any], str, Dict[str, Any]], Awaitable[None]]
+ItemCallback = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[None]]
+BatchPublishCall = Callable[..., Awaitable[Dict[str, Dict[str, Any]]]]
+UpdateCall = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+class BulkPublisher:
+    """Publish items to several platforms with bounded concurrency
+
+    At most ``max_concurrency`` platform calls run at once overall, and at
+    most ``platform_limits[platform]`` against any single platform. The
+    platforms for one item are published in parallel; items are otherwise
+    independent, so ordering is only guaranteed within an item.
+
+    Platforms listed in ``batch_calls`` are published with a single call
+    ``batch(items, on_result=...)`` instead; the service does its own
+    chunking and concurrency and reports each item through ``on_result``.
+
+    With a ``detector``, items already published with the same payload are
+    skipped, and changed ones go to ``update_calls[platform](item,
+    external_id, fields=changed_fields)`` instead of being created again.
+    Successful results carry the payload digests to store on the status.
+    """
+
+    def __init__(
+        self,
+        calls: Dict[str, PublishCall],
+        max_concurrency: int = 20,
+        platform_limits: Optional[Dict[str, int]] = None,
+        batch_calls: Optional[Dict[str, BatchPublishCall]] = None,
+        update_calls: Optional[Dict[str, UpdateCall]] = None,
+        detector: Optional[ChangeDetector] = None,
+    ):
+        self.calls = calls
+        self.max_concurrency = max(1, max_concurrency)
+        self.platform_limits = platform_limits or {}
+        self.batch_calls = batch_calls or {}
+        self.update_calls = update_calls or {}
+        self.detector = detector
+
+    def _limits(self) -> Dict[str, asyncio.Semaphore]:
+        return {
+            platform: asyncio.Semaphore(
+                max(1, self.platform_limits.get(platform, self.max_concurrency))
+            )
+            for platform in self.calls
+        }
+
+    def _plan(self, item: Dict[str, Any], platform: str) -> Dict[str, Any]:
+        if self.detector is None:
+            return {"action": "create", "fields": None}
+        return self.detector.plan(item, platform.lower())
+
+    def _with_digests(
+        self, result: Dict[str, Any], plan: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if not result.get("success") or "content_hash" not in plan:
+            return result
+        return {
+            **result,
+            "content_hash": plan["content_hash"],
+            "field_hashes": plan["field_hashes"],
+        }
+
+    async def _call(
+        self,
+        platform: str,
+        item: Dict[str, Any],
+        plan: Dict[str, Any],
+        limits: Dict[str, asyncio.Semaphore],
+        overall: asyncio.Semaphore,
+    ) -> Dict[str, Any]:
+        platform = platform.lower()
+        if platform not in self.calls:
+            return {"success": False, "message": "Unsupported platform"}
+
+        if plan["action"] == "skip":
+            return self._with_digests(
+                {
+                    "success": True,
+                    "skipped": True,
+                    "external_id": plan.get("external_id"),
+                    "url": plan.get("url"),
+                    "published_at": plan.get("published_at"),
+                    "message": "Unchanged since last publish, skipped",
+                },
+                plan,
+            )
+
+        async with limits[platform], overall:
+            try:
+                if plan["action"] == "update" and platform in self.update_calls:
+                    result = await self.update_calls[platform](
+                        item, plan["external_id"], fields=plan["fields"]
+                    )
+                else:
+                    result = await self.calls[platform](item)
+            except Exception as e:
+                return {"success": False, "message": str(e)}
+        return self._with_digests(result, plan)
+
+    def _entry(self, platform: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "platform": platform,
+            "success": result.get("success", False),
+            "external_id": result.get("external_id"),
+            "url": result.get("url"),
+            "message": result.get("message") or result.get("error"),
+        }
+
+    async def publish_one(self, item: Dict[str, Any], platform: str) -> Dict[str, Any]:
+        """Publish one item to one platform and return the service result"""
+        plan = self._plan(item, platform)
+        return await self._call(
+            platform, item, plan, self._limits(), asyncio.Semaphore(1)
+        )
+
+    async def publish(
+        self,
+        items: Iterable[Dict[str, Any]],
+        platforms: List[str],
+        on_result: Optional[ResultCallback] = None,
+    ) -> List[Dict[str, Any]]:
+        """Publish every item to every platform and return per-item results"""
+        items = list(items)
+        plans = {
+            (position, platform): self._plan(item, platform)
+            for position, item in enumerate(items)
+            for platform in platforms
+        }
+        batched = [p for p in platforms if p.lower() in self.batch_calls]
+
+        def creates_in_batch(position: int, platform: str) -> bool:
+            return (
+                platform in batched
+                and plans[(position, platform)]["action"] == "create"
+            )
+
+        overall = asyncio.Semaphore(self.max_concurrency)
+        limits = self._limits()
+        queue: asyncio.Queue = asyncio.Queue()
+        for position, item in enumerate(items):
+            if not all(creates_in_batch(position, p) for p in platforms):
+                queue.put_nowait((position, item))
+        entries: Dict[Tuple[int, str], Dict[str, Any]] = {}
+
+        async def record(
+            position: int, item: Dict[str, Any], platform: str, result: Dict[str, Any]
+        ) -> None:
+            if on_result is not None:
+                await on_result(item, platform, result)
+            entries[(position, platform)] = self._entry(platform, result)
+
+        async def publish_item(position: int, item: Dict[str, Any]) -> None:
+            async def publish_platform(platform: str) -> None:
+                if creates_in_batch(position, platform):
+                    return
+                plan = plans[(position, platform)]
+                result = await self._call(platform, item, plan, limits, overall)
+                await record(position, item, platform, result)
+
+            await asyncio.gather(
+                *(publish_platform(platform) for platform in platforms)
+            )
+
+        async def worker():
+            while not queue.empty():
+                position, item = queue.get_nowait()
+                await publish_item(position, item)
+
+        async def publish_batch(platform: str) -> None:
+            positions = {
+                item["id"]: position
+                for position, item in enumerate(items)
+                if creates_in_batch(position, platform)
+            }
+            if not positions:
+                return
+
+            async def record_item(item: Dict[str, Any], result: Dict[str, Any]) -> None:
+                position = positions[item["id"]]
+                await record(
+                    position,
+                    item,
+                    platform,
+                    self._with_digests(result, plans[(position, platform)]),
+                )
+
+            try:
+                await self.batch_calls[platform.lower()](
+                    [items[position] for position in positions.values()],
+                    on_result=record_item,
+                )
+            except Exception as e:
+                for position in positions.values():
+                    if (position, platform) not in entries:
+                        await record(
+                            position,
+                            items[position],
+                            platform,
+                            {"success": False, "message": str(e)},
+                        )
+
+        workers = min(self.max_concurrency, queue.qsize())
+        await asyncio.gather(
+            *(worker() for _ in range(workers)),
+            *(publish_batch(platform) for platform in batched),
+        )
+        return [
+            {
+                "item_id": item["id"],
+                "platforms": [entries[(position, p)] for p in platforms],
+            }
+            for position, item in enumerate(items)
+        ]
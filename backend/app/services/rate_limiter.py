@@ -0,0 +1,251 @@
+import asyncio
+import contextvars
+import time
+from collections import OrderedDict, deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from app.settings.config import app_settings
+
+# Job the current task is publishing for, used to queue fairly across jobs
+current_job: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "current_job", default=""
+)
+
+
+class TokenBucket:
+    """Token bucket with fair, FIFO-per-job queueing
+
+    ``rate`` tokens are restored per second up to ``capacity``. Callers that
+    cannot be served immediately wait in a queue per job, and jobs are
+    served round-robin so one large job cannot starve the others. The
+    budget can be corrected from provider headers with ``update`` and
+    suspended with ``pause`` (e.g. for Retry-After).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._queues: "OrderedDict[str, Deque[Tuple[asyncio.Future, float]]]" = (
+            OrderedDict()
+        )
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _delay(self, cost: float) -> float:
+        """Seconds until ``cost`` tokens can be taken"""
+        self._refill()
+        paused = self.paused_until - time.monotonic()
+        if paused > 0:
+            return paused
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def _record(self, waited: float) -> None:
+        self.acquired += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    async def acquire(self, cost: float = 1.0, job: str = "") -> float:
+        """Take ``cost`` tokens, waiting for them if needed; returns the wait"""
+        cost = min(cost, self.capacity)
+        if not self._queues and self._delay(cost) == 0:
+            self.tokens -= cost
+            self._record(0.0)
+            return 0.0
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(job, deque()).append((future, cost))
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+        waited = time.monotonic() - started
+        self._record(waited)
+        return waited
+
+    async def _dispatch(self) -> None:
+        while self._queues:
+            job, waiters = next(iter(self._queues.items()))
+            future, cost = waiters[0]
+            if future.done():
+                # Waiter was cancelled
+                waiters.popleft()
+            else:
+                delay = self._delay(cost)
+                if delay > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                self.tokens -= cost
+                waiters.popleft()
+                future.set_result(None)
+
+            # Round-robin: the next grant goes to the next job in line
+            if waiters:
+                self._queues.move_to_end(job)
+            else:
+                del self._queues[job]
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def update(
+        self,
+        available: Optional[float] = None,
+        capacity: Optional[float] = None,
+        rate: Optional[float] = None,
+    ) -> None:
+        """Replace the local estimate with the budget reported by the provider"""
+        self._refill()
+        if capacity:
+            self.capacity = float(capacity)
+        if rate:
+            self.rate = float(rate)
+        if available is not None:
+            self.tokens = min(self.capacity, float(available))
+        self._wake()
+
+    def pause(self, seconds: float) -> None:
+        """Stop granting tokens for ``seconds`` and drain the budget"""
+        self.throttled += 1
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.paused_until = max(self.paused_until, self.updated + seconds)
+        self._wake()
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "available": round(self.tokens, 2),
+            "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            "waiting": sum(len(waiters) for waiters in self._queues.values()),
+            "jobs_waiting": len(self._queues),
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "wait_seconds_total": round(self.wait_total, 3),
+            "wait_seconds_max": round(self.wait_max, 3),
+            "wait_seconds_avg": (
+                round(self.wait_total / self.acquired, 3) if self.acquired else 0.0
+            ),
+        }
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Token buckets per platform and store, fed by provider rate-limit headers
+
+    Buckets are created from ``limits[platform]`` (``rate``, ``capacity``
+    and the default request ``cost``). ``event_hooks`` plugs a bucket into
+    a platform's pooled httpx client: every request waits for its budget
+    (``extensions={"rate_cost": n}`` overrides the cost, 0 skips the
+    limiter) and every response corrects the budget from headers.
+    """
+
+    def __init__(self, limits: Dict[str, Dict[str, float]]):
+        self.limits = limits
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def bucket(self, platform: str, store: str = "default") -> TokenBucket:
+        key = (platform, store or "default")
+        if key not in self.buckets:
+            limits = self.limits.get(platform, {})
+            self.buckets[key] = TokenBucket(
+                rate=limits.get("rate", 1.0), capacity=limits.get("capacity", 1.0)
+            )
+        return self.buckets[key]
+
+    def event_hooks(self, platform: str, store: str = "default") -> Dict[str, list]:
+        bucket = self.bucket(platform, store)
+        default_cost = self.limits.get(platform, {}).get("cost", 1.0)
+
+        async def on_request(request: httpx.Request) -> None:
+            cost = request.extensions.get("rate_cost", default_cost)
+            if cost:
+                await bucket.acquire(cost, current_job.get())
+
+        async def on_response(response: httpx.Response) -> None:
+            if response.request.extensions.get("rate_cost", default_cost):
+                await self.observe(bucket, response)
+
+        return {"request": [on_request], "response": [on_response]}
+
+    async def observe(self, bucket: TokenBucket, response: httpx.Response) -> None:
+        """Adapt a bucket to the rate-limit information in a response"""
+        if response.status_code in (429, 503):
+            delay = retry_after_seconds(response)
+            if delay is None and response.status_code == 429:
+                delay = 1.0
+            if delay is not None:
+                bucket.pause(delay)
+
+        # Shopify REST: X-Shopify-Shop-Api-Call-Limit: used/capacity
+        call_limit = response.headers.get("X-Shopify-Shop-Api-Call-Limit")
+        if call_limit and "/" in call_limit:
+            used, capacity = call_limit.split("/", 1)
+            try:
+                bucket.update(
+                    available=float(capacity) - float(used), capacity=float(capacity)
+                )
+            except ValueError:
+                pass
+
+        # Shopify GraphQL: extensions.cost.throttleStatus in the body
+        if response.request.url.path.endswith("graphql.json"):
+            await response.aread()
+            try:
+                status = response.json()["extensions"]["cost"]["throttleStatus"]
+            except (ValueError, KeyError, TypeError):
+                return
+            bucket.update(
+                available=status.get("currentlyAvailable"),
+                capacity=status.get("maximumAvailable"),
+                rate=status.get("restoreRate"),
+            )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            f"{platform}:{store}": bucket.stats()
+            for (platform, store), bucket in self.buckets.items()
+        }
+
+
+rate_limiter = RateLimiter(app_settings.RATE_LIMITS)
@@ -0,0 +1,229 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from app.services.rate_limiter import current_job, retry_after_seconds
+from app.settings.config import app_settings
+
+# Responses worth retrying; the request was not processed for 429 and 503
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+NOT_PROCESSED_STATUS = {429, 503}
+# Statuses that mean the platform itself is unhealthy
+OUTAGE_STATUS = {500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a platform whose circuit is open"""
+
+    def __init__(self, platform: str, retry_in: float):
+        self.platform = platform
+        self.retry_in = retry_in
+        super().__init__(
+            f"{platform} is unavailable (circuit open), try again in {retry_in:.0f}s"
+        )
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open probes -> closed
+
+    While open, calls fail fast (or wait, see ``acquire``). After
+    ``reset_timeout`` seconds up to ``probes`` calls are let
+    through; one success closes the circuit, a failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        probes: int = 1,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.probes = max(1, probes)
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.trips = 0
+        self.fast_failures = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self.retry_in() == 0:
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a probe through"""
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    async def acquire(self, wait: bool) -> None:
+        """Let a call through, or raise/wait while the circuit is open"""
+        while True:
+            state = self.state
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and self._probes_in_flight < self.probes:
+                self._probes_in_flight += 1
+                return
+            if not wait:
+                self.fast_failures += 1
+                raise CircuitOpenError(self.name, self.retry_in())
+            await asyncio.sleep(max(0.1, min(self.retry_in(), 1.0)))
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self._state != self.CLOSED:
+            self._state = self.CLOSED
+            self._probes_in_flight = 0
+
+    def release(self) -> None:
+        """Give back a probe slot whose call was abandoned"""
+        if self._state == self.HALF_OPEN and self._probes_in_flight:
+            self._probes_in_flight -= 1
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.trips += 1
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probes_in_flight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self._failures,
+            "retry_in": round(self.retry_in(), 2) if state == self.OPEN else 0.0,
+            "trips": self.trips,
+            "fast_failures": self.fast_failures,
+        }
+
+
+class Resilience:
+    """Retries with backoff and a circuit breaker per platform
+
+    ``call`` sends a request through ``send`` (so every attempt goes through
+    the client's rate limiter) and retries transport errors and retryable
+    statuses with exponential backoff and full jitter, waiting at least as
+    long as any Retry-After header. Non-idempotent requests are only
+    retried when the platform cannot have processed them.
+
+    While a platform's circuit is open, calls made for a bulk job wait for
+    it to recover (pausing the job), and other calls fail fast.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        probes: int = 1,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.retries: Dict[str, int] = {}
+
+    def breaker(self, platform: str) -> CircuitBreaker:
+        if platform not in self.breakers:
+            self.breakers[platform] = CircuitBreaker(
+                platform, self.failure_threshold, self.reset_timeout, self.probes
+            )
+        return self.breakers[platform]
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given attempt (1-based)"""
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+    async def call(
+        self,
+        platform: str,
+        send: Callable[[], Awaitable[httpx.Response]],
+        idempotent: bool = True,
+        wait: Optional[bool] = None,
+        retry_if: Optional[Callable[[httpx.Response], bool]] = None,
+    ) -> httpx.Response:
+        breaker = self.breaker(platform)
+        if wait is None:
+            wait = bool(current_job.get())
+
+        attempt = 0
+        while True:
+            attempt += 1
+            await breaker.acquire(wait)
+            try:
+                response = await send()
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                # Connection failures never reached the platform
+                safe = idempotent or isinstance(
+                    e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+                )
+                if not safe or attempt >= self.max_attempts:
+                    raise
+                delay = self.backoff(attempt)
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception:
+                breaker.record_failure()
+                raise
+            else:
+                status = response.status_code
+                if status in OUTAGE_STATUS:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                # retry_if flags responses that were rejected unprocessed
+                retryable = (retry_if is not None and retry_if(response)) or (
+                    status in RETRYABLE_STATUS
+                    and (idempotent or status in NOT_PROCESSED_STATUS)
+                )
+                if not retryable or attempt >= self.max_attempts:
+                    return response
+                delay = max(retry_after_seconds(response) or 0.0, self.backoff(attempt))
+                await response.aclose()
+
+            self.retries[platform] = self.retries.get(platform, 0) + 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        platforms = set(self.breakers) | set(self.retries)
+        return {
+            platform: {
+                "retries": self.retries.get(platform, 0),
+                **self.breaker(platform).stats(),
+            }
+            for platform in sorted(platforms)
+        }
+
+
+resilience = Resilience(
+    max_attempts=app_settings.RETRY_MAX_ATTEMPTS,
+    base_delay=app_settings.RETRY_BASE_DELAY,
+    max_delay=app_settings.RETRY_MAX_DELAY,
+    failure_threshold=app_settings.CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=app_settings.CIRCUIT_RESET_TIMEOUT,
+    probes=app_settings.CIRCUIT_HALF_OPEN_PROBES,
+)
@@ -1,31 +1,421 @@
 import uuid
 import asyncio
-from typing import Dict, Any
+import json
+import time
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+from app.settings.config import app_settings
 from app.settings.shopify_config import shopify_settings
+from app.repositories.image_store import ImageStore, image_hash, image_store
+from app.services.http_clients import create_client
+from app.services.image_processing import image_variant_url
+from app.services.rate_limiter import rate_limiter
+from app.services.resilience import resilience
+import httpx
+
+MEDIA_IMAGE_FIELDS = "... on MediaImage { image { url } }"
+PRODUCT_CREATE_FIELDS = (
+    f"product {{ id handle media(first: 250) {{ nodes {{ {MEDIA_IMAGE_FIELDS} }} }} }}"
+    " userErrors { field message }"
+)
+PRODUCT_CREATE_MUTATION = (
+    "mutation call($input: ProductInput!, $media: [CreateMediaInput!]) { "
+    f"productCreate(input: $input, media: $media) {{ {PRODUCT_CREATE_FIELDS} }} }}"
+)
+STAGED_UPLOAD_MUTATION = """
+mutation stagedUpload($input: [StagedUploadInput!]!) {
+  stagedUploadsCreate(input: $input) {
+    stagedTargets { url resourceUrl parameters { name value } }
+    userErrors { field message }
+  }
+}
+"""
+BULK_MUTATION = """
+mutation bulkMutation($mutation: String!, $path: String!) {
+  bulkOperationRunMutation(mutation: $mutation, stagedUploadPath: $path) {
+    bulkOperation { id status }
+    userErrors { field message }
+  }
+}
+"""
+BULK_OPERATION_QUERY = """
+query bulkOperation($id: ID!) {
+  node(id: $id) {
+    ... on BulkOperation { id status errorCode objectCount url partialDataUrl }
+  }
+}
+"""
+PRODUCT_QUERY = """
+query product($id: ID!) {
+  product(id: $id) {
+    handle
+    variants(first: 1) { nodes { id } }
+    media(first: 250) { nodes { id ... on MediaImage { image { url } } } }
+  }
+}
+"""
+PRODUCT_UPDATE_MUTATION = """
+mutation productUpdate($input: ProductInput!) {
+  productUpdate(input: $input) {
+    product { id handle }
+    userErrors { field message }
+  }
+}
+"""
+VARIANT_UPDATE_MUTATION = """
+mutation variantUpdate($input: ProductVariantInput!) {
+  productVariantUpdate(input: $input) {
+    productVariant { id }
+    userErrors { field message }
+  }
+}
+"""
+MEDIA_DELETE_MUTATION = """
+mutation deleteMedia($productId: ID!, $mediaIds: [ID!]!) {
+  productDeleteMedia(productId: $productId, mediaIds: $mediaIds) {
+    deletedMediaIds
+    mediaUserErrors { field message }
+  }
+}
+"""
+MEDIA_CREATE_MUTATION = """
+mutation createMedia($productId: ID!, $media: [CreateMediaInput!]!) {
+  productCreateMedia(productId: $productId, media: $media) {
+    media { id ... on MediaImage { image { url } } }
+    mediaUserErrors { field message }
+  }
+}
+"""
+BULK_FINISHED = {"COMPLETED", "FAILED", "CANCELED", "EXPIRED"}
+
+# _prepare_shopify_data fields that productUpdate can change -> ProductInput
+SHOPIFY_PRODUCT_FIELDS = {
+    "title": "title",
+    "body_html": "descriptionHtml",
+    "vendor": "vendor",
+    "product_type": "productType",
+    "tags": "tags",
+}
+
+ProductCallback = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[None]]
 
 
 class ShopifyService:
     """Shopify API integration service"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        images: Optional[ImageStore] = None,
+    ):
         self.connected = bool(
             shopify_settings.SHOPIFY_SHOP_DOMAIN
             and shopify_settings.SHOPIFY_ACCESS_TOKEN
         )
+        self.client = client  # Pooled client, opened in main.lifespan
+        self.images = images  # Uploaded images Shopify already hosts
 
     def is_connected(self) -> bool:
         """Check if Shopify API is configured"""
         return self.connected
 
+    def open_client(self) -> httpx.AsyncClient:
+        """Create the pooled HTTP client used for all Shopify Admin API calls"""
+        self.client = create_client(
+            base_url=shopify_settings.SHOPIFY_BASE_URL if self.connected else None,
+            headers={"X-Shopify-Access-Token": shopify_settings.SHOPIFY_ACCESS_TOKEN},
+            event_hooks=rate_limiter.event_hooks(
+                "shopify", shopify_settings.SHOPIFY_SHOP_DOMAIN
+            ),
+        )
+        return self.client
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Pooled HTTP client, opened on first use outside the app lifespan"""
+        if self.client is None or self.client.is_closed:
+            return self.open_client()
+        return self.client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client"""
+        if self.client is not None:
+            await self.client.aclose()
+
     async def create_product(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """Create a product on Shopify"""
         if not self.connected:
             # Mock implementation
             return await self._mock_create_product(item)
 
-        # Real Shopify API implementation would go here
-        # For now, return mock response
-        return await self._mock_create_product(item)
+        results = await self.create_products([item])
+        return results[item["id"]]
+
+    async def create_products(
+        self,
+        items: List[Dict[str, Any]],
+        on_result: Optional[ProductCallback] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Create many products through the GraphQL Admin API
+
+        Large sets (SHOPIFY_BULK_OPERATION_THRESHOLD items or more) are sent
+        as one staged-upload JSONL bulk mutation and polled until done.
+        Smaller sets are sent as batches of aliased productCreate mutations,
+        SHOPIFY_GRAPHQL_BATCH_SIZE per request, several requests at a time.
+        Returns a create_product style result per item id; ``on_result`` is
+        awaited for every item as soon as its result is known.
+        """
+        if self.connected and len(items) >= max(
+            1, shopify_settings.SHOPIFY_BULK_OPERATION_THRESHOLD
+        ):
+            try:
+                results = await self._run_bulk_operation(items)
+            except Exception as e:
+                results = self._all_failed(items, f"Bulk operation failed: {str(e)}")
+            if on_result is not None:
+                for item in items:
+                    await on_result(item, results[item["id"]])
+            return results
+
+        limit = asyncio.Semaphore(
+            max(1, app_settings.PUBLISH_PLATFORM_CONCURRENCY.get("shopify", 1))
+        )
+        batch_size = max(1, shopify_settings.SHOPIFY_GRAPHQL_BATCH_SIZE)
+        results: Dict[str, Dict[str, Any]] = {}
+
+        async def create_batch(batch: List[Dict[str, Any]]) -> None:
+            async with limit:
+                batch_results = await self._create_product_batch(batch)
+            for item in batch:
+                results[item["id"]] = batch_results[item["id"]]
+                if on_result is not None:
+                    await on_result(item, results[item["id"]])
+
+        await asyncio.gather(
+            *(
+                create_batch(items[start : start + batch_size])
+                for start in range(0, len(items), batch_size)
+            )
+        )
+        return results
+
+    async def _create_product_batch(
+        self, items: List[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Create one batch of products with a single aliased GraphQL request"""
+        if not self.connected:
+            mocked = await asyncio.gather(
+                *(self._mock_create_product(item) for item in items)
+            )
+            return {item["id"]: result for item, result in zip(items, mocked)}
+
+        hosted = await self._hosted_sources(items)
+        arguments = []
+        fields = []
+        variables: Dict[str, Any] = {}
+        for n, item in enumerate(items):
+            arguments.append(
+                f"$input{n}: ProductInput!, $media{n}: [CreateMediaInput!]"
+            )
+            fields.append(
+                f"p{n}: productCreate(input: $input{n}, media: $media{n}) "
+                f"{{ {PRODUCT_CREATE_FIELDS} }}"
+            )
+            product = self._prepare_product_input(item, hosted)
+            variables[f"input{n}"] = product["input"]
+            variables[f"media{n}"] = product["media"]
+        mutation = f"mutation batch({', '.join(arguments)}) {{ {' '.join(fields)} }}"
+
+        try:
+            # productCreate costs 10 points; throttleStatus corrects the estimate
+            body = await self._graphql(mutation, variables, cost=10 * len(items))
+        except Exception as e:
+            return self._all_failed(items, f"Failed to create product: {str(e)}")
+
+        data = body.get("data") or {}
+        top_error = "; ".join(
+            error.get("message", "") for error in body.get("errors") or []
+        )
+        await self._remember_hosted(
+            [
+                (item, (data.get(f"p{n}") or {}).get("product"))
+                for n, item in enumerate(items)
+            ]
+        )
+        return {
+            item["id"]: self._product_result(
+                data.get(f"p{n}"), top_error or "Shopify returned no result"
+            )
+            for n, item in enumerate(items)
+        }
+
+    async def _run_bulk_operation(
+        self, items: List[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Create products with a staged JSONL upload and bulkOperationRunMutation"""
+        hosted = await self._hosted_sources(items)
+        lines = "\n".join(
+            json.dumps(self._prepare_product_input(item, hosted), separators=(",", ":"))
+            for item in items
+        )
+
+        body = await self._graphql(
+            STAGED_UPLOAD_MUTATION,
+            {
+                "input": [
+                    {
+                        "resource": "BULK_MUTATION_VARIABLES",
+                        "filename": "products.jsonl",
+                        "mimeType": "text/jsonl",
+                        "httpMethod": "POST",
+                    }
+                ]
+            },
+            idempotent=True,
+        )
+        staged = self._payload(body, "stagedUploadsCreate")
+        target = staged["stagedTargets"][0]
+        parameters = {p["name"]: p["value"] for p in target["parameters"]}
+        upload = await self._external_request(
+            "POST",
+            target["url"],
+            data=parameters,
+            files={"file": ("products.jsonl", lines.encode(), "text/jsonl")},
+        )
+        upload.raise_for_status()
+
+        body = await self._graphql(
+            BULK_MUTATION,
+            {"mutation": PRODUCT_CREATE_MUTATION, "path": parameters["key"]},
+        )
+        operation = self._payload(body, "bulkOperationRunMutation")["bulkOperation"]
+        operation = await self._poll_bulk_operation(operation["id"])
+
+        results: Dict[str, Dict[str, Any]] = {}
+        created = []
+        result_url = operation.get("url") or operation.get("partialDataUrl")
+        if result_url:
+            response = await self._external_request("GET", result_url)
+            response.raise_for_status()
+            for line in response.text.splitlines():
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                position = row.get("__lineNumber")
+                if position is None or not 0 <= position < len(items):
+                    continue
+                payload = (row.get("data") or {}).get("productCreate")
+                results[items[position]["id"]] = self._product_result(
+                    payload,
+                    "; ".join(e.get("message", "") for e in row.get("errors") or []),
+                )
+                created.append((items[position], (payload or {}).get("product")))
+        await self._remember_hosted(created)
+
+        missing = (
+            f"Bulk operation {operation['status'].lower()}"
+            f" ({operation.get('errorCode') or 'no result for product'})"
+        )
+        for item in items:
+            results.setdefault(item["id"], {"success": False, "error": missing})
+        return results
+
+    async def _poll_bulk_operation(self, operation_id: str) -> Dict[str, Any]:
+        """Poll a bulk operation until it finishes or the poll timeout passes"""
+        deadline = time.monotonic() + shopify_settings.SHOPIFY_BULK_POLL_TIMEOUT
+        while True:
+            body = await self._graphql(
+                BULK_OPERATION_QUERY, {"id": operation_id}, idempotent=True
+            )
+            operation = (body.get("data") or {}).get("node") or {}
+            if operation.get("status") in BULK_FINISHED:
+                return operation
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Bulk operation {operation_id} did not finish")
+            await asyncio.sleep(shopify_settings.SHOPIFY_BULK_POLL_INTERVAL)
+
+    async def _graphql(
+        self,
+        query: str,
+        variables: Dict[str, Any],
+        cost: Optional[float] = None,
+        idempotent: bool = False,
+    ) -> Dict[str, Any]:
+        """POST a GraphQL Admin API request and return the decoded body"""
+        response = await resilience.call(
+            "shopify",
+            lambda: self.http.post(
+                "/graphql.json",
+                json={"query": query, "variables": variables},
+                extensions={"rate_cost": cost} if cost is not None else None,
+            ),
+            idempotent=idempotent,
+            retry_if=self._throttled,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _throttled(self, response: httpx.Response) -> bool:
+        """GraphQL throttling comes back as a 200 with a THROTTLED error"""
+        try:
+            errors = response.json().get("errors") or []
+        except ValueError:
+            return False
+        return any(
+            (error.get("extensions") or {}).get("code") == "THROTTLED"
+            for error in errors
+            if isinstance(error, dict)
+        )
+
+    async def _external_request(
+        self, method: str, url: str, **kwargs
+    ) -> httpx.Response:
+        """Request a staged upload or result URL without the shop access token"""
+        request = self.http.build_request(
+            method, url, extensions={"rate_cost": 0}, **kwargs
+        )
+        request.headers.pop("X-Shopify-Access-Token", None)
+        return await resilience.call("shopify", lambda: self.http.send(request))
+
+    def _payload(
+        self, body: Dict[str, Any], field: str, errors: str = "userErrors"
+    ) -> Dict[str, Any]:
+        """Mutation payload, raising on top-level or user errors"""
+        if body.get("errors"):
+            raise ValueError("; ".join(e.get("message", "") for e in body["errors"]))
+        payload = (body.get("data") or {}).get(field) or {}
+        if payload.get(errors):
+            raise ValueError(self._user_errors(payload[errors]))
+        return payload
+
+    def _user_errors(self, errors: List[Dict[str, Any]]) -> str:
+        return "; ".join(
+            f"{'.'.join(error.get('field') or [])}: {error.get('message', '')}".lstrip(
+                ": "
+            )
+            for error in errors
+        )
+
+    def _product_result(
+        self, payload: Optional[Dict[str, Any]], error: str
+    ) -> Dict[str, Any]:
+        """create_product style result for one productCreate payload"""
+        payload = payload or {}
+        product = payload.get("product")
+        if payload.get("userErrors"):
+            error = self._user_errors(payload["userErrors"])
+        if not product:
+            return {"success": False, "error": f"Failed to create product: {error}"}
+        return {
+            "success": True,
+            "external_id": product["id"],
+            "url": f"https://{shopify_settings.SHOPIFY_SHOP_DOMAIN}/products/{product['handle']}",
+            "message": "Product successfully created on Shopify",
+        }
+
+    def _all_failed(
+        self, items: List[Dict[str, Any]], error: str
+    ) -> Dict[str, Dict[str, Any]]:
+        return {item["id"]: {"success": False, "error": error} for item in items}
 
     async def _mock_create_product(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """Mock Shopify product creation"""
@@ -44,14 +434,101 @@ class ShopifyService:
         }
 
     async def update_product(
-        self, item: Dict[str, Any], product_id: str
+        self,
+        item: Dict[str, Any],
+        product_id: str,
+        fields: Optional[List[str]] = None,
     ) -> Dict[str, Any]:
-        """Update an existing Shopify product"""
+        """Update an existing Shopify product
+
+        ``fields`` names the ``_prepare_shopify_data`` fields that changed
+        (None means all of them); only those are sent to Shopify.
+        """
         if not self.connected:
             return await self._mock_update_product(item, product_id)
 
-        # Real implementation would go here
-        return await self._mock_update_product(item, product_id)
+        try:
+            return await self._update_product(item, product_id, fields)
+        except Exception as e:
+            return {"success": False, "error": f"Failed to update product: {str(e)}"}
+
+    async def _update_product(
+        self, item: Dict[str, Any], product_id: str, fields: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        changed = set(self._prepare_shopify_data(item) if fields is None else fields)
+        body = await self._graphql(PRODUCT_QUERY, {"id": product_id}, idempotent=True)
+        product = (body.get("data") or {}).get("product")
+        if not product:
+            return {
+                "success": False,
+                "error": f"Failed to update product: {product_id} not found",
+            }
+        prepared = self._prepare_product_input(item, await self._hosted_sources([item]))
+
+        product_input = {
+            SHOPIFY_PRODUCT_FIELDS[field]: prepared["input"][
+                SHOPIFY_PRODUCT_FIELDS[field]
+            ]
+            for field in changed
+            if field in SHOPIFY_PRODUCT_FIELDS
+        }
+        if product_input:
+            body = await self._graphql(
+                PRODUCT_UPDATE_MUTATION,
+                {"input": {"id": product_id, **product_input}},
+                idempotent=True,
+            )
+            product.update(self._payload(body, "productUpdate")["product"])
+
+        variants = product["variants"]["nodes"]
+        if "variants" in changed and variants:
+            # Stock is set per location and is not part of ProductVariantInput
+            variant = {
+                key: value
+                for key, value in prepared["input"]["variants"][0].items()
+                if key != "inventoryQuantities"
+            }
+            body = await self._graphql(
+                VARIANT_UPDATE_MUTATION,
+                {"input": {"id": variants[0]["id"], **variant}},
+                idempotent=True,
+            )
+            self._payload(body, "productVariantUpdate")
+
+        if "images" in changed:
+            media = product["media"]["nodes"]
+            if media:
+                body = await self._graphql(
+                    MEDIA_DELETE_MUTATION,
+                    {"productId": product_id, "mediaIds": [m["id"] for m in media]},
+                    idempotent=True,
+                )
+                self._payload(body, "productDeleteMedia", errors="mediaUserErrors")
+                # Copies served from the deleted media cannot be reused
+                if self.images is not None:
+                    await asyncio.to_thread(
+                        self.images.forget_hosted,
+                        "shopify",
+                        [(m.get("image") or {}).get("url") for m in media],
+                    )
+            if prepared["media"]:
+                body = await self._graphql(
+                    MEDIA_CREATE_MUTATION,
+                    {"productId": product_id, "media": prepared["media"]},
+                )
+                payload = self._payload(
+                    body, "productCreateMedia", errors="mediaUserErrors"
+                )
+                await self._remember_hosted(
+                    [(item, {"media": {"nodes": payload.get("media") or []}})]
+                )
+
+        return {
+            "success": True,
+            "external_id": product_id,
+            "url": f"https://{shopify_settings.SHOPIFY_SHOP_DOMAIN}/products/{product['handle']}",
+            "message": "Product successfully updated on Shopify",
+        }
 
     async def _mock_update_product(
         self, item: Dict[str, Any], product_id: str
@@ -98,5 +575,93 @@ class ShopifyService:
                     "weight_unit": "lb",
                 }
             ],
-            "images": [{"src": img} for img in item.get("images", [])],
+            "images": [
+                {"src": image_variant_url(img, "shopify")}
+                for img in item.get("images", [])
+            ],
+        }
+
+    async def _hosted_sources(self, items: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Shopify's copies of the items' uploaded images, by our image URL"""
+        if self.images is None:
+            return {}
+        sources = {
+            digest: image["src"]
+            for item in items
+            for image in self._prepare_shopify_data(item)["images"]
+            for digest in [image_hash(image["src"])]
+            if digest
         }
+        if not sources:
+            return {}
+        hosted = await asyncio.to_thread(self.images.hosted_urls, "shopify", sources)
+        return {sources[digest]: url for digest, url in hosted.items()}
+
+    async def _remember_hosted(
+        self, created: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]
+    ) -> None:
+        """Record the CDN URLs Shopify gave the uploaded images of new media
+
+        Media come back in the order they were sent. Images still being
+        processed have no URL yet and are sent again next time.
+        """
+        if self.images is None:
+            return
+        hosted = {}
+        for item, product in created:
+            nodes = ((product or {}).get("media") or {}).get("nodes") or []
+            images = self._prepare_shopify_data(item)["images"]
+            if len(nodes) != len(images):
+                continue
+            for image, node in zip(images, nodes):
+                digest = image_hash(image["src"])
+                url = (node.get("image") or {}).get("url")
+                if digest and url:
+                    hosted[digest] = url
+        if hosted:
+            await asyncio.to_thread(self.images.mark_hosted, "shopify", hosted)
+
+    def _prepare_product_input(
+        self, item: Dict[str, Any], hosted: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """GraphQL productCreate variables built from the REST payload
+
+        Uploaded images Shopify already hosts (``hosted``, by image URL) are
+        sourced from its CDN instead of being fetched from us again.
+        """
+        hosted = hosted or {}
+        data = self._prepare_shopify_data(item)
+        rest_variant = data["variants"][0]
+        variant = {
+            "price": rest_variant["price"],
+            "weight": rest_variant["weight"],
+            "weightUnit": "POUNDS",
+        }
+        if shopify_settings.SHOPIFY_LOCATION_ID:
+            variant["inventoryQuantities"] = [
+                {
+                    "availableQuantity": rest_variant["inventory_quantity"],
+                    "locationId": shopify_settings.SHOPIFY_LOCATION_ID,
+                }
+            ]
+        return {
+            "input": {
+                "title": data["title"],
+                "descriptionHtml": data["body_html"],
+                "vendor": data["vendor"],
+                "productType": data["product_type"],
+                "tags": [tag for tag in data["tags"].split(",") if tag],
+                "variants": [variant],
+            },
+            "media": [
+                {
+                    "originalSource": hosted.get(image["src"], image["src"]),
+                    "mediaContentType": "IMAGE",
+                }
+                for image in data["images"]
+            ],
+        }
+
+
+# Shared service instance
+shopify_service = ShopifyService(images=image_store)
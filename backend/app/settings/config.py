@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 import os
 
 
@@ -25,10 +25,70 @@ class AppSettings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./uploader_hub.db"
+    ITEM_CACHE_SIZE: int = 10000  # Items kept in the in-process cache, 0 disables
+
+    # SQLite write-ahead log compaction
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # How long a writer waits for the lock
+    SQLITE_WAL_AUTOCHECKPOINT_PAGES: int = 0  # 0 leaves compaction to the task
+    SQLITE_WAL_CHECKPOINT_BYTES: int = 16 * 1024 * 1024  # 16MB
+    SQLITE_WAL_CHECKPOINT_INTERVAL: float = 30.0  # Seconds between size checks
 
     # File uploads
     UPLOAD_DIR: str = "./uploads"
     MAX_FILE_SIZE: int = 5 * 1024 * 1024  # 5MB
+    PUBLIC_BASE_URL: str = "http://localhost:3001"  # Prefix of uploaded image URLs
+
+    # Uploaded images are resized to each platform's preferred longest side
+    IMAGE_PLATFORM_SIZES: Dict[str, int] = {"ebay": 1600, "shopify": 2048}
+    IMAGE_THUMBNAIL_SIZE: int = 256
+    IMAGE_JPEG_QUALITY: int = 85
+    IMAGE_WORKERS: int = 0  # Resizing processes, 0 uses every core
+    # Unreferenced images are kept this long after their last upload, so an
+    # item can still be saved with them
+    IMAGE_ORPHAN_GRACE_SECONDS: float = 3600.0
+    IMAGE_COLLECT_INTERVAL: float = 600.0  # Seconds between orphan sweeps
+
+    # Bulk publishing
+    PUBLISH_MAX_CONCURRENCY: int = 20  # Platform calls in flight across all platforms
+    PUBLISH_PLATFORM_CONCURRENCY: Dict[str, int] = {"ebay": 10, "shopify": 4}
+    STATUS_FLUSH_BATCH_SIZE: int = 200  # Status updates written per transaction
+    STATUS_FLUSH_INTERVAL: float = 1.0  # Seconds between status flushes
+
+    # Retries and circuit breaker for platform API calls
+    RETRY_MAX_ATTEMPTS: int = 4
+    RETRY_BASE_DELAY: float = 0.5  # Seconds, doubled per attempt (with jitter)
+    RETRY_MAX_DELAY: float = 30.0
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open a circuit
+    CIRCUIT_RESET_TIMEOUT: float = 30.0  # Seconds before a half-open probe
+    CIRCUIT_HALF_OPEN_PROBES: int = 1
+
+    # Durable publish jobs
+    JOB_WORKERS: int = 1  # Job loops run by the API process (0: use worker.py only)
+    JOB_POLL_INTERVAL: float = 2.0  # Seconds between queue polls when idle
+    JOB_LEASE_SECONDS: float = 60.0  # Unrenewed jobs are resumed by another worker
+
+    # Outbound HTTP connection pools (one per platform)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept
+    HTTP_TIMEOUT: float = 30.0
+    HTTP2_ENABLED: bool = False  # Requires the h2 package
+
+    # Pre-publish image URL checks; results are cached per URL
+    IMAGE_VERIFY_ON_PUBLISH: bool = True
+    IMAGE_VERIFY_CONCURRENCY: int = 20
+    IMAGE_VERIFY_CACHE_SIZE: int = 10000
+    IMAGE_VERIFY_TTL: float = 3600.0  # Seconds a good result is reused
+    IMAGE_VERIFY_FAILURE_TTL: float = 300.0  # Broken URLs are rechecked sooner
+    IMAGE_VERIFY_TIMEOUT: float = 10.0
+    IMAGE_VERIFY_PROBE_BYTES: int = 64 * 1024  # Enough for the image header
+
+    # Provider rate limits per store: tokens restored per second, bucket size and
+    # default request cost (Shopify GraphQL is metered in query cost points)
+    RATE_LIMITS: Dict[str, Dict[str, float]] = {
+        "ebay": {"rate": 23.0, "capacity": 100.0, "cost": 1.0},
+        "shopify": {"rate": 50.0, "capacity": 1000.0, "cost": 10.0},
+    }
 
     # Redis (for Celery/background tasks)
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -1,24 +1,159 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.settings.config import app_settings
+from contextlib import contextmanager
+import asyncio
 import json
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-# Database setup (for future use)
-engine = create_engine(
-    app_settings.DATABASE_URL, connect_args={"check_same_thread": False}
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Database setup
+connect_args = (
+    {"check_same_thread": False}
+    if app_settings.DATABASE_URL.startswith("sqlite")
+    else {}
 )
+engine = create_engine(app_settings.DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+IS_SQLITE = engine.url.get_backend_name() == "sqlite"
+
+
+if IS_SQLITE:
+
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        """Use the write-ahead log so commits append only the changed pages"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(
+            f"PRAGMA wal_autocheckpoint={app_settings.SQLITE_WAL_AUTOCHECKPOINT_PAGES}"
+        )
+        # Wait for other processes' write locks instead of failing right away
+        cursor.execute(f"PRAGMA busy_timeout={app_settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+        # Transactions are started in _begin_sqlite instead of by the driver
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_sqlite(connection):
+        """BEGIN, or BEGIN IMMEDIATE for sessions started with begin_write"""
+        mode = connection.get_execution_options().get("sqlite_begin", "")
+        connection.exec_driver_sql(f"BEGIN {mode}".strip())
+
+
+def begin_write(db: Session) -> None:
+    """Start a session's transaction holding the database write lock
+
+    Read-modify-write transactions take the lock up front (SQLite BEGIN
+    IMMEDIATE). A deferred transaction that reads first cannot wait for
+    another process's write lock when it later writes, and fails with
+    "database is locked"; an immediate one waits up to busy_timeout.
+    """
+    db.connection(execution_options={"sqlite_begin": "IMMEDIATE"})
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive lock on ``path`` shared by every process on this host"""
+    with open(path, "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def wal_path() -> Optional[str]:
+    """Path of the SQLite write-ahead log, if there is one"""
+    database = engine.url.database
+    if not IS_SQLITE or not database or database == ":memory:":
+        return None
+    return f"{database}-wal"
+
+
+def checkpoint_wal(force: bool = False) -> bool:
+    """Fold the write-ahead log into the database file once it is large enough"""
+    path = wal_path()
+    if path is None or not os.path.exists(path):
+        return False
+    if not force and os.path.getsize(path) < app_settings.SQLITE_WAL_CHECKPOINT_BYTES:
+        return False
+
+    with engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    return True
+
+
+async def run_wal_compaction():
+    """Background task that periodically compacts the write-ahead log"""
+    while True:
+        await asyncio.sleep(app_settings.SQLITE_WAL_CHECKPOINT_INTERVAL)
+        try:
+            await asyncio.to_thread(checkpoint_wal)
+        except Exception as e:
+            print(f"⚠️  WAL checkpoint failed: {e}")
+
 
 async def init_db():
-    """Initialize database"""
-    # For now, we'll use JSON file storage
-    # In the future, this will create database tables
-    pass
+    """Initialize database tables and import any legacy JSON items"""
+    from app.repositories import item_repository
+    from app.repositories.search_index import search_index
+
+    # Every API worker runs this on startup; one at a time
+    ensure_data_dir()
+    with file_lock(INIT_LOCK_FILE):
+        Base.metadata.create_all(bind=engine)
+        # create_all skips tables that already exist, so add any newer (nullable)
+        # columns and indexes
+        inspector = inspect(engine)
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    with engine.begin() as connection:
+                        connection.exec_driver_sql(
+                            f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                            f"{column.type.compile(engine.dialect)}"
+                        )
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        search_index.create()
+
+        fixed = item_repository.fill_created_at()
+        if fixed:
+            print(f"🕒 Set a creation date on {fixed} items without one")
+
+        if not item_repository.has_counters():
+            item_repository.recount()
+
+        if item_repository.count() == 0:
+            legacy_items = [item for item in read_items() if item.get("id")]
+            if legacy_items:
+                item_repository.add_many(legacy_items)
+                print(f"📦 Imported {len(legacy_items)} items from {DATA_FILE}")
+
+        if IS_SQLITE:
+            # Refresh planner statistics so filters pick the secondary indexes
+            with engine.connect() as connection:
+                connection.exec_driver_sql("PRAGMA optimize")
 
 
 def get_db():
@@ -30,8 +165,9 @@ def get_db():
         db.close()
 
 
-# JSON file storage (temporary solution)
+# Legacy JSON file storage, imported into the database on first start
 DATA_FILE = "data/items.json"
+INIT_LOCK_FILE = "data/init.lock"
 
 
 def ensure_data_dir():
@@ -46,10 +182,3 @@ def read_items() -> List[Dict[str, Any]]:
         with open(DATA_FILE, "r") as f:
             return json.load(f)
     return []
-
-
-def write_items(items: List[Dict[str, Any]]):
-    """Write items to JSON file"""
-    ensure_data_dir()
-    with open(DATA_FILE, "w") as f:
-        json.dump(items, f, indent=2, default=str)
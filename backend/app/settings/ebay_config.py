@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
+from typing import List, Optional
 import os
 
 
@@ -18,6 +19,24 @@ class EbaySettings(BaseSettings):
     # Your Redirect URI must be registered in your eBay Developer Account (RuName)
     EBAY_REDIRECT_URI: str = "Christian_Saech-Christia-MultAi-rheygl"
 
+    EBAY_OAUTH_SCOPES: List[str] = [
+        "https://api.ebay.com/oauth/api_scope/sell.inventory",
+        "https://api.ebay.com/oauth/api_scope/sell.account",
+    ]
+    # Renew the access token this many seconds before it expires
+    EBAY_TOKEN_REFRESH_MARGIN: float = 300.0
+    EBAY_TOKEN_REFRESH_RETRY: float = 60.0  # Seconds between failed refreshes
+
+    # Inventory API offer defaults (business policies are set up in Seller Hub)
+    EBAY_MARKETPLACE_ID: str = "EBAY_US"
+    EBAY_CURRENCY: str = "USD"
+    EBAY_CONTENT_LANGUAGE: str = "en-US"
+    EBAY_DEFAULT_CATEGORY_ID: Optional[str] = None
+    EBAY_MERCHANT_LOCATION_KEY: Optional[str] = None
+    EBAY_FULFILLMENT_POLICY_ID: Optional[str] = None
+    EBAY_PAYMENT_POLICY_ID: Optional[str] = None
+    EBAY_RETURN_POLICY_ID: Optional[str] = None
+
     @property
     def EBAY_CLIENT_SECRET(self):
         """For OAuth, Cert ID acts as the Client Secret."""
@@ -32,6 +51,15 @@ class EbaySettings(BaseSettings):
             else "https://api.ebay.com"
         )
 
+    @property
+    def EBAY_ITEM_URL(self):
+        """Base URL for viewing a published listing."""
+        return (
+            "https://www.sandbox.ebay.com/itm"
+            if self.EBAY_SANDBOX
+            else "https://www.ebay.com/itm"
+        )
+
     @property
     def EBAY_OAUTH_AUTHORIZE_URL(self):
         """URL for redirecting users to grant application access (OAuth authorization code flow)."""
@@ -10,6 +10,13 @@ class ShopifySettings(BaseSettings):
     SHOPIFY_API_VERSION: str = "2024-01"
     SHOPIFY_WEBHOOK_SECRET: Optional[str] = None
 
+    # Bulk product creation (GraphQL Admin API)
+    SHOPIFY_LOCATION_ID: Optional[str] = None  # gid of the stock location
+    SHOPIFY_GRAPHQL_BATCH_SIZE: int = 10  # productCreate mutations per request
+    SHOPIFY_BULK_OPERATION_THRESHOLD: int = 250  # Use a bulk operation from here
+    SHOPIFY_BULK_POLL_INTERVAL: float = 2.0  # Seconds between status polls
+    SHOPIFY_BULK_POLL_TIMEOUT: float = 3600.0
+
     @property
     def SHOPIFY_BASE_URL(self) -> str:
         return (
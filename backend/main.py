@@ -1,15 +1,23 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 import os
 from dotenv import load_dotenv
 
-from app.routers import items, platforms, upload
+from app.routers import items, jobs, platforms, upload
 from app.routers import ebay_oauth
 from app.settings.config import app_settings
-from app.settings.database import init_db
+from app.services.ebay_service import ebay_service
+from app.services.shopify_service import shopify_service
+from app.services.image_verifier import image_verifier
+from app.services.image_processing import image_processor
+from app.services.job_worker import job_worker
+from app.settings.database import init_db, run_wal_compaction, checkpoint_wal
+from app.repositories.image_store import run_image_collection
 
 # Load environment variables
 load_dotenv()
@@ -22,11 +30,36 @@ async def lifespan(app: FastAPI):
     print("🚀 Starting Uploader Hub Backend...")
     await init_db()
     print("✅ Database initialized")
+    wal_compaction = asyncio.create_task(run_wal_compaction())
+    image_collection = asyncio.create_task(run_image_collection())
+
+    # One pooled HTTP client per platform, shared by all requests
+    ebay_service.open_client()
+    shopify_service.open_client()
+    image_verifier.open_client()
+    # Keeps the shared eBay token renewed before it expires
+    token_refresher = asyncio.create_task(ebay_service.run_token_refresher())
+
+    # Publish jobs queued or interrupted before this start are resumed here
+    job_workers = [
+        asyncio.create_task(job_worker.run()) for _ in range(app_settings.JOB_WORKERS)
+    ]
 
     yield
 
     # Shutdown
     print("🛑 Shutting down Uploader Hub Backend...")
+    wal_compaction.cancel()
+    image_collection.cancel()
+    token_refresher.cancel()
+    for task in job_workers:
+        task.cancel()
+    await asyncio.gather(*job_workers, return_exceptions=True)
+    await ebay_service.aclose()
+    await shopify_service.aclose()
+    await image_verifier.aclose()
+    await asyncio.to_thread(image_processor.shutdown)
+    checkpoint_wal(force=True)
 
 
 # Create FastAPI app
@@ -51,14 +84,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
 app.include_router(items.router, prefix="/api/items", tags=["items"])
 app.include_router(platforms.router, prefix="/api/platforms", tags=["platforms"])
 app.include_router(upload.router, prefix="/api/upload", tags=["upload"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 app.include_router(ebay_oauth.router, prefix="/api/ebay_oauth", tags=["ebay_oauth"])
 
+# Resized uploads, referenced by URL from Item.images
+os.makedirs(os.path.join(app_settings.UPLOAD_DIR, "images"), exist_ok=True)
+app.mount(
+    "/uploads/images",
+    StaticFiles(directory=os.path.join(app_settings.UPLOAD_DIR, "images")),
+    name="uploads",
+)
+
 
 @app.get("/")
 async def root():
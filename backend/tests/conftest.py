@@ -0,0 +1,81 @@
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+
+# The app reads its settings and creates the database engine on import, so
+# point it at a scratch directory before any app module is loaded
+WORK_DIR = tempfile.mkdtemp(prefix="uploader-tests-")
+os.chdir(WORK_DIR)
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(WORK_DIR, 'test.db')}",
+    UPLOAD_DIR=os.path.join(WORK_DIR, "uploads"),
+    EBAY_APP_ID=os.environ.get("EBAY_APP_ID", "test-app"),
+    EBAY_CERT_ID=os.environ.get("EBAY_CERT_ID", "test-cert"),
+    EBAY_DEV_ID=os.environ.get("EBAY_DEV_ID", "test-dev"),
+)
+
+import pytest  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Create the schema once for the test session"""
+    from app.settings.database import init_db
+
+    asyncio.run(init_db())
+
+
+@pytest.fixture
+def clean_db(database):
+    """Empty every table (and the item cache) before a test"""
+    from app.repositories import item_repository
+    from app.repositories.search_index import search_index
+    from app.settings.database import Base, engine
+
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+        if search_index.enabled:
+            connection.execute(text("DELETE FROM items_fts"))
+    item_repository.recount()
+    item_repository.cache.invalidate()
+    yield
+
+
+@pytest.fixture
+def api():
+    """Call the app in-process: api("GET", "/api/items/", params=...)"""
+    import httpx
+
+    from main import app
+
+    def call(method: str, url: str, **kwargs) -> httpx.Response:
+        async def send() -> httpx.Response:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                return await client.request(method, url, **kwargs)
+
+        return asyncio.run(send())
+
+    return call
+
+
+def make_item(item_id: str, **fields) -> dict:
+    """A complete item as the repository stores it"""
+    now = datetime.utcnow()
+    return {
+        "id": item_id,
+        "title": f"Item {item_id}",
+        "description": "Test item",
+        "price": 10.0,
+        "quantity": 1,
+        "images": [],
+        "tags": [],
+        "platforms": {"ebay": True, "shopify": False},
+        "created_at": now,
+        "updated_at": now,
+        **fields,
+    }
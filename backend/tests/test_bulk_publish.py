@@ -0,0 +1,31 @@
+from app.repositories import item_repository
+from app.repositories.job_repository import job_repository
+from tests.conftest import make_item
+
+
+def test_duplicate_items_and_platforms_are_published_once(clean_db, api):
+    item_repository.add_many([make_item("a"), make_item("b")])
+    response = api(
+        "POST",
+        "/api/platforms/bulk",
+        json={
+            "items": [{"id": "a"}, {"id": "a"}, {"id": "b"}],
+            "platforms": ["ebay", "shopify", "ebay"],
+        },
+    )
+    assert response.status_code == 200
+    job_id = response.json()["job_id"]
+
+    assert job_repository.get(job_id)["total"] == 4
+    assert job_repository.pending(job_id) == [
+        ("a", "ebay"),
+        ("a", "shopify"),
+        ("b", "ebay"),
+        ("b", "shopify"),
+    ]
+
+
+def test_create_ignores_repeated_pairs(clean_db):
+    job = job_repository.create(["a", "a"], ["ebay", "ebay"])
+    assert job["total"] == 1
+    assert job["platforms"] == ["ebay"]
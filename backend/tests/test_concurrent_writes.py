@@ -0,0 +1,43 @@
+import multiprocessing
+
+from app.models.item import PlatformStatus
+from app.repositories import item_repository
+from tests.conftest import make_item
+
+ITEM_IDS = [f"item-{n}" for n in range(10)]
+WORKERS = 6
+ROUNDS = 40
+
+
+def write_concurrently(worker: int) -> int:
+    """Interleave item updates and status batches; returns failed writes"""
+    from app.repositories import item_repository
+
+    errors = 0
+    for n in range(ROUNDS):
+        status = PlatformStatus.PUBLISHED if (n + worker) % 2 else PlatformStatus.FAILED
+        try:
+            item_repository.update(
+                ITEM_IDS[(worker + n) % len(ITEM_IDS)], {"title": f"w{worker}-{n}"}
+            )
+            item_repository.set_platform_statuses(
+                [(item_id, "ebay", {"status": status}) for item_id in ITEM_IDS[:5]]
+            )
+        except Exception as e:
+            print(f"worker {worker}: {e}")
+            errors += 1
+    return errors
+
+
+def test_counters_match_a_recount_after_concurrent_writes(clean_db):
+    item_repository.add_many([make_item(item_id) for item_id in ITEM_IDS])
+
+    # Separate processes, like several API workers sharing one database
+    with multiprocessing.get_context("spawn").Pool(WORKERS) as pool:
+        errors = pool.map(write_concurrently, range(WORKERS))
+
+    assert sum(errors) == 0
+    counters = item_repository.counters()
+    item_repository.recount()
+    assert counters == item_repository.counters()
+    assert counters["total"] == len(ITEM_IDS)
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import time
+
+import httpx
+
+from app.services.ebay_service import EBAY_BULK_BATCH_SIZE, EbayService
+
+# Entries the stub eBay rejects, per bulk call
+INVENTORY_ERRORS = {"item-03"}
+OFFER_ERRORS = {"item-30"}
+OFFER_MISSING = {"item-31"}  # No entry at all in the offer response
+PUBLISH_ERRORS = {"item-40"}
+
+
+def error(message):
+    return {"statusCode": 400, "errors": [{"longMessage": message}]}
+
+
+class StubEbay:
+    """Inventory API bulk endpoints answering with per-entry results"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        method = request.url.path.rsplit("/", 1)[1]
+        entries = json.loads(request.content)["requests"]
+        self.calls.append((method, entries))
+        responses = [getattr(self, method)(entry) for entry in entries]
+        responses = [response for response in responses if response is not None]
+        # Every entry failed: eBay answers 400, still with the entry results
+        failed = all(response["statusCode"] >= 400 for response in responses)
+        return httpx.Response(400 if failed else 207, json={"responses": responses})
+
+    def bulk_create_or_replace_inventory_item(self, entry):
+        sku = entry["sku"]
+        if sku in INVENTORY_ERRORS or sku.startswith("bad-"):
+            return {"sku": sku, **error("Invalid condition")}
+        return {"sku": sku, "statusCode": 200}
+
+    def bulk_create_offer(self, entry):
+        sku = entry["sku"]
+        if sku in OFFER_MISSING:
+            return None
+        if sku in OFFER_ERRORS:
+            return {"sku": sku, **error("Price too low")}
+        return {"sku": sku, "statusCode": 200, "offerId": f"offer-{sku}"}
+
+    def bulk_publish_offer(self, entry):
+        offer_id = entry["offerId"]
+        if offer_id.removeprefix("offer-") in PUBLISH_ERRORS:
+            return {"offerId": offer_id, **error("Missing return policy")}
+        return {
+            "offerId": offer_id,
+            "statusCode": 200,
+            "listingId": f"listing-{offer_id}",
+        }
+
+
+def service(stub):
+    ebay = EbayService(
+        client=httpx.AsyncClient(
+            transport=httpx.MockTransport(stub), base_url="https://api.test"
+        )
+    )
+    ebay.connected = True
+    ebay.access_token = "token"
+    ebay.token_expiry = time.time() + 7200
+    return ebay
+
+
+def item(item_id):
+    return {
+        "id": item_id,
+        "title": f"Item {item_id}",
+        "description": "Test item",
+        "price": 10.0,
+        "quantity": 1,
+        "images": [],
+    }
+
+
+def test_create_listings_chunks_requests_and_maps_partial_failures():
+    stub = StubEbay()
+    items = [item(f"item-{n:02}") for n in range(60)] + [
+        item(f"bad-{n}") for n in range(4)
+    ]
+    reported = []
+
+    async def on_result(item, result):
+        reported.append(item["id"])
+
+    results = asyncio.run(service(stub).create_listings(items, on_result=on_result))
+
+    inventory = [
+        [entry["sku"] for entry in entries]
+        for method, entries in stub.calls
+        if method == "bulk_create_or_replace_inventory_item"
+    ]
+    assert sorted(map(len, inventory)) == [14, 25, 25]
+    assert sorted(sum(inventory, [])) == sorted(item["id"] for item in items)
+    assert all(len(entries) <= EBAY_BULK_BATCH_SIZE for _, entries in stub.calls)
+    # Items failing a step are left out of the following steps
+    offered = [
+        e["sku"]
+        for m, entries in stub.calls
+        if m == "bulk_create_offer"
+        for e in entries
+    ]
+    assert "item-03" not in offered and "bad-0" not in offered
+    published = [
+        e["offerId"]
+        for m, entries in stub.calls
+        if m == "bulk_publish_offer"
+        for e in entries
+    ]
+    assert "offer-item-30" not in published and "offer-item-31" not in published
+
+    assert sorted(reported) == sorted(results) == sorted(item["id"] for item in items)
+    assert results["item-00"] == {
+        "success": True,
+        "external_id": "listing-offer-item-00",
+        "url": results["item-00"]["url"],
+        "message": "Item successfully listed on eBay",
+    }
+    assert results["item-00"]["url"].endswith("/listing-offer-item-00")
+    assert (
+        results["item-03"]["error"] == "eBay inventory item failed: Invalid condition"
+    )
+    assert results["bad-2"]["error"] == "eBay inventory item failed: Invalid condition"
+    assert results["item-30"]["error"] == "eBay offer failed: Price too low"
+    assert results["item-31"]["error"] == "eBay returned no result for item"
+    assert results["item-40"]["error"] == "eBay publish failed: Missing return policy"
+    failed = {item_id for item_id, result in results.items() if not result["success"]}
+    assert failed == {
+        "item-03",
+        "item-30",
+        "item-31",
+        "item-40",
+        "bad-0",
+        "bad-1",
+        "bad-2",
+        "bad-3",
+    }
+
+
+def test_a_chunk_where_every_entry_fails_reports_each_item():
+    stub = StubEbay()
+    results = asyncio.run(
+        service(stub).create_listings([item(f"bad-{n}") for n in range(3)])
+    )
+    assert [method for method, _ in stub.calls] == [
+        "bulk_create_or_replace_inventory_item"
+    ]
+    assert {result["error"] for result in results.values()} == {
+        "eBay inventory item failed: Invalid condition"
+    }
+    assert len(results) == 3
@@ -0,0 +1,38 @@
+import httpx
+
+from app.repositories.token_repository import token_repository
+from app.services.ebay_service import ebay_service
+
+ACCESS_TOKEN = "v^1.1#i^1#access-token-secret-0123456789abcdef"
+REFRESH_TOKEN = "v^1.1#i^1#refresh-token-secret-0123456789abcdef"
+
+
+def test_callback_confirms_the_tokens_without_showing_them(clean_db, api, monkeypatch):
+    def token_endpoint(request):
+        return httpx.Response(
+            200,
+            json={
+                "access_token": ACCESS_TOKEN,
+                "expires_in": 7200,
+                "refresh_token": REFRESH_TOKEN,
+                "refresh_token_expires_in": 47304000,
+            },
+        )
+
+    # The callback stores the tokens on the shared service; restore it after
+    for name in ("access_token", "token_expiry", "refresh_token"):
+        monkeypatch.setattr(ebay_service, name, getattr(ebay_service, name))
+    monkeypatch.setattr(
+        ebay_service,
+        "client",
+        httpx.AsyncClient(transport=httpx.MockTransport(token_endpoint)),
+    )
+    response = api("GET", "/api/ebay_oauth/oauth_callback", params={"code": "code"})
+
+    assert response.status_code == 200
+    assert "eBay Connection Successful!" in response.text
+    assert "expires in 7200 seconds" in response.text
+    assert "expires in 47304000 seconds" in response.text
+    for token in (ACCESS_TOKEN, REFRESH_TOKEN):
+        assert token[:10] not in response.text
+    assert token_repository.get("ebay")["access_token"] == ACCESS_TOKEN
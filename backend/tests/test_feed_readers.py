@@ -0,0 +1,68 @@
+import io
+import json
+
+import pytest
+
+from app.services.feed_readers import FeedFormatError, detect_format, read_feed
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def parquet_feed() -> bytes:
+    table = pa.table(
+        {
+            "title": ["Lamp", "Broken", "Chair"],
+            "description": ["Desk lamp", None, "Oak chair"],
+            "price": [12.5, -1.0, 40.0],
+            "quantity": [1, None, 2],
+            "images": [["http://x/1.jpg", "http://x/2.jpg"], None, []],
+            "tags": [["home"], None, ["oak", "wood"]],
+        }
+    )
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=2)
+    return buffer.getvalue()
+
+
+def test_detect_format_from_contents():
+    assert detect_format(io.BytesIO(parquet_feed())) == "parquet"
+    assert detect_format(io.BytesIO(b"title,price\nLamp,1\n")) == "csv"
+    with pytest.raises(FeedFormatError):
+        detect_format(io.BytesIO(b"PK\x03\x04not a workbook"))
+
+
+def test_parquet_chunks_are_numbered_across_row_groups():
+    chunks = list(read_feed(io.BytesIO(parquet_feed()), chunk_size=2))
+    assert [list(chunk.index) for chunk in chunks] == [[0, 1], [2]]
+    assert chunks[0].at[0, "images"] == ["http://x/1.jpg", "http://x/2.jpg"]
+
+
+def test_parquet_upload_with_null_in_failing_row(api):
+    response = api(
+        "POST",
+        "/api/upload/feed",
+        params={"chunk_size": 2},
+        files={"file": ("feed.bin", parquet_feed(), "application/octet-stream")},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["message"] == "Parsed 2 valid items from Parquet"
+    assert [item["tags"] for item in body["items"]] == [["home"], ["oak", "wood"]]
+    [error] = body["errors"]
+    assert error["row"] == 2
+    assert error["data"]["description"] is None
+    assert error["data"]["quantity"] is None
+    assert error["data"]["images"] is None
+
+
+def test_streamed_parquet_upload_is_valid_json(api):
+    response = api(
+        "POST",
+        "/api/upload/feed",
+        params={"stream": True},
+        files={"file": ("feed.bin", parquet_feed(), "application/octet-stream")},
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert "NaN" not in response.text
+    assert lines[-1]["total_errors"] == 1
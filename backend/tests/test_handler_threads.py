@@ -0,0 +1,44 @@
+import asyncio
+import sqlite3
+import time
+
+import httpx
+
+from app.repositories import item_repository
+from app.settings.database import engine
+from main import app
+from tests.conftest import make_item
+
+
+def test_write_waiting_for_the_lock_does_not_block_other_requests(clean_db):
+    item_repository.add(make_item("item-1", title="Lamp"))
+
+    # Another process holds the database write lock
+    locker = sqlite3.connect(engine.url.database, isolation_level=None)
+    locker.execute("BEGIN IMMEDIATE")
+
+    async def scenario():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            update = asyncio.create_task(
+                client.put("/api/items/item-1", json={"title": "Desk lamp"})
+            )
+            await asyncio.sleep(0.2)
+            started = time.monotonic()
+            response = await client.get("/api/platforms/circuits")
+            answered_in = time.monotonic() - started
+            assert not update.done()
+
+            locker.execute("COMMIT")
+            return response, answered_in, await update
+
+    try:
+        response, answered_in, updated = asyncio.run(scenario())
+    finally:
+        locker.close()
+
+    assert response.status_code == 200
+    assert answered_in < 0.5
+    assert updated.status_code == 200
+    assert updated.json()["title"] == "Desk lamp"
@@ -0,0 +1,73 @@
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.models.orm import ImageRecord
+from app.repositories.image_store import ImageStore
+from app.settings.database import engine
+
+DIGEST = "a" * 64
+OTHER = "b" * 64
+
+
+def store(tmp_path, **options) -> ImageStore:
+    return ImageStore(str(tmp_path), **options)
+
+
+def stored(image_store: ImageStore, digest: str) -> None:
+    os.makedirs(image_store.image_dir(digest))
+    image_store.register(digest, 100, {"ebay": {"filename": "ebay.jpg"}})
+
+
+def uploaded(digest: str, ago: timedelta) -> None:
+    with engine.begin() as connection:
+        connection.execute(
+            update(ImageRecord)
+            .where(ImageRecord.hash == digest)
+            .values(uploaded_at=datetime.utcnow() - ago)
+        )
+
+
+def test_hosted_urls_are_shared_between_processes(clean_db, tmp_path):
+    api, worker = store(tmp_path), store(tmp_path)
+    stored(api, DIGEST)
+    stored(api, OTHER)
+
+    worker.mark_hosted(
+        "shopify", {DIGEST: "https://cdn/1.jpg", OTHER: "https://cdn/2.jpg"}
+    )
+    assert api.hosted_urls("shopify", [DIGEST]) == {DIGEST: "https://cdn/1.jpg"}
+
+    # Re-hosted and forgotten elsewhere
+    worker.mark_hosted("shopify", {DIGEST: "https://cdn/3.jpg"})
+    worker.forget_hosted("shopify", ["https://cdn/2.jpg"])
+    assert api.hosted_urls("shopify", [DIGEST, OTHER]) == {DIGEST: "https://cdn/3.jpg"}
+
+    # Deleted elsewhere
+    uploaded(DIGEST, timedelta(days=1))
+    assert worker.collect([DIGEST]) == 1
+    assert api.hosted_urls("shopify", [DIGEST]) == {}
+
+
+def test_recent_uploads_are_kept_without_references(clean_db, tmp_path):
+    images = store(tmp_path, grace_seconds=3600)
+    stored(images, DIGEST)
+    stored(images, OTHER)
+    uploaded(OTHER, timedelta(hours=2))
+
+    assert images.collect([DIGEST, OTHER]) == 1
+    assert images.get(DIGEST) is not None
+    assert images.get(OTHER) is None
+    assert not os.path.exists(images.image_dir(OTHER))
+
+
+def test_uploading_an_image_again_restarts_its_grace_period(clean_db, tmp_path):
+    images = store(tmp_path, grace_seconds=3600)
+    stored(images, DIGEST)
+    uploaded(DIGEST, timedelta(hours=2))
+
+    assert images.reuse(DIGEST)["variants"] == {"ebay": {"filename": "ebay.jpg"}}
+    assert images.collect() == 0
+    uploaded(DIGEST, timedelta(hours=2))
+    assert images.collect() == 1
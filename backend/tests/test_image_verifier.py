@@ -0,0 +1,165 @@
+import asyncio
+import io
+
+import httpx
+from PIL import Image
+
+from app.services import image_verifier as image_verifier_module
+from app.services.image_verifier import ImageVerifier
+
+
+def png(width: int = 40, height: int = 30) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+IMAGE = png()
+
+
+class Chunks(httpx.AsyncByteStream):
+    """Response body sent in fixed-size chunks, counting those read"""
+
+    def __init__(self, body: bytes, size: int):
+        self.parts = [body[n : n + size] for n in range(0, len(body), size)]
+        self.read = 0
+
+    async def __aiter__(self):
+        for part in self.parts:
+            self.read += 1
+            yield part
+
+
+def verifier(handler, **options) -> ImageVerifier:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return ImageVerifier(client=client, **options)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_partial_content_reports_the_full_size_from_content_range():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(
+            206,
+            headers={
+                "Content-Type": "image/png",
+                "Content-Range": f"bytes 0-99/{len(IMAGE) + 5000}",
+            },
+            content=IMAGE[:100],
+        )
+
+    info = run(verifier(handler, probe_bytes=100).verify("https://cdn/a.png"))
+    assert requests[0].headers["Range"] == "bytes=0-99"
+    assert info["ok"] and info["error"] is None
+    assert (info["status"], info["content_type"]) == (206, "image/png")
+    assert (info["size"], info["width"], info["height"]) == (len(IMAGE) + 5000, 40, 30)
+
+
+def test_server_ignoring_range_is_read_only_up_to_the_header():
+    body = IMAGE + b"\0" * 200_000
+    stream = Chunks(body, 1024)
+
+    def handler(request):
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "image/png", "Content-Length": str(len(body))},
+            stream=stream,
+        )
+
+    info = run(verifier(handler).verify("https://cdn/full.png"))
+    assert info["ok"] and info["status"] == 200
+    assert (info["size"], info["width"]) == (len(body), 40)
+    assert stream.read < len(stream.parts) / 10
+
+
+def test_non_image_content_type_fails():
+    def handler(request):
+        return httpx.Response(
+            200, headers={"Content-Type": "text/html; charset=utf-8"}, content=b"<html>"
+        )
+
+    info = run(verifier(handler).verify("https://cdn/page"))
+    assert not info["ok"]
+    assert info["error"] == "Not an image (text/html)"
+
+
+def test_not_found_fails_with_the_status():
+    info = run(
+        verifier(lambda request: httpx.Response(404)).verify("https://cdn/gone.png")
+    )
+    assert not info["ok"]
+    assert (info["status"], info["error"]) == (404, "HTTP 404")
+
+
+def test_concurrent_checks_of_one_url_share_a_request():
+    requests = []
+
+    async def handler(request):
+        requests.append(str(request.url))
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, headers={"Content-Type": "image/png"}, content=IMAGE)
+
+    checker = verifier(handler)
+
+    async def check():
+        return await asyncio.gather(
+            *(checker.verify("https://cdn/shared.png") for _ in range(10)),
+            checker.verify_many(["https://cdn/other.png", "https://cdn/shared.png"]),
+        )
+
+    *results, many = run(check())
+    assert sorted(requests) == ["https://cdn/other.png", "https://cdn/shared.png"]
+    assert all(info is results[0] for info in results)
+    assert many["https://cdn/shared.png"] is results[0]
+    assert (checker.misses, checker.hits) == (2, 10)
+
+
+def counting_handler(requests):
+    def handler(request):
+        requests.append(request.url.path)
+        if request.url.path == "/missing.png":
+            return httpx.Response(404)
+        return httpx.Response(200, headers={"Content-Type": "image/png"}, content=IMAGE)
+
+    return handler
+
+
+def check(checker, *paths):
+    async def verify():
+        for path in paths:
+            await checker.verify(f"https://cdn{path}")
+
+    run(verify())
+
+
+def test_results_expire_after_their_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(image_verifier_module.time, "monotonic", lambda: now[0])
+    requests = []
+    checker = verifier(counting_handler(requests), ttl=60, failure_ttl=10)
+
+    check(checker, "/a.png", "/missing.png", "/a.png", "/missing.png")
+    assert requests == ["/a.png", "/missing.png"]
+
+    # Failures are checked again sooner than successes
+    now[0] += 30
+    check(checker, "/a.png", "/missing.png")
+    assert requests[2:] == ["/missing.png"]
+    now[0] += 31
+    check(checker, "/a.png")
+    assert requests[3:] == ["/a.png"]
+
+
+def test_the_least_recently_used_result_is_evicted():
+    requests = []
+    checker = verifier(counting_handler(requests), cache_size=2)
+
+    check(checker, "/a.png", "/b.png", "/a.png", "/c.png")
+    assert checker.stats()["size"] == 2
+    check(checker, "/a.png", "/b.png")
+    assert requests == ["/a.png", "/b.png", "/c.png", "/b.png"]
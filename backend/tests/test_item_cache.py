@@ -0,0 +1,47 @@
+from app.repositories.item_cache import ItemCache
+from app.repositories.item_repository import ItemRepository
+from tests.conftest import make_item
+
+
+def test_put_after_an_invalidation_is_skipped():
+    cache = ItemCache(max_size=10)
+    cache.put(make_item("a", title="Cached"), cache.generation())
+
+    generation = cache.generation()  # A reader starts loading "a"
+    cache.invalidate("a")  # A writer commits a new version
+    cache.put(make_item("a", title="Old"), generation)
+    assert cache.get("a") is None
+
+    cache.put(make_item("a", title="New"), cache.generation())
+    assert cache.get("a")["title"] == "New"
+
+
+def test_clearing_the_cache_also_skips_pending_puts():
+    cache = ItemCache(max_size=10)
+    generation = cache.generation()
+    cache.invalidate()
+    cache.put(make_item("a"), generation)
+    assert cache.stats()["size"] == 0
+
+
+def test_a_read_racing_with_an_update_does_not_cache_the_old_item(
+    clean_db, monkeypatch
+):
+    # No database file to watch, so only the invalidation protects the cache
+    repository = ItemRepository(cache=ItemCache(max_size=10))
+    repository.add(make_item("item-1", title="Before"))
+    load = repository._load
+    raced = []
+
+    def load_then_update(db, records):
+        items = load(db, records)
+        if not raced:
+            # The update commits after the read but before the cache put
+            raced.append(True)
+            repository.update("item-1", {"title": "After"})
+        return items
+
+    monkeypatch.setattr(repository, "_load", load_then_update)
+    assert repository.get("item-1")["title"] == "Before"
+    assert repository.get("item-1")["title"] == "After"
+    assert repository.get_many(["item-1"])[0]["title"] == "After"
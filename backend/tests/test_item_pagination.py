@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.orm import CounterRecord, PlatformStatusRecord
+from app.repositories import item_repository
+from app.repositories.item_repository import ItemRepository
+from tests.conftest import make_item
+
+
+def walk(repository, limit, **filters):
+    """Follow next cursors to the end; returns item IDs per page"""
+    pages, cursor = [], None
+    while True:
+        items, cursor = repository.list_page(limit=limit, cursor=cursor, **filters)
+        pages.append([item["id"] for item in items])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_cover_every_item_once(clean_db):
+    start = datetime(2024, 1, 1)
+    # Equal timestamps are ordered by ID
+    item_repository.add_many(
+        [
+            make_item(f"item-{n:02}", created_at=start + timedelta(minutes=n // 3))
+            for n in range(25)
+        ]
+    )
+    pages = walk(item_repository, limit=4)
+    assert [len(page) for page in pages] == [4, 4, 4, 4, 4, 4, 1]
+    assert sum(pages, []) == [f"item-{n:02}" for n in range(25)]
+
+
+def test_items_added_during_a_walk_do_not_shift_pages(clean_db):
+    item_repository.add_many(
+        [make_item(f"a{n}", created_at=datetime(2024, 1, 1, 0, n)) for n in range(6)]
+    )
+    first, cursor = item_repository.list_page(limit=3)
+    item_repository.add(make_item("early", created_at=datetime(2023, 1, 1)))
+    second, _ = item_repository.list_page(limit=3, cursor=cursor)
+    assert [item["id"] for item in first + second] == [f"a{n}" for n in range(6)]
+
+
+def test_items_without_created_at_get_one_and_are_paginated(clean_db, api):
+    item_repository.add_many(
+        [make_item(f"old-{n}", created_at=None, updated_at=None) for n in range(3)]
+        + [make_item(f"new-{n}") for n in range(3)]
+    )
+    seen, cursor = [], None
+    while True:
+        response = api(
+            "GET",
+            "/api/items/",
+            params={"limit": 2, **({"cursor": cursor} if cursor else {})},
+        )
+        assert response.status_code == 200
+        seen += [item["id"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(
+        [f"old-{n}" for n in range(3)] + [f"new-{n}" for n in range(3)]
+    )
+
+
+def test_fill_created_at_fixes_null_rows_of_older_databases(tmp_path):
+    # Databases created before created_at was required allow NULLs
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TABLE items (id VARCHAR(36) PRIMARY KEY, title VARCHAR(255), "
+            "description TEXT, category VARCHAR(255), created_at DATETIME, "
+            "updated_at DATETIME, data TEXT)"
+        )
+        for n in range(5):
+            connection.exec_driver_sql(
+                "INSERT INTO items VALUES (?, 'Old', 'd', 'General', NULL, ?, '{}')",
+                (f"old-{n}", "2024-01-01 00:00:00.000000" if n % 2 else None),
+            )
+    PlatformStatusRecord.__table__.create(engine)
+    CounterRecord.__table__.create(engine)
+    repository = ItemRepository(session_factory=sessionmaker(bind=engine))
+
+    # A NULL sort key would end the walk after the first page
+    assert repository.fill_created_at() == 5
+    assert repository.fill_created_at() == 0
+    pages = walk(repository, limit=2)
+    assert sorted(sum(pages, [])) == [f"old-{n}" for n in range(5)]
+
+
+def test_malformed_cursor_is_rejected(clean_db):
+    with pytest.raises(ValueError):
+        item_repository.list_page(cursor="not-a-cursor")
@@ -0,0 +1,83 @@
+import json
+
+import pandas as pd
+
+from app.services.item_transform import transform_frame
+
+CSV = (
+    "title,description,price,quantity,images\n"
+    "Good,Fine,10,1,http://x/1.jpg\n"
+    "Bad,,abc,1,\n"
+)
+
+
+def test_error_rows_report_empty_cells_as_none():
+    df = pd.DataFrame(
+        {
+            "title": ["Good", "Bad"],
+            "description": ["Fine", float("nan")],
+            "price": [10, "x"],
+        }
+    )
+    items, errors = transform_frame(df)
+    assert [item["title"] for item in items] == ["Good"]
+    assert errors == [
+        {
+            "row": 2,
+            "error": "Invalid price: 'x'",
+            "data": {"title": "Bad", "description": None, "price": "x"},
+        }
+    ]
+    json.dumps(errors, allow_nan=False)
+
+
+def test_csv_upload_with_empty_cell_in_failing_row(api):
+    response = api(
+        "POST", "/api/upload/csv", files={"file": ("items.csv", CSV, "text/csv")}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_items"] == 1
+    assert body["errors"][0]["row"] == 2
+    assert body["errors"][0]["data"]["description"] is None
+    assert body["errors"][0]["data"]["images"] is None
+
+
+def test_streamed_csv_upload_is_valid_json(api):
+    response = api(
+        "POST",
+        "/api/upload/csv",
+        params={"stream": True},
+        files={"file": ("items.csv", CSV, "text/csv")},
+    )
+    assert response.status_code == 200
+    assert "NaN" not in response.text
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    error = next(line for line in lines if line["type"] == "error")
+    assert error["data"]["description"] is None
+    assert lines[-1]["type"] == "summary"
+
+
+def test_column_checks_match_pydantic_validation(monkeypatch):
+    from app.services import item_transform
+
+    df = pd.DataFrame(
+        {
+            "title": ["Good", "", "x" * 256, "Odd", "Free", " Trim "],
+            "description": ["Fine", "Fine", "Fine", "Fine", "Fine", " Desc "],
+            "price": [10, 5, 5, 5, 0, "2.5"],
+            "quantity": [1, 1, 1, 1, 1, "3"],
+            "condition": ["New", "Used", "New", "Broken", "New", None],
+            "images": ["a.jpg, b.jpg", None, "", "", "", " ,c.jpg"],
+            "weight": [1, 1, 1, 1, 1, -1],
+            "ebay": ["yes", "no", "1", "0", "true", None],
+        }
+    )
+    checked = transform_frame(df)
+    monkeypatch.setattr(item_transform, "_accepted_rows", lambda model, columns: None)
+    validated = transform_frame(df)
+    assert checked == validated
+    assert [type(item["weight"]) for item in checked[0]] == [float]
+    assert type(checked[0][0]["condition"]) is type(validated[0][0]["condition"])
+    assert [item["title"] for item in checked[0]] == ["Good"]
+    assert [error["row"] for error in checked[1]] == [2, 3, 4, 5, 6]
@@ -0,0 +1,24 @@
+import asyncio
+
+from app.repositories.job_repository import job_repository
+from app.routers import jobs as jobs_router
+from app.services.job_events import job_events
+
+
+class Connected:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def test_stream_ends_cleanly_when_the_job_is_deleted(clean_db, monkeypatch):
+    job = job_repository.create(["a"], ["ebay"])
+    monkeypatch.setattr(jobs_router.job_repository, "get", lambda job_id: None)
+
+    async def stream():
+        return [
+            event async for event in jobs_router._job_events(Connected(), job, 0.01)
+        ]
+
+    events = asyncio.run(stream())
+    assert len(events) == 1 and events[0].startswith("event: progress")
+    assert not job_events.has_subscribers(job["id"])
@@ -0,0 +1,83 @@
+import asyncio
+
+from app.models.job import JobStatus
+from app.services.job_worker import JobWorker
+
+LEASE = 0.3
+
+
+class StubJobs:
+    """Job queue whose heartbeats fail a given number of times"""
+
+    def __init__(self, heartbeat_failures: int):
+        self.heartbeat_failures = heartbeat_failures
+        self.heartbeats = 0
+        self.calls = []
+
+    def heartbeat(self, job_id, worker_id):
+        self.heartbeats += 1
+        if self.heartbeats <= self.heartbeat_failures:
+            raise RuntimeError("database is locked")
+        return True
+
+    def finish(self, job_id, status, error=None):
+        self.calls.append(("finish", status))
+
+    def release(self, job_id, worker_id):
+        self.calls.append(("release",))
+
+    def get(self, job_id):
+        return None
+
+
+def worker(jobs, publish_seconds):
+    job_worker = JobWorker(jobs, None, None, None, lease_seconds=LEASE)
+
+    async def publish(job):
+        await asyncio.sleep(publish_seconds)
+
+    job_worker._publish = publish
+    return job_worker
+
+
+def test_a_failed_heartbeat_is_retried_on_the_next_tick():
+    jobs = StubJobs(heartbeat_failures=1)
+    asyncio.run(worker(jobs, publish_seconds=LEASE * 2).process({"id": "job"}))
+    assert jobs.heartbeats >= 3
+    assert jobs.calls == [("finish", JobStatus.COMPLETED)]
+
+
+def test_publishing_stops_before_an_unrenewed_lease_expires():
+    jobs = StubJobs(heartbeat_failures=100)
+    stopped = {}
+
+    async def run():
+        job_worker = worker(jobs, publish_seconds=LEASE * 10)
+        started = asyncio.get_running_loop().time()
+        await job_worker.process({"id": "job"})
+        stopped["after"] = asyncio.get_running_loop().time() - started
+
+    asyncio.run(run())
+    assert stopped["after"] < LEASE
+    assert jobs.heartbeats == 2
+    # Neither finished nor released: the job is left for the next claim
+    assert jobs.calls == []
+
+
+def test_a_crashed_lease_task_is_not_taken_for_a_lost_lease():
+    jobs = StubJobs(heartbeat_failures=0)
+    job_worker = worker(jobs, publish_seconds=LEASE * 10)
+
+    async def crash(job_id, task):
+        raise RuntimeError("boom")
+
+    job_worker._keep_lease = crash
+
+    async def run():
+        process = asyncio.create_task(job_worker.process({"id": "job"}))
+        await asyncio.sleep(0.05)
+        process.cancel()
+        await asyncio.gather(process, return_exceptions=True)
+
+    asyncio.run(run())
+    assert jobs.calls == [("release",)]
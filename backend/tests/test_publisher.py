@@ -0,0 +1,88 @@
+import asyncio
+import time
+from collections import Counter
+
+from app.services.publisher import BulkPublisher
+
+CALL_SECONDS = 0.02
+
+
+class StubPlatform:
+    """Platform call that takes a fixed time and records how many overlap"""
+
+    def __init__(self, name: str, in_flight: Counter, peaks: Counter):
+        self.name = name
+        self.in_flight = in_flight
+        self.peaks = peaks
+        self.published = []
+
+    async def __call__(self, item):
+        self.in_flight[self.name] += 1
+        self.in_flight["all"] += 1
+        for key in (self.name, "all"):
+            self.peaks[key] = max(self.peaks[key], self.in_flight[key])
+        try:
+            await asyncio.sleep(CALL_SECONDS)
+            if item.get("fail") == self.name:
+                raise RuntimeError(f"{self.name} is down")
+            self.published.append(item["id"])
+            return {"success": True, "external_id": f"{self.name}-{item['id']}"}
+        finally:
+            self.in_flight[self.name] -= 1
+            self.in_flight["all"] -= 1
+
+
+def stub_platforms(*names):
+    in_flight, peaks = Counter(), Counter()
+    return {name: StubPlatform(name, in_flight, peaks) for name in names}, peaks
+
+
+def test_concurrency_limits_hold_and_publishing_runs_in_parallel():
+    calls, peaks = stub_platforms("ebay", "shopify")
+    publisher = BulkPublisher(
+        calls, max_concurrency=8, platform_limits={"ebay": 3, "shopify": 6}
+    )
+    items = [{"id": f"item-{n}"} for n in range(30)]
+
+    started = time.perf_counter()
+    results = asyncio.run(publisher.publish(items, ["ebay", "shopify"]))
+    elapsed = time.perf_counter() - started
+
+    assert peaks["ebay"] == 3
+    assert peaks["shopify"] <= 6
+    assert peaks["all"] == 8
+    assert sorted(calls["ebay"].published) == sorted(item["id"] for item in items)
+    assert [result["item_id"] for result in results] == [item["id"] for item in items]
+    # eBay's limit bounds the run at 10 rounds; one at a time would take 60
+    sequential = len(items) * len(calls) * CALL_SECONDS
+    assert elapsed < sequential / 3
+
+
+def test_a_failing_call_only_fails_its_own_entry():
+    calls, _ = stub_platforms("ebay", "shopify")
+    publisher = BulkPublisher(calls, max_concurrency=4)
+    items = [{"id": "ok"}, {"id": "broken", "fail": "shopify"}]
+    results = asyncio.run(publisher.publish(items, ["ebay", "shopify"]))
+
+    assert [entry["success"] for entry in results[0]["platforms"]] == [True, True]
+    ebay, shopify = results[1]["platforms"]
+    assert ebay["success"] and ebay["external_id"] == "ebay-broken"
+    assert not shopify["success"] and shopify["message"] == "shopify is down"
+
+
+def test_batch_platforms_get_one_call_with_every_item():
+    calls, _ = stub_platforms("ebay", "shopify")
+    batches = []
+
+    async def shopify_batch(items, on_result):
+        batches.append([item["id"] for item in items])
+        for item in items:
+            await on_result(item, {"success": True, "external_id": "gid"})
+
+    publisher = BulkPublisher(calls, batch_calls={"shopify": shopify_batch})
+    items = [{"id": f"item-{n}"} for n in range(5)]
+    results = asyncio.run(publisher.publish(items, ["ebay", "shopify"]))
+
+    assert batches == [[item["id"] for item in items]]
+    assert calls["shopify"].published == []
+    assert all(entry["success"] for result in results for entry in result["platforms"])
@@ -0,0 +1,70 @@
+import asyncio
+
+from app.repositories import item_repository
+from app.services.change_detection import ChangeDetector
+from app.services.job_worker import status_from_result
+from app.services.publisher import BulkPublisher
+from tests.conftest import make_item
+
+
+class StubPlatform:
+    """Creates and updates listings, failing while ``down`` is set"""
+
+    def __init__(self):
+        self.calls = []
+        self.down = False
+
+    async def create(self, item):
+        self.calls.append(("create", item["id"]))
+        return {"success": True, "external_id": "listing-1", "url": "https://x/1"}
+
+    async def update(self, item, external_id, fields=None):
+        self.calls.append(("update", external_id, fields))
+        if self.down:
+            return {"success": False, "error": "Service unavailable"}
+        return {"success": True, "external_id": external_id, "url": "https://x/1"}
+
+
+def publish(publisher, item_id):
+    async def record(item, platform, result):
+        item_repository.set_platform_status(
+            item["id"], platform, status_from_result(result)
+        )
+
+    item = item_repository.get(item_id)
+    asyncio.run(publisher.publish([item], ["shopify"], on_result=record))
+    return item_repository.get(item_id)["platform_status"]["shopify"]
+
+
+def test_a_failed_update_keeps_the_listing_and_is_retried_as_an_update(clean_db):
+    platform = StubPlatform()
+    publisher = BulkPublisher(
+        {"shopify": platform.create},
+        update_calls={"shopify": platform.update},
+        detector=ChangeDetector({"shopify": lambda item: {"title": item["title"]}}),
+    )
+    item_repository.add(make_item("item-1", title="First"))
+    assert publish(publisher, "item-1")["content_hash"]
+
+    item_repository.update("item-1", {"title": "Second"})
+    platform.down = True
+    status = publish(publisher, "item-1")
+    assert status["status"] == "failed"
+    assert status["message"] == "Service unavailable"
+    assert (status["external_id"], status["url"]) == ("listing-1", "https://x/1")
+    assert status["content_hash"] is None and status["field_hashes"] is None
+
+    # Retried as a full update of the existing listing, not a second create
+    platform.down = False
+    status = publish(publisher, "item-1")
+    assert status["status"] == "published"
+    assert status["content_hash"]
+    assert platform.calls == [
+        ("create", "item-1"),
+        ("update", "listing-1", ["title"]),
+        ("update", "listing-1", None),
+    ]
+
+    # And once published again, unchanged items are skipped
+    publish(publisher, "item-1")
+    assert len(platform.calls) == 3
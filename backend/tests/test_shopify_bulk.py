@@ -0,0 +1,235 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services.shopify_service import ShopifyService
+from app.settings.shopify_config import shopify_settings
+
+SHOP = "shop.test"
+RESULTS_URL = "https://results.test/products.jsonl"
+STAGED_URL = "https://uploads.test/stage"
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    monkeypatch.setattr(shopify_settings, "SHOPIFY_SHOP_DOMAIN", SHOP)
+    monkeypatch.setattr(shopify_settings, "SHOPIFY_GRAPHQL_BATCH_SIZE", 3)
+    monkeypatch.setattr(shopify_settings, "SHOPIFY_BULK_OPERATION_THRESHOLD", 8)
+    monkeypatch.setattr(shopify_settings, "SHOPIFY_BULK_POLL_INTERVAL", 0)
+    return shopify_settings
+
+
+def service(handler) -> ShopifyService:
+    shopify = ShopifyService(
+        client=httpx.AsyncClient(
+            transport=httpx.MockTransport(handler),
+            base_url=f"https://{SHOP}/admin/api/2024-01",
+            headers={"X-Shopify-Access-Token": "secret"},
+        )
+    )
+    shopify.connected = True
+    return shopify
+
+
+def item(item_id):
+    return {
+        "id": item_id,
+        "title": f"Item {item_id}",
+        "description": "Test item",
+        "price": 10.0,
+        "quantity": 1,
+        "tags": ["a", "b"],
+        "images": [],
+    }
+
+
+def product(title):
+    handle = title.lower().replace(" ", "-")
+    return {"id": f"gid://shopify/Product/{handle}", "handle": handle, "media": None}
+
+
+def rejected(title):
+    return title.endswith("-bad")
+
+
+def test_product_batches_map_user_errors_per_alias(settings):
+    batches = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        assert body["query"].startswith("mutation batch(")
+        inputs = {
+            name: value
+            for name, value in body["variables"].items()
+            if name.startswith("input")
+        }
+        batches.append([value["title"] for value in inputs.values()])
+        data = {}
+        for name, value in inputs.items():
+            alias = "p" + name.removeprefix("input")
+            if rejected(value["title"]):
+                data[alias] = {
+                    "product": None,
+                    "userErrors": [{"field": ["title"], "message": "is taken"}],
+                }
+            else:
+                data[alias] = {"product": product(value["title"]), "userErrors": []}
+        return httpx.Response(200, json={"data": data})
+
+    items = [item("1"), item("2-bad"), item("3"), item("4"), item("5-bad")]
+    results = asyncio.run(service(handler).create_products(items))
+
+    assert sorted(map(len, batches)) == [2, 3]
+    assert results["1"] == {
+        "success": True,
+        "external_id": "gid://shopify/Product/item-1",
+        "url": f"https://{SHOP}/products/item-1",
+        "message": "Product successfully created on Shopify",
+    }
+    for item_id in ("2-bad", "5-bad"):
+        assert results[item_id] == {
+            "success": False,
+            "error": "Failed to create product: title: is taken",
+        }
+    assert results["3"]["success"] and results["4"]["success"]
+
+
+def test_top_level_errors_fail_every_product_of_the_batch(settings):
+    def handler(request):
+        return httpx.Response(200, json={"errors": [{"message": "Internal error"}]})
+
+    results = asyncio.run(service(handler).create_products([item("1"), item("2")]))
+    assert {result["error"] for result in results.values()} == {
+        "Failed to create product: Internal error"
+    }
+
+
+class StubBulkShopify:
+    """Staged upload, bulk mutation and polling endpoints of the Admin API"""
+
+    def __init__(self, polls_until_done: int = 2):
+        self.polls_until_done = polls_until_done
+        self.polls = 0
+        self.uploaded = None
+        self.external_headers = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host != SHOP:
+            self.external_headers.append(request.headers)
+            if str(request.url) == STAGED_URL:
+                self.uploaded = request.content
+                return httpx.Response(201)
+            return httpx.Response(200, text=self.result_lines())
+
+        body = json.loads(request.content)
+        query = body["query"]
+        if "stagedUploadsCreate" in query:
+            target = {
+                "url": STAGED_URL,
+                "resourceUrl": None,
+                "parameters": [
+                    {"name": "key", "value": "tmp/products.jsonl"},
+                    {"name": "policy", "value": "signed"},
+                ],
+            }
+            payload = {"stagedTargets": [target], "userErrors": []}
+            return httpx.Response(200, json={"data": {"stagedUploadsCreate": payload}})
+        if "bulkOperationRunMutation" in query:
+            assert body["variables"]["path"] == "tmp/products.jsonl"
+            assert "productCreate" in body["variables"]["mutation"]
+            operation = {"id": "gid://shopify/BulkOperation/1", "status": "CREATED"}
+            payload = {"bulkOperation": operation, "userErrors": []}
+            return httpx.Response(
+                200, json={"data": {"bulkOperationRunMutation": payload}}
+            )
+        assert "bulkOperation(" in query
+        self.polls += 1
+        done = self.polls >= self.polls_until_done
+        node = {
+            "id": body["variables"]["id"],
+            "status": "COMPLETED" if done else "RUNNING",
+            "errorCode": None,
+            "objectCount": "0",
+            "url": RESULTS_URL if done else None,
+            "partialDataUrl": None,
+        }
+        return httpx.Response(200, json={"data": {"node": node}})
+
+    def inputs(self):
+        return [json.loads(line) for line in self.uploaded_file().splitlines()]
+
+    def uploaded_file(self) -> str:
+        # The JSONL file is the multipart part named "file"
+        part = self.uploaded.split(b'name="file"', 1)[1]
+        content = part.split(b"\r\n\r\n", 1)[1].rsplit(b"\r\n--", 1)[0]
+        return content.decode()
+
+    def result_lines(self) -> str:
+        lines = []
+        for position, variables in enumerate(self.inputs()):
+            title = variables["input"]["title"]
+            if title.endswith("-lost"):
+                continue  # No result line for this product
+            if rejected(title):
+                payload = {
+                    "product": None,
+                    "userErrors": [{"field": ["title"], "message": "is taken"}],
+                }
+            else:
+                payload = {"product": product(title), "userErrors": []}
+            lines.append(
+                json.dumps(
+                    {"data": {"productCreate": payload}, "__lineNumber": position}
+                )
+            )
+        return "\n".join(lines) + "\n"
+
+
+def test_large_sets_use_a_staged_upload_and_a_polled_bulk_operation(settings):
+    stub = StubBulkShopify(polls_until_done=3)
+    items = [item(str(n)) for n in range(8)]
+    items[2], items[5] = item("2-bad"), item("5-lost")
+    reported = []
+
+    async def on_result(item, result):
+        reported.append(item["id"])
+
+    results = asyncio.run(service(stub).create_products(items, on_result=on_result))
+
+    assert [line["input"]["title"] for line in stub.inputs()] == [
+        f"Item {item['id']}" for item in items
+    ]
+    assert stub.polls == 3
+    # Staged upload and result URLs never get the shop access token
+    assert len(stub.external_headers) == 2
+    assert all("X-Shopify-Access-Token" not in h for h in stub.external_headers)
+
+    assert reported == [item["id"] for item in items]
+    assert results["0"]["external_id"] == "gid://shopify/Product/item-0"
+    assert results["2-bad"]["error"] == "Failed to create product: title: is taken"
+    assert results["5-lost"] == {
+        "success": False,
+        "error": "Bulk operation completed (no result for product)",
+    }
+    assert sum(result["success"] for result in results.values()) == 6
+
+
+def test_a_failed_bulk_operation_fails_every_product(settings):
+    class FailedOperation(StubBulkShopify):
+        def __call__(self, request):
+            response = super().__call__(request)
+            if request.url.host == SHOP and b"bulkOperation(" in request.content:
+                body = response.json()
+                body["data"]["node"].update(
+                    status="FAILED", errorCode="INTERNAL_SERVER_ERROR", url=None
+                )
+                return httpx.Response(200, json=body)
+            return response
+
+    items = [item(str(n)) for n in range(8)]
+    results = asyncio.run(service(FailedOperation(1)).create_products(items))
+    assert {result["error"] for result in results.values()} == {
+        "Bulk operation failed (INTERNAL_SERVER_ERROR)"
+    }
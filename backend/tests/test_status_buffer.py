@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.repositories import item_repository
+from app.repositories.job_repository import job_repository
+from app.repositories.status_buffer import StatusWriteBuffer
+from tests.conftest import make_item
+
+PUBLISHED = {"status": "published", "external_id": "ext-1", "url": "https://x"}
+
+
+def flush(buffer, updates):
+    async def run():
+        for item_id, platform, info in updates:
+            await buffer.add(item_id, platform, info)
+        await buffer.flush()
+
+    asyncio.run(run())
+
+
+def test_job_results_and_item_statuses_commit_together(clean_db, monkeypatch):
+    item_repository.add(make_item("item-1"))
+    job = job_repository.create(["item-1"], ["ebay"])
+    buffer = StatusWriteBuffer(item_repository, jobs=job_repository, job_id=job["id"])
+
+    # Fail the item status write after the job results were written
+    def fail(db, deltas):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(item_repository, "_adjust_counters", fail)
+    with pytest.raises(RuntimeError):
+        flush(buffer, [("item-1", "ebay", PUBLISHED)])
+
+    assert job_repository.pending(job["id"]) == [("item-1", "ebay")]
+    assert job_repository.get(job["id"])["processed"] == 0
+    assert item_repository.get("item-1")["platform_status"] == {}
+
+    # The batch is kept and written on the next flush
+    monkeypatch.undo()
+    asyncio.run(buffer.flush())
+    assert job_repository.pending(job["id"]) == []
+    assert job_repository.get(job["id"])["succeeded"] == 1
+    assert item_repository.get("item-1")["platform_status"]["ebay"]["status"] == (
+        "published"
+    )
+    assert item_repository.counters()["published"] == 1
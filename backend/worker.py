@@ -0,0 +1,50 @@
+"""Standalone publish job worker
+
+Runs bulk publish jobs from the shared job queue, alongside or instead of
+the loops in the API process (see JOB_WORKERS). Start as many as needed:
+
+    python worker.py --concurrency 2
+"""
+
+import argparse
+import asyncio
+
+from dotenv import load_dotenv
+
+from app.services.ebay_service import ebay_service
+from app.services.shopify_service import shopify_service
+from app.services.image_verifier import image_verifier
+from app.services.job_worker import job_worker
+from app.settings.database import init_db
+
+# Load environment variables
+load_dotenv()
+
+
+async def main(concurrency: int):
+    await init_db()
+    ebay_service.open_client()
+    shopify_service.open_client()
+    image_verifier.open_client()
+    token_refresher = asyncio.create_task(ebay_service.run_token_refresher())
+    print(f"👷 Job worker {job_worker.worker_id} started")
+
+    try:
+        await asyncio.gather(*(job_worker.run() for _ in range(concurrency)))
+    finally:
+        token_refresher.cancel()
+        await ebay_service.aclose()
+        await shopify_service.aclose()
+        await image_verifier.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run bulk publish jobs")
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="Jobs to run at the same time"
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(max(1, args.concurrency)))
+    except KeyboardInterrupt:
+        print("🛑 Job worker stopped")